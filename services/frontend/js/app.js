@@ -317,6 +317,7 @@ document.addEventListener('alpine:init', () => {
         filteredList: [],
         search: '',
         loading: false,
+        stockStream: null,
 
         async init() {
             if (window.autoAnimate && this.$refs.productList) {
@@ -331,6 +332,7 @@ document.addEventListener('alpine:init', () => {
             this.$watch('$store.auth.token', (val) => {
                 if (val) this.fetch();
                 else {
+                    this.unwatchStock();
                     this.list = [];
                     this.filteredList = [];
                 }
@@ -354,6 +356,7 @@ document.addEventListener('alpine:init', () => {
                 if (res.ok) {
                     this.list = await res.json();
                     this.filter();
+                    this.watchStock();
                 } else if (res.status === 401) {
                     auth.logout();
                 }
@@ -364,6 +367,30 @@ document.addEventListener('alpine:init', () => {
             }
         },
 
+        // Live stock badges: inventory-service pushes coalesced availability
+        // changes for the listed products over one Server-Sent Events stream
+        watchStock() {
+            this.unwatchStock();
+            const ids = this.list.map(p => p.id).slice(0, 100);
+            if (!ids.length || !window.EventSource) return;
+            const params = new URLSearchParams();
+            ids.forEach(id => params.append('product_ids', id));
+            this.stockStream = new EventSource(`${API_BASE_URL}/api/v1/inventory/availability/stream?${params}`);
+            this.stockStream.addEventListener('availability', (event) => {
+                const stock = new Map(JSON.parse(event.data).map(s => [s.product_id, s.available_quantity]));
+                this.list.forEach(p => {
+                    if (stock.has(p.id)) p.stock = stock.get(p.id);
+                });
+            });
+        },
+
+        unwatchStock() {
+            if (this.stockStream) {
+                this.stockStream.close();
+                this.stockStream = null;
+            }
+        },
+
         filter() {
             if (!this.search) {
                 this.filteredList = this.list;
@@ -380,6 +407,8 @@ document.addEventListener('alpine:init', () => {
     // Orders Data Component
     Alpine.data('orders', () => ({
         list: [],
+        nextCursor: null,
+        pageSize: 20,
         loading: false,
 
         async init() {
@@ -389,17 +418,32 @@ document.addEventListener('alpine:init', () => {
         },
 
         async fetch() {
+            this.nextCursor = null;
+            await this.loadPage(false);
+        },
+
+        async loadMore() {
+            if (this.nextCursor) await this.loadPage(true);
+        },
+
+        // Summary pages skip order items; X-Next-Cursor points at the next page
+        async loadPage(append) {
             this.loading = true;
             try {
                 const auth = Alpine.store('auth');
                 if (!auth || !auth.token || !auth.user) return;
 
-                const res = await fetch(`${API_BASE_URL}/api/v1/order/orders/user/${auth.user.id}`, {
+                const params = new URLSearchParams({ limit: this.pageSize });
+                if (append && this.nextCursor) params.set('cursor', this.nextCursor);
+
+                const res = await fetch(`${API_BASE_URL}/api/v1/order/orders/user/${auth.user.id}/summary?${params}`, {
                     headers: { 'Authorization': `Bearer ${auth.token}` }
                 });
 
                 if (res.ok) {
-                    this.list = await res.json();
+                    const page = await res.json();
+                    this.list = append ? this.list.concat(page) : page;
+                    this.nextCursor = res.headers.get('X-Next-Cursor');
                 }
             } catch (e) {
                 console.error("Fetch orders error", e);
@@ -41,6 +41,7 @@ window.messages = {
         order_total: "Total",
         no_orders: "You haven't placed any orders yet.",
         items: "items",
+        load_more: "Load more",
         view_details: "View Details",
         or_continue_with: "Or continue with"
     },
@@ -86,6 +87,7 @@ window.messages = {
         order_total: "Tổng tiền",
         no_orders: "Bạn chưa có đơn hàng nào.",
         items: "sản phẩm",
+        load_more: "Xem thêm",
         view_details: "Xem chi tiết",
         or_continue_with: "Hoặc tiếp tục với"
     }
@@ -1,5 +1,6 @@
-from app.api.v1.endpoints import inventory
+from app.api.v1.endpoints import inventory, locations
 from fastapi import APIRouter
 
 api_router = APIRouter()
 api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+api_router.include_router(locations.router, prefix="/inventory", tags=["locations"])
@@ -1,14 +1,36 @@
+import json
+from collections.abc import AsyncIterator
 from typing import Any
 from uuid import UUID
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.schemas.inventory import (
+    AvailabilityRequest,
+    AvailabilityResponse,
     InventoryCreate,
     InventoryResponse,
+    OrderReservationResult,
+    OrderReservationResults,
+    OrderStockReservations,
+    ProductAvailability,
+    StockImportReport,
     StockReservation,
+    StockReservationBatch,
 )
+from app.services.allocation import AllocationService
+from app.services.availability import AvailabilityService
+from app.services.hot_stock import hot_stock
 from app.services.inventory_service import InventoryService
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.services.reservation_batcher import reservation_batcher
+from app.services.stock_feed import stock_feed
+from app.services.stock_import import (
+    ImportFormat,
+    StockImportFormatError,
+    StockImportService,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
@@ -29,11 +51,103 @@ async def create_inventory(
     return await InventoryService.create_inventory(db, inventory_in)
 
 
+@router.post("/availability", response_model=AvailabilityResponse)
+async def get_availability(
+    *, db: AsyncSession = Depends(get_db), request: AvailabilityRequest
+) -> Any:
+    # Products without inventory are left out
+    availability = await AvailabilityService.lookup(db, request.product_ids)
+    return AvailabilityResponse(
+        items=[
+            ProductAvailability(product_id=product_id, available_quantity=available)
+            for product_id in dict.fromkeys(request.product_ids)
+            if (available := availability.get(product_id)) is not None
+        ]
+    )
+
+
+def _availability_event(availability: dict[UUID, int]) -> str:
+    data = json.dumps(
+        [
+            {"product_id": str(product_id), "available_quantity": available}
+            for product_id, available in availability.items()
+        ]
+    )
+    return f"event: availability\ndata: {data}\n\n"
+
+
+@router.get("/availability/stream")
+async def stream_availability(
+    product_ids: list[UUID] = Query(...), db: AsyncSession = Depends(get_db)
+) -> Any:
+    if len(product_ids) > settings.STOCK_FEED_MAX_PRODUCTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.STOCK_FEED_MAX_PRODUCTS} products per stream",
+        )
+    # Subscribe before the snapshot so no change falls in between
+    subscription = stock_feed.subscribe(product_ids)
+    try:
+        snapshot = await AvailabilityService.lookup(db, product_ids)
+    except BaseException:
+        stock_feed.unsubscribe(subscription)
+        raise
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield _availability_event(snapshot)
+            while True:
+                changes = await subscription.next(settings.STOCK_FEED_HEARTBEAT_SECONDS)
+                yield _availability_event(changes) if changes else ": keep-alive\n\n"
+        finally:
+            # Client went away: stop fanning out to it
+            stock_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=StockImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_stock(
+    request: Request,
+    import_format: ImportFormat = Query(ImportFormat.CSV, alias="format"),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    # Full snapshot sync: one line per product (CSV with a product_id,
+    # quantity[,location] header, or NDJSON), loaded with COPY and merged
+    # in a single upsert. Invalid lines are reported, not fatal.
+    try:
+        return await StockImportService.import_stock(
+            db, request.stream(), import_format
+        )
+    except StockImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.get("/{product_id}", response_model=InventoryResponse)
 async def get_inventory(product_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
     inventory = await InventoryService.get_inventory_by_product(db, product_id)
     if not inventory:
         raise HTTPException(status_code=404, detail="Inventory not found")
+    # Hot products: the database lags behind the live counters
+    live = await hot_stock.overlay(inventory)
+    if live is not None:
+        return InventoryResponse.model_validate(inventory).model_copy(update=live)
     return inventory
 
 
@@ -41,9 +155,16 @@ async def get_inventory(product_id: UUID, db: AsyncSession = Depends(get_db)) ->
 async def reserve_stock(
     *, db: AsyncSession = Depends(get_db), reservation: StockReservation
 ) -> Any:
-    success = await InventoryService.reserve_stock(
-        db, reservation.product_id, reservation.quantity
-    )
+    if settings.RESERVATION_BATCH_ENABLED and not hot_stock.is_hot(
+        reservation.product_id
+    ):
+        success = await reservation_batcher.reserve(
+            reservation.product_id, reservation.quantity
+        )
+    else:
+        success = await InventoryService.reserve_stock(
+            db, reservation.product_id, reservation.quantity
+        )
     if not success:
         raise HTTPException(
             status_code=400, detail="Insufficient stock or product not found"
@@ -61,3 +182,51 @@ async def release_stock(
     if not success:
         raise HTTPException(status_code=400, detail="Inventory not found")
     return {"status": "success", "message": "Stock released"}
+
+
+@router.post("/reserve/batch", status_code=status.HTTP_200_OK)
+async def reserve_stock_batch(
+    *, db: AsyncSession = Depends(get_db), reservation: StockReservationBatch
+) -> Any:
+    success = await InventoryService.reserve_stock_batch(
+        db, reservation.items, reservation.order_id
+    )
+    if not success:
+        raise HTTPException(
+            status_code=400, detail="Insufficient stock or product not found"
+        )
+    return {"status": "success", "message": "Stock reserved"}
+
+
+@router.post(
+    "/reserve/orders",
+    response_model=OrderReservationResults,
+    status_code=status.HTTP_200_OK,
+)
+async def reserve_orders(
+    *, db: AsyncSession = Depends(get_db), reservations: OrderStockReservations
+) -> Any:
+    reserved = await InventoryService.reserve_orders(db, reservations.orders)
+    return OrderReservationResults(
+        results=[
+            OrderReservationResult(order_id=order.order_id, reserved=ok)
+            for order, ok in zip(reservations.orders, reserved, strict=True)
+        ]
+    )
+
+
+@router.post("/release/batch", status_code=status.HTTP_200_OK)
+async def release_stock_batch(
+    *, db: AsyncSession = Depends(get_db), reservation: StockReservationBatch
+) -> Any:
+    if reservation.order_id is not None:
+        # The ledger knows exactly what the order holds; releasing twice is a
+        # no-op. Any location allocation goes with the hold it was made from.
+        await InventoryService.release_holds(db, reservation.order_id)
+        await AllocationService.settle(db, reservation.order_id, deduct=False)
+        await db.commit()
+        return {"status": "success", "message": "Stock released"}
+    success = await InventoryService.release_stock_batch(db, reservation.items)
+    if not success:
+        raise HTTPException(status_code=400, detail="Inventory not found")
+    return {"status": "success", "message": "Stock released"}
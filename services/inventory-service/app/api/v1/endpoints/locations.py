@@ -0,0 +1,118 @@
+from typing import Any
+from uuid import UUID
+
+from app.db.session import get_db
+from app.models.location import Warehouse
+from app.schemas.location import (
+    AllocationRequest,
+    AllocationResponse,
+    LocationStockResponse,
+    LocationStockUpdate,
+    Shipment,
+    ShipmentItem,
+    WarehouseCreate,
+    WarehouseResponse,
+)
+from app.services.allocation import (
+    AllocationConflictError,
+    AllocationLine,
+    AllocationService,
+    InsufficientStockError,
+    UnheldItemsError,
+)
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter()
+
+
+def _shipments(order_id: UUID, lines: list[AllocationLine]) -> AllocationResponse:
+    shipments: dict[UUID, list[ShipmentItem]] = {}
+    for line in lines:
+        shipments.setdefault(line.warehouse_id, []).append(
+            ShipmentItem(product_id=line.product_id, quantity=line.quantity)
+        )
+    return AllocationResponse(
+        order_id=order_id,
+        shipments=[
+            Shipment(warehouse_id=warehouse_id, items=items)
+            for warehouse_id, items in shipments.items()
+        ],
+    )
+
+
+@router.post(
+    "/warehouses",
+    response_model=WarehouseResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_warehouse(
+    *, db: AsyncSession = Depends(get_db), warehouse_in: WarehouseCreate
+) -> Any:
+    result = await db.execute(
+        select(Warehouse).where(Warehouse.code == warehouse_in.code)
+    )
+    if result.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Warehouse code already exists")
+    return await AllocationService.create_warehouse(
+        db, warehouse_in.code, warehouse_in.latitude, warehouse_in.longitude
+    )
+
+
+@router.put(
+    "/{product_id}/locations/{warehouse_id}", response_model=LocationStockResponse
+)
+async def set_location_stock(
+    product_id: UUID,
+    warehouse_id: UUID,
+    stock_in: LocationStockUpdate,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    if await db.get(Warehouse, warehouse_id) is None:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    return await AllocationService.set_location_stock(
+        db, product_id, warehouse_id, stock_in.quantity
+    )
+
+
+@router.post("/allocations", response_model=AllocationResponse)
+async def allocate_order(
+    *, db: AsyncSession = Depends(get_db), request: AllocationRequest
+) -> Any:
+    destination = (
+        (request.destination.latitude, request.destination.longitude)
+        if request.destination
+        else None
+    )
+    try:
+        lines = await AllocationService.allocate(
+            db, request.order_id, request.items, request.strategy, destination
+        )
+    except InsufficientStockError as exc:
+        raise HTTPException(
+            status_code=400, detail=f"Insufficient stock across locations: {exc}"
+        ) from exc
+    except UnheldItemsError as exc:
+        raise HTTPException(
+            status_code=409, detail=f"Order does not hold stock for: {exc}"
+        ) from exc
+    except AllocationConflictError as exc:
+        raise HTTPException(
+            status_code=409, detail="Stock changed while allocating, retry"
+        ) from exc
+    return _shipments(request.order_id, lines)
+
+
+@router.get("/allocations/{order_id}", response_model=AllocationResponse)
+async def get_allocation(order_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
+    lines = await AllocationService.get_allocations(db, order_id)
+    if not lines:
+        raise HTTPException(status_code=404, detail="Allocation not found")
+    return _shipments(order_id, lines)
+
+
+@router.delete("/allocations/{order_id}", status_code=status.HTTP_200_OK)
+async def release_allocation(order_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
+    await AllocationService.release(db, order_id)
+    return {"status": "success", "message": "Allocation released"}
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from pydantic_settings import BaseSettings
 
 from shared.version import VERSION
@@ -14,6 +16,52 @@ class Settings(BaseSettings):
     # RABBITMQ
     RABBITMQ_URL: str
 
+    # REDIS
+    REDIS_URL: str | None = None
+
+    # HOT SKUS
+    # Products whose counters live in Redis during flash sales, as a JSON
+    # list of product ids; flushed to the database every interval.
+    HOT_SKU_IDS: list[UUID] = []
+    HOT_STOCK_FLUSH_INTERVAL: float = 0.5
+
+    # AVAILABILITY LOOKUP
+    # Seconds a bulk lookup result may be reused; 0 disables the cache
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 0.0
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 10000
+
+    # LOCATIONS
+    WAREHOUSE_CACHE_TTL_SECONDS: float = 60.0
+    # Plans are retried when a location changes between planning and apply
+    ALLOCATION_MAX_ATTEMPTS: int = 3
+
+    # AVAILABILITY STREAM
+    STOCK_FEED_COALESCE_MS: float = 250.0
+    STOCK_FEED_HEARTBEAT_SECONDS: float = 15.0
+    STOCK_FEED_RECONNECT_DELAY: float = 1.0
+    STOCK_FEED_MAX_PRODUCTS: int = 100
+
+    # STOCK IMPORT
+    STOCK_IMPORT_MAX_LINE_BYTES: int = 4096
+    STOCK_IMPORT_MAX_REPORTED_ERRORS: int = 100
+
+    # RESERVATION BATCHING
+    # Single-item reservations for the same product arriving within the
+    # window share one UPDATE and one commit.
+    RESERVATION_BATCH_ENABLED: bool = False
+    RESERVATION_BATCH_WINDOW_MS: float = 2.0
+    RESERVATION_BATCH_MAX_SIZE: int = 64
+
+    # RESERVATION LEDGER
+    # Holds outlive the order service's PENDING timeout so its reaper
+    # normally releases them first; the sweeper is the backstop.
+    RESERVATION_TTL_SECONDS: int = 30 * 60
+    RESERVATION_SWEEP_INTERVAL: float = 30.0
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500
+    RESERVATION_SWEEP_MAX_BATCHES: int = 20
+    # Expired holds are kept this long so a late OrderCompleted still deducts
+    RESERVATION_EXPIRED_RETENTION_SECONDS: int = 7 * 24 * 60 * 60
+
     class Config:
         case_sensitive = True
 
@@ -0,0 +1,5 @@
+from app.core.config import settings
+
+from shared.messaging.rabbitmq import EventPublisher
+
+publisher = EventPublisher(settings.RABBITMQ_URL)
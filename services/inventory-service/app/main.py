@@ -7,9 +7,15 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.messaging import publisher
 from app.db.base import Base
 from app.db.init_db import init_db
 from app.db.session import SessionLocal, engine
+from app.services.hot_stock import hot_stock
+from app.services.reservation_batcher import reservation_batcher
+from app.services.reservation_sweeper import reservation_sweeper
+from app.services.saga import build_consumer
+from app.services.stock_feed import install_trigger, stock_feed
 
 
 @asynccontextmanager
@@ -17,13 +23,34 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Startup: Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_trigger(conn)
 
     # Seed data
     async with SessionLocal() as db:
         await init_db(db)
 
+    # Availability stream: one LISTEN connection fans out to subscribers
+    stock_feed.start()
+
+    # Hot product counters: reload from the database, then write behind
+    await hot_stock.start()
+
+    # Order saga: reserve stock for new orders, release it on cancellation
+    # and deduct it once the order completes
+    consumer = build_consumer()
+    await consumer.start()
+
+    # Releases reservations whose order never completed
+    reservation_sweeper.start()
+
     yield
     # Shutdown
+    await reservation_batcher.stop()
+    await reservation_sweeper.stop()
+    await consumer.stop()
+    await hot_stock.stop()
+    await stock_feed.stop()
+    publisher.close()
     await engine.dispose()
 
 
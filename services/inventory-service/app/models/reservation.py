@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+
+from app.db.base import Base
+from sqlalchemy import UUID, DateTime, Index, Integer, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+# One hold per order and product. Inventory.reserved_quantity stays the
+# denormalised sum of the rows not yet expired, so availability remains a
+# single-row read. An expired hold is kept (expired_at set) until its
+# retention runs out, so a completion that arrives late can still deduct it.
+class Reservation(Base):
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    expired_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "order_id", "product_id", name="uq_reservations_order_product"
+        ),
+        Index(
+            "ix_reservations_expires_at",
+            "expires_at",
+            postgresql_where=expired_at.is_(None),
+        ),
+        Index("ix_reservations_expired_at", "expired_at"),
+    )
@@ -27,6 +27,56 @@ class InventoryResponse(InventoryBase):
         from_attributes = True
 
 
+class AvailabilityRequest(BaseModel):
+    product_ids: list[UUID] = Field(min_length=1, max_length=1000)
+
+
+class ProductAvailability(BaseModel):
+    product_id: UUID
+    available_quantity: int
+
+
+class AvailabilityResponse(BaseModel):
+    items: list[ProductAvailability]
+
+
 class StockReservation(BaseModel):
     product_id: UUID
     quantity: int = Field(gt=0)
+
+
+class StockReservationBatch(BaseModel):
+    order_id: UUID | None = None
+    items: list[StockReservation] = Field(min_length=1)
+
+
+class OrderStockReservations(BaseModel):
+    orders: list[StockReservationBatch] = Field(min_length=1)
+
+
+class OrderReservationResult(BaseModel):
+    order_id: UUID | None
+    reserved: bool
+
+
+class OrderReservationResults(BaseModel):
+    results: list[OrderReservationResult]
+
+
+class StockImportRow(BaseModel):
+    product_id: UUID
+    quantity: int = Field(ge=0)
+    location: str | None = None
+
+
+class StockImportError(BaseModel):
+    line: int
+    error: str
+
+
+class StockImportReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    errors: list[StockImportError] = []
@@ -0,0 +1,59 @@
+from uuid import UUID
+
+from app.schemas.inventory import StockReservation
+from app.services.allocation import AllocationStrategy
+from pydantic import BaseModel, Field
+
+
+class WarehouseCreate(BaseModel):
+    code: str = Field(min_length=1)
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class WarehouseResponse(WarehouseCreate):
+    id: UUID
+
+    class Config:
+        from_attributes = True
+
+
+class LocationStockUpdate(BaseModel):
+    quantity: int = Field(ge=0)
+
+
+class LocationStockResponse(BaseModel):
+    product_id: UUID
+    warehouse_id: UUID
+    quantity: int
+    reserved_quantity: int
+
+    class Config:
+        from_attributes = True
+
+
+class Destination(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class AllocationRequest(BaseModel):
+    order_id: UUID
+    items: list[StockReservation] = Field(min_length=1)
+    strategy: AllocationStrategy = AllocationStrategy.FEWEST_SHIPMENTS
+    destination: Destination | None = None
+
+
+class ShipmentItem(BaseModel):
+    product_id: UUID
+    quantity: int
+
+
+class Shipment(BaseModel):
+    warehouse_id: UUID
+    items: list[ShipmentItem]
+
+
+class AllocationResponse(BaseModel):
+    order_id: UUID
+    shipments: list[Shipment]
@@ -0,0 +1,444 @@
+import math
+import time
+from enum import Enum
+from functools import reduce
+from operator import and_
+from typing import Any, NamedTuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.inventory import Inventory
+from app.models.location import LocationAllocation, LocationStock, Warehouse
+from app.models.reservation import Reservation
+from app.schemas.inventory import StockReservation
+from app.services.hot_stock import hot_stock
+from app.services.inventory_service import InventoryService
+from sqlalchemy import (
+    ARRAY,
+    Values,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class AllocationStrategy(str, Enum):
+    FEWEST_SHIPMENTS = "fewest_shipments"
+    NEAREST = "nearest"
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, product_ids: list[UUID]) -> None:
+        self.product_ids = sorted(product_ids)
+        super().__init__(", ".join(str(product_id) for product_id in self.product_ids))
+
+
+class AllocationConflictError(Exception):
+    pass
+
+
+class UnheldItemsError(Exception):
+    def __init__(self, product_ids: list[UUID]) -> None:
+        self.product_ids = sorted(product_ids)
+        super().__init__(", ".join(str(product_id) for product_id in self.product_ids))
+
+
+class AllocationLine(NamedTuple):
+    warehouse_id: UUID
+    product_id: UUID
+    quantity: int
+
+
+def distance_km(a: tuple[float, float], b: tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+# Warehouses change rarely: each one gets a bit position so a product's
+# locations can be handled as a bitmask during planning. Positions follow
+# Warehouse.code order and are reassigned on every reload, so they are only
+# meaningful within one allocation and are never stored.
+class WarehouseDirectory:
+    def __init__(self, ttl: float) -> None:
+        self._ttl = ttl
+        self._loaded_at: float | None = None
+        self.ids: list[UUID] = []
+        self.coordinates: list[tuple[float, float]] = []
+        self._bits: dict[UUID, int] = {}
+
+    async def load(self, db: AsyncSession, force: bool = False) -> None:
+        if (
+            not force
+            and self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self._ttl
+        ):
+            return
+        result = await db.execute(
+            select(Warehouse.id, Warehouse.latitude, Warehouse.longitude).order_by(
+                Warehouse.code
+            )
+        )
+        rows = result.all()
+        self.ids = [warehouse_id for warehouse_id, _, _ in rows]
+        self.coordinates = [(latitude, longitude) for _, latitude, longitude in rows]
+        self._bits = {warehouse_id: bit for bit, warehouse_id in enumerate(self.ids)}
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def bit(self, warehouse_id: UUID) -> int | None:
+        return self._bits.get(warehouse_id)
+
+    def distances(self, destination: tuple[float, float] | None) -> list[float]:
+        if destination is None:
+            return [0.0] * len(self.ids)
+        return [distance_km(destination, point) for point in self.coordinates]
+
+
+warehouse_directory = WarehouseDirectory(ttl=settings.WAREHOUSE_CACHE_TTL_SECONDS)
+
+# product -> {warehouse bit: available units}
+StockIndex = dict[UUID, dict[int, int]]
+Plan = dict[int, dict[UUID, int]]
+
+
+def _mask(bits: list[int]) -> int:
+    return sum(1 << bit for bit in bits)
+
+
+def _bits(mask: int) -> list[int]:
+    return [bit for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+def _take(plan: Plan, stock: StockIndex, bit: int, product_id: UUID, want: int) -> int:
+    taken = min(want, stock[product_id].get(bit, 0))
+    if taken:
+        stock[product_id][bit] -= taken
+        shipment = plan.setdefault(bit, {})
+        shipment[product_id] = shipment.get(product_id, 0) + taken
+    return taken
+
+
+def _fewest_shipments(
+    demand: dict[UUID, int], stock: StockIndex, distances: list[float]
+) -> Plan:
+    # Greedy set cover: one warehouse if any can ship everything left,
+    # otherwise the one that completes the most lines, then most units.
+    plan: Plan = {}
+    remaining = dict(demand)
+    while remaining:
+        complete = {
+            product_id: _mask(
+                [
+                    bit
+                    for bit, available in stock[product_id].items()
+                    if available >= want
+                ]
+            )
+            for product_id, want in remaining.items()
+        }
+        common = reduce(and_, complete.values())
+        if common:
+            chosen = min(_bits(common), key=distances.__getitem__)
+        else:
+            candidates = sorted(
+                {
+                    bit
+                    for product_id in remaining
+                    for bit, available in stock[product_id].items()
+                    if available > 0
+                }
+            )
+            chosen = max(
+                candidates,
+                key=lambda bit: (
+                    sum(complete[product_id] >> bit & 1 for product_id in remaining),
+                    sum(
+                        min(want, stock[product_id].get(bit, 0))
+                        for product_id, want in remaining.items()
+                    ),
+                    -distances[bit],
+                ),
+            )
+        for product_id, want in list(remaining.items()):
+            left = want - _take(plan, stock, chosen, product_id, want)
+            if left:
+                remaining[product_id] = left
+            else:
+                del remaining[product_id]
+    return plan
+
+
+def _nearest(
+    demand: dict[UUID, int], stock: StockIndex, distances: list[float]
+) -> Plan:
+    plan: Plan = {}
+    for product_id, want in demand.items():
+        for bit in sorted(stock[product_id], key=distances.__getitem__):
+            want -= _take(plan, stock, bit, product_id, want)
+            if not want:
+                break
+    return plan
+
+
+def plan_allocation(
+    demand: dict[UUID, int],
+    stock: StockIndex,
+    distances: list[float],
+    strategy: AllocationStrategy,
+) -> Plan:
+    short = [
+        product_id
+        for product_id, want in demand.items()
+        if sum(stock.get(product_id, {}).values()) < want
+    ]
+    if short:
+        raise InsufficientStockError(short)
+    stock = {product_id: dict(stock[product_id]) for product_id in demand}
+    if strategy == AllocationStrategy.NEAREST:
+        return _nearest(demand, stock, distances)
+    return _fewest_shipments(demand, stock, distances)
+
+
+# Allocation is a separate, manual step (POST /inventory/allocations) that
+# picks warehouses for units an order already holds. The product-wide hold
+# is the only claim on Inventory; an allocation only reserves LocationStock.
+# Settling an order therefore takes the units off the total once, through
+# its hold, and off each location once, through its allocation.
+class AllocationService:
+    @staticmethod
+    async def get_allocations(db: AsyncSession, order_id: UUID) -> list[AllocationLine]:
+        result = await db.execute(
+            select(
+                LocationAllocation.warehouse_id,
+                LocationAllocation.product_id,
+                LocationAllocation.quantity,
+            ).where(LocationAllocation.order_id == order_id)
+        )
+        return [AllocationLine(*row) for row in result.all()]
+
+    @staticmethod
+    async def _unheld(
+        db: AsyncSession, order_id: UUID, demand: dict[UUID, int]
+    ) -> list[UUID]:
+        # Products the order does not hold enough live stock for
+        result = await db.execute(
+            select(Reservation.product_id, func.sum(Reservation.quantity))
+            .where(Reservation.order_id == order_id, Reservation.expired_at.is_(None))
+            .group_by(Reservation.product_id)
+        )
+        held = dict(result.tuples().all())
+        return [
+            product_id
+            for product_id, want in demand.items()
+            if held.get(product_id, 0) < want
+        ]
+
+    @staticmethod
+    async def _stock_index(db: AsyncSession, product_ids: list[UUID]) -> StockIndex:
+        # Read for every allocation: location stock moves with each one, and
+        # the guarded apply rejects a plan made from stale numbers anyway.
+        # Only the warehouse directory is cached.
+        ids = bindparam(
+            "product_ids", product_ids, type_=ARRAY(LocationStock.product_id.type)
+        )
+        available = LocationStock.quantity - LocationStock.reserved_quantity
+        result = await db.execute(
+            select(
+                LocationStock.product_id, LocationStock.warehouse_id, available
+            ).where(LocationStock.product_id == any_(ids), available > 0)
+        )
+        rows = result.all()
+        if any(warehouse_directory.bit(row[1]) is None for row in rows):
+            # A warehouse created since the directory was loaded
+            await warehouse_directory.load(db, force=True)
+        stock: StockIndex = {product_id: {} for product_id in product_ids}
+        for product_id, warehouse_id, units in rows:
+            bit = warehouse_directory.bit(warehouse_id)
+            if bit is not None:
+                stock[product_id][bit] = units
+        return stock
+
+    @staticmethod
+    def _lines(table: str, lines: list[AllocationLine]) -> Values:
+        return values(
+            column("warehouse_id", LocationStock.warehouse_id.type),
+            column("product_id", LocationStock.product_id.type),
+            column("quantity", LocationStock.quantity.type),
+            name=table,
+        ).data(sorted(lines))
+
+    @staticmethod
+    async def _apply(
+        db: AsyncSession, order_id: UUID, lines: list[AllocationLine]
+    ) -> bool:
+        planned = AllocationService._lines("planned", lines)
+        # Same guarded-UPDATE rule as product-level reservations: a location
+        # that changed since planning fails the whole allocation
+        result = await db.execute(
+            update(LocationStock)
+            .where(
+                LocationStock.warehouse_id == planned.c.warehouse_id,
+                LocationStock.product_id == planned.c.product_id,
+                LocationStock.quantity - LocationStock.reserved_quantity
+                >= planned.c.quantity,
+            )
+            .values(
+                reserved_quantity=LocationStock.reserved_quantity + planned.c.quantity
+            )
+            .returning(LocationStock.id)
+            .execution_options(synchronize_session=False)
+        )
+        if len(result.all()) != len(lines):
+            return False
+        result = await db.execute(
+            insert(LocationAllocation)
+            .values([{"order_id": order_id, **line._asdict()} for line in lines])
+            .on_conflict_do_nothing(
+                constraint="uq_locationallocations_order_product_warehouse"
+            )
+            .returning(LocationAllocation.id)
+        )
+        # Fewer rows: a concurrent call allocated this order first
+        return len(result.all()) == len(lines)
+
+    @staticmethod
+    async def allocate(
+        db: AsyncSession,
+        order_id: UUID,
+        items: list[StockReservation],
+        strategy: AllocationStrategy,
+        destination: tuple[float, float] | None = None,
+    ) -> list[AllocationLine]:
+        demand = InventoryService._merge_quantities(items)
+        for _ in range(settings.ALLOCATION_MAX_ATTEMPTS):
+            existing = await AllocationService.get_allocations(db, order_id)
+            if existing:
+                return existing
+            unheld = await AllocationService._unheld(db, order_id, demand)
+            if unheld:
+                raise UnheldItemsError(unheld)
+            await warehouse_directory.load(db)
+            stock = await AllocationService._stock_index(db, sorted(demand))
+            plan = plan_allocation(
+                demand, stock, warehouse_directory.distances(destination), strategy
+            )
+            lines = [
+                AllocationLine(warehouse_directory.ids[bit], product_id, quantity)
+                for bit, shipment in plan.items()
+                for product_id, quantity in shipment.items()
+            ]
+            if await AllocationService._apply(db, order_id, lines):
+                await db.commit()
+                return lines
+            await db.rollback()
+        raise AllocationConflictError(order_id)
+
+    @staticmethod
+    async def settle(db: AsyncSession, order_id: UUID, deduct: bool) -> bool:
+        # Releases the order's location holds, taking them off stock as well
+        # when deduct is set. Leaves the commit to the caller.
+        result = await db.execute(
+            delete(LocationAllocation)
+            .where(LocationAllocation.order_id == order_id)
+            .returning(
+                LocationAllocation.warehouse_id,
+                LocationAllocation.product_id,
+                LocationAllocation.quantity,
+            )
+        )
+        lines = [AllocationLine(*row) for row in result.all()]
+        if lines:
+            settled = AllocationService._lines("settled", lines)
+            changes: dict[str, Any] = {
+                "reserved_quantity": func.greatest(
+                    LocationStock.reserved_quantity - settled.c.quantity, 0
+                )
+            }
+            if deduct:
+                changes["quantity"] = func.greatest(
+                    LocationStock.quantity - settled.c.quantity, 0
+                )
+            await db.execute(
+                update(LocationStock)
+                .where(
+                    LocationStock.warehouse_id == settled.c.warehouse_id,
+                    LocationStock.product_id == settled.c.product_id,
+                )
+                .values(changes)
+                .execution_options(synchronize_session=False)
+            )
+        return bool(lines)
+
+    @staticmethod
+    async def release(db: AsyncSession, order_id: UUID) -> bool:
+        released = await AllocationService.settle(db, order_id, deduct=False)
+        await db.commit()
+        return released
+
+    @staticmethod
+    async def set_location_stock(
+        db: AsyncSession, product_id: UUID, warehouse_id: UUID, quantity: int
+    ) -> LocationStock:
+        # Locking the totals row serializes location writes for one product,
+        # so each sees the quantity the previous one left
+        await db.execute(
+            select(Inventory.id)
+            .where(Inventory.product_id == product_id)
+            .with_for_update()
+        )
+        previous = await db.scalar(
+            select(LocationStock.quantity).where(
+                LocationStock.product_id == product_id,
+                LocationStock.warehouse_id == warehouse_id,
+            )
+        )
+        result = await db.execute(
+            insert(LocationStock)
+            .values(product_id=product_id, warehouse_id=warehouse_id, quantity=quantity)
+            .on_conflict_do_update(
+                constraint="uq_locationstocks_product_warehouse",
+                set_={"quantity": quantity},
+            )
+            .returning(LocationStock)
+        )
+        location = result.scalar_one()
+        # The product-wide total moves by the same amount. It is not the sum
+        # of the locations: sales confirmed without an allocation only come
+        # off the total.
+        delta = quantity - (previous or 0)
+        if delta and not hot_stock.is_hot(product_id):
+            await db.execute(
+                update(Inventory)
+                .where(Inventory.product_id == product_id)
+                .values(quantity=func.greatest(Inventory.quantity + delta, 0))
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        if delta and hot_stock.is_hot(product_id):
+            # The counters own the total; the change reaches the row on flush
+            await hot_stock.store.adjust_quantity(product_id, delta)
+        return location
+
+    @staticmethod
+    async def create_warehouse(
+        db: AsyncSession, code: str, latitude: float, longitude: float
+    ) -> Warehouse:
+        warehouse = Warehouse(code=code, latitude=latitude, longitude=longitude)
+        db.add(warehouse)
+        await db.commit()
+        await db.refresh(warehouse)
+        warehouse_directory.invalidate()
+        return warehouse
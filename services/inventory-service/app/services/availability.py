@@ -0,0 +1,61 @@
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.inventory import Inventory
+from app.services.hot_stock import hot_stock
+from sqlalchemy import ARRAY, any_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.cache import TTLCache
+
+# Short-lived per-process cache for listing pages that ask for the same
+# products over and over; a TTL of zero turns it off.
+availability_cache: TTLCache[UUID, int] = TTLCache(
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+    max_entries=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+)
+
+
+class AvailabilityService:
+    @staticmethod
+    async def _query(db: AsyncSession, product_ids: list[UUID]) -> dict[UUID, int]:
+        # One array parameter: the statement text is the same for any number
+        # of ids and is answered from the unique product_id index
+        ids = bindparam(
+            "product_ids", product_ids, type_=ARRAY(Inventory.product_id.type)
+        )
+        result = await db.execute(
+            select(
+                Inventory.product_id,
+                Inventory.quantity - Inventory.reserved_quantity,
+            ).where(Inventory.product_id == any_(ids))
+        )
+        return dict(result.tuples().all())
+
+    @staticmethod
+    async def lookup(db: AsyncSession, product_ids: list[UUID]) -> dict[UUID, int]:
+        wanted = list(dict.fromkeys(product_ids))
+        availability: dict[UUID, int] = {}
+        # Hot products are answered from their live counters
+        for product_id in wanted:
+            if hot_stock.is_hot(product_id):
+                counters = await hot_stock.store.get(product_id)
+                if counters is not None:
+                    availability[product_id] = counters[0] - counters[1]
+        if availability_cache.enabled:
+            availability.update(
+                availability_cache.get_many(
+                    product_id
+                    for product_id in wanted
+                    if product_id not in availability
+                )
+            )
+        missing = [
+            product_id for product_id in wanted if product_id not in availability
+        ]
+        if missing:
+            fetched = await AvailabilityService._query(db, missing)
+            if availability_cache.enabled:
+                availability_cache.put_many(fetched)
+            availability.update(fetched)
+        return availability
@@ -0,0 +1,387 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Protocol
+from uuid import UUID
+
+import redis.asyncio as redis
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.inventory import Inventory
+from sqlalchemy import column, func, select, update, values
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Unflushed changes per product: (reserved delta, quantity delta)
+Deltas = dict[UUID, tuple[int, int]]
+
+
+class HotStockStore(Protocol):
+    async def seed(self, rows: dict[UUID, tuple[int, int]]) -> None:
+        ...
+
+    async def reserve(self, quantities: dict[UUID, int]) -> bool:
+        ...
+
+    async def release(self, quantities: dict[UUID, int], deduct: bool = False) -> int:
+        ...
+
+    async def deduct(self, quantities: dict[UUID, int]) -> None:
+        ...
+
+    async def set_quantity(self, product_id: UUID, quantity: int) -> None:
+        ...
+
+    async def adjust_quantity(self, product_id: UUID, delta: int) -> None:
+        ...
+
+    async def get(self, product_id: UUID) -> tuple[int, int] | None:
+        ...
+
+    async def drain(self) -> Deltas:
+        ...
+
+    async def restore(self, deltas: Deltas) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+# The braces are a hash tag: every key lands in one cluster slot, so a
+# script may touch several products at once.
+STOCK_KEY = "{inventory:hot}:stock:%s"
+PENDING_KEY = "{inventory:hot}:pending"
+
+# KEYS: stock keys..., pending key. ARGV: amounts in the same order.
+RESERVE_SCRIPT = """
+local pending = KEYS[#KEYS]
+for i = 1, #KEYS - 1 do
+    local stock = redis.call('HMGET', KEYS[i], 'quantity', 'reserved')
+    if not stock[1] then
+        return 0
+    end
+    if tonumber(stock[1]) - tonumber(stock[2]) < tonumber(ARGV[i]) then
+        return 0
+    end
+end
+for i = 1, #KEYS - 1 do
+    redis.call('HINCRBY', KEYS[i], 'reserved', ARGV[i])
+    redis.call('HINCRBY', pending, KEYS[i] .. ':reserved', ARGV[i])
+end
+return 1
+"""
+
+# A deduction only applies to stock that is reserved in full, as in the
+# guarded SQL confirm; anything else is left alone and not counted.
+# KEYS: stock keys..., pending key. ARGV: deduct flag, then amounts.
+RELEASE_SCRIPT = """
+local pending = KEYS[#KEYS]
+local deduct = ARGV[1] == '1'
+local matched = 0
+for i = 1, #KEYS - 1 do
+    local stock = redis.call('HMGET', KEYS[i], 'quantity', 'reserved')
+    local amount = tonumber(ARGV[i + 1])
+    if stock[1] and not (deduct and tonumber(stock[2]) < amount) then
+        matched = matched + 1
+        local released = math.min(tonumber(stock[2]), amount)
+        redis.call('HINCRBY', KEYS[i], 'reserved', -released)
+        redis.call('HINCRBY', pending, KEYS[i] .. ':reserved', -released)
+        if deduct then
+            local deducted = math.min(tonumber(stock[1]), amount)
+            redis.call('HINCRBY', KEYS[i], 'quantity', -deducted)
+            redis.call('HINCRBY', pending, KEYS[i] .. ':quantity', -deducted)
+        end
+    end
+end
+return matched
+"""
+
+# Stock only, for units sold without a reservation still in place.
+# KEYS: stock keys..., pending key. ARGV: amounts in the same order.
+DEDUCT_SCRIPT = """
+local pending = KEYS[#KEYS]
+for i = 1, #KEYS - 1 do
+    local quantity = redis.call('HGET', KEYS[i], 'quantity')
+    if quantity then
+        local deducted = math.min(tonumber(quantity), tonumber(ARGV[i]))
+        redis.call('HINCRBY', KEYS[i], 'quantity', -deducted)
+        redis.call('HINCRBY', pending, KEYS[i] .. ':quantity', -deducted)
+    end
+end
+return 1
+"""
+
+# Creates counters that do not exist yet: the database row plus whatever
+# has not been flushed. Live counters are the source of truth and are never
+# overwritten, so a replica starting up cannot undo changes other replicas
+# made after it read the database.
+# KEYS: stock keys..., pending key. ARGV: quantity, reserved pairs.
+SEED_SCRIPT = """
+local pending = KEYS[#KEYS]
+local seeded = 0
+for i = 1, #KEYS - 1 do
+    if redis.call('EXISTS', KEYS[i]) == 0 then
+        local reserved = redis.call('HGET', pending, KEYS[i] .. ':reserved') or 0
+        local quantity = redis.call('HGET', pending, KEYS[i] .. ':quantity') or 0
+        redis.call(
+            'HSET', KEYS[i],
+            'quantity', tonumber(ARGV[2 * i - 1]) + tonumber(quantity),
+            'reserved', tonumber(ARGV[2 * i]) + tonumber(reserved)
+        )
+        seeded = seeded + 1
+    end
+end
+return seeded
+"""
+
+# KEYS: stock key, pending key. ARGV: absolute quantity.
+SET_QUANTITY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], 'quantity', ARGV[1])
+end
+redis.call('HDEL', KEYS[2], KEYS[1] .. ':quantity')
+return 1
+"""
+
+# Stock never goes below zero; the pending delta records what was applied.
+# KEYS: stock key, pending key. ARGV: quantity delta.
+ADJUST_QUANTITY_SCRIPT = """
+local quantity = redis.call('HGET', KEYS[1], 'quantity')
+if quantity then
+    local applied = math.max(tonumber(ARGV[1]), -tonumber(quantity))
+    redis.call('HINCRBY', KEYS[1], 'quantity', applied)
+    redis.call('HINCRBY', KEYS[2], KEYS[1] .. ':quantity', applied)
+end
+return 1
+"""
+
+# KEYS: pending key. Takes every delta in one step so none is lost.
+DRAIN_SCRIPT = """
+local deltas = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return deltas
+"""
+
+
+class RedisHotStockStore:
+    def __init__(self, url: str) -> None:
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._reserve = self._redis.register_script(RESERVE_SCRIPT)
+        self._release = self._redis.register_script(RELEASE_SCRIPT)
+        self._deduct = self._redis.register_script(DEDUCT_SCRIPT)
+        self._seed = self._redis.register_script(SEED_SCRIPT)
+        self._set_quantity = self._redis.register_script(SET_QUANTITY_SCRIPT)
+        self._adjust_quantity = self._redis.register_script(ADJUST_QUANTITY_SCRIPT)
+        self._drain = self._redis.register_script(DRAIN_SCRIPT)
+
+    @staticmethod
+    def _keys(product_ids: list[UUID]) -> list[str]:
+        return [STOCK_KEY % product_id for product_id in product_ids] + [PENDING_KEY]
+
+    async def seed(self, rows: dict[UUID, tuple[int, int]]) -> None:
+        if not rows:
+            return
+        product_ids = sorted(rows)
+        args = [value for product_id in product_ids for value in rows[product_id]]
+        await self._seed(keys=self._keys(product_ids), args=args)
+
+    async def reserve(self, quantities: dict[UUID, int]) -> bool:
+        product_ids = sorted(quantities)
+        args = [quantities[product_id] for product_id in product_ids]
+        return bool(await self._reserve(keys=self._keys(product_ids), args=args))
+
+    async def release(self, quantities: dict[UUID, int], deduct: bool = False) -> int:
+        product_ids = sorted(quantities)
+        args = [int(deduct)] + [quantities[product_id] for product_id in product_ids]
+        return int(await self._release(keys=self._keys(product_ids), args=args))
+
+    async def deduct(self, quantities: dict[UUID, int]) -> None:
+        product_ids = sorted(quantities)
+        args = [quantities[product_id] for product_id in product_ids]
+        await self._deduct(keys=self._keys(product_ids), args=args)
+
+    async def set_quantity(self, product_id: UUID, quantity: int) -> None:
+        await self._set_quantity(keys=self._keys([product_id]), args=[quantity])
+
+    async def adjust_quantity(self, product_id: UUID, delta: int) -> None:
+        await self._adjust_quantity(keys=self._keys([product_id]), args=[delta])
+
+    async def get(self, product_id: UUID) -> tuple[int, int] | None:
+        quantity, reserved = await self._redis.hmget(
+            STOCK_KEY % product_id, ["quantity", "reserved"]
+        )
+        if quantity is None:
+            return None
+        return int(quantity), int(reserved)
+
+    async def drain(self) -> Deltas:
+        flat = await self._drain(keys=[PENDING_KEY])
+        deltas: dict[UUID, list[int]] = {}
+        for field, value in zip(flat[::2], flat[1::2], strict=True):
+            key, _, counter = field.rpartition(":")
+            delta = deltas.setdefault(UUID(key.rpartition(":")[2]), [0, 0])
+            delta[0 if counter == "reserved" else 1] += int(value)
+        return {
+            product_id: (reserved, quantity)
+            for product_id, (reserved, quantity) in deltas.items()
+            if reserved or quantity
+        }
+
+    async def restore(self, deltas: Deltas) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            for product_id, (reserved, quantity) in deltas.items():
+                key = STOCK_KEY % product_id
+                pipe.hincrby(PENDING_KEY, f"{key}:reserved", reserved)
+                pipe.hincrby(PENDING_KEY, f"{key}:quantity", quantity)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def build_store() -> HotStockStore | None:
+    if settings.REDIS_URL:
+        return RedisHotStockStore(settings.REDIS_URL)
+    if settings.HOT_SKU_IDS:
+        # Per-process counters would let every replica sell the same units
+        raise RuntimeError("HOT_SKU_IDS requires REDIS_URL")
+    return None
+
+
+# Counters for flagged products live in the store and are the source of truth
+# for their availability; the database catches up through write-behind
+# flushes. Everything else keeps using guarded UPDATEs on the inventory table.
+class HotStock:
+    def __init__(
+        self,
+        store: HotStockStore | None,
+        product_ids: list[UUID],
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float,
+    ) -> None:
+        if product_ids and store is None:
+            raise RuntimeError("Hot products need a counter store")
+        self._store = store
+        self.product_ids = frozenset(product_ids)
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def store(self) -> HotStockStore:
+        if self._store is None:
+            raise RuntimeError("No hot stock store configured")
+        return self._store
+
+    def is_hot(self, product_id: UUID) -> bool:
+        return product_id in self.product_ids
+
+    def split(
+        self, quantities: dict[UUID, int]
+    ) -> tuple[dict[UUID, int], dict[UUID, int]]:
+        hot: dict[UUID, int] = {}
+        cold: dict[UUID, int] = {}
+        for product_id, amount in quantities.items():
+            (hot if product_id in self.product_ids else cold)[product_id] = amount
+        return hot, cold
+
+    async def flush_once(self) -> int:
+        deltas = await self.store.drain()
+        if not deltas:
+            return 0
+        changes = values(
+            column("product_id", Inventory.product_id.type),
+            column("reserved", Inventory.reserved_quantity.type),
+            column("quantity", Inventory.quantity.type),
+            name="deltas",
+        ).data(
+            [
+                (product_id, reserved, quantity)
+                for product_id, (reserved, quantity) in sorted(deltas.items())
+            ]
+        )
+        try:
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(Inventory)
+                    .where(Inventory.product_id == changes.c.product_id)
+                    .values(
+                        reserved_quantity=func.greatest(
+                            Inventory.reserved_quantity + changes.c.reserved, 0
+                        ),
+                        quantity=func.greatest(
+                            Inventory.quantity + changes.c.quantity, 0
+                        ),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except BaseException:
+            # Put the deltas back so the next flush retries them
+            await self.store.restore(deltas)
+            raise
+        return len(deltas)
+
+    async def reconcile(self) -> None:
+        if not self.product_ids:
+            return
+        # Persist what a previous process left behind, then create any
+        # counters that are missing from the database rows
+        await self.flush_once()
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(
+                    Inventory.product_id,
+                    Inventory.quantity,
+                    Inventory.reserved_quantity,
+                ).where(Inventory.product_id.in_(self.product_ids))
+            )
+            rows = {
+                product_id: (quantity, reserved)
+                for product_id, quantity, reserved in result.all()
+            }
+        await self.store.seed(rows)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush_once()
+            except Exception:
+                logger.exception("Hot stock flush failed")
+
+    async def start(self) -> None:
+        if not self.product_ids:
+            return
+        await self.reconcile()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            # Last flush so a clean shutdown leaves nothing behind
+            await self.flush_once()
+        if self._store is not None:
+            await self._store.close()
+
+    async def overlay(self, inventory: Inventory) -> dict[str, Any] | None:
+        if not self.is_hot(inventory.product_id):
+            return None
+        counters = await self.store.get(inventory.product_id)
+        if counters is None:
+            return None
+        quantity, reserved = counters
+        return {"quantity": quantity, "reserved_quantity": reserved}
+
+
+hot_stock = HotStock(
+    build_store(),
+    settings.HOT_SKU_IDS,
+    SessionLocal,
+    flush_interval=settings.HOT_STOCK_FLUSH_INTERVAL,
+)
@@ -1,11 +1,25 @@
+import logging
 import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Any
 from uuid import UUID
 
+from app.core.config import settings
 from app.models.inventory import Inventory
-from app.schemas.inventory import InventoryCreate
-from sqlalchemy import select
+from app.models.reservation import Reservation
+from app.schemas.inventory import (
+    InventoryCreate,
+    StockReservation,
+    StockReservationBatch,
+)
+from app.services.hot_stock import hot_stock
+from sqlalchemy import Row, Values, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+logger = logging.getLogger(__name__)
+
 
 class InventoryService:
     @staticmethod
@@ -39,44 +53,395 @@ class InventoryService:
         if db_inventory:
             db_inventory.quantity = quantity
             await db.commit()
+            if hot_stock.is_hot(product_id):
+                await hot_stock.store.set_quantity(product_id, quantity)
             await db.refresh(db_inventory)
         return db_inventory
 
+    @staticmethod
+    def _merge_quantities(items: list[StockReservation]) -> dict[UUID, int]:
+        quantities: dict[UUID, int] = {}
+        for item in items:
+            quantities[item.product_id] = (
+                quantities.get(item.product_id, 0) + item.quantity
+            )
+        return quantities
+
+    @staticmethod
+    def _requested(quantities: dict[UUID, int]) -> Values:
+        return values(
+            column("product_id", Inventory.product_id.type),
+            column("quantity", Inventory.quantity.type),
+            name="requested",
+        ).data(sorted(quantities.items()))
+
+    # Each mutation below is a single guarded UPDATE: the availability check
+    # happens inside the statement, so concurrent callers can never oversell
+    # and no row is held locked across a Python round trip. Hot products skip
+    # the database and are changed by the same check in a Redis script.
+
     @staticmethod
     async def reserve_stock(db: AsyncSession, product_id: UUID, quantity: int) -> bool:
-        db_inventory = await InventoryService.get_inventory_by_product(db, product_id)
-        if not db_inventory:
-            return False
+        if hot_stock.is_hot(product_id):
+            return await hot_stock.store.reserve({product_id: quantity})
+        result = await db.execute(
+            update(Inventory)
+            .where(
+                Inventory.product_id == product_id,
+                Inventory.quantity - Inventory.reserved_quantity >= quantity,
+            )
+            .values(reserved_quantity=Inventory.reserved_quantity + quantity)
+            .returning(Inventory.id)
+            .execution_options(synchronize_session=False)
+        )
+        reserved = result.first() is not None
+        await db.commit()
+        return reserved
 
-        if db_inventory.available_quantity >= quantity:
-            db_inventory.reserved_quantity += quantity
-            await db.commit()
-            return True
-        return False
+    @staticmethod
+    async def reserve_stock_many(
+        db: AsyncSession, product_id: UUID, quantities: list[int]
+    ) -> list[bool]:
+        # Group commit for one product: lock the row once, grant requests in
+        # arrival order as the per-request path would, then a single UPDATE
+        # and a single commit for all of them.
+        result = await db.execute(
+            select(Inventory.quantity - Inventory.reserved_quantity)
+            .where(Inventory.product_id == product_id)
+            .with_for_update()
+        )
+        available = result.scalar_one_or_none()
+        if available is None:
+            await db.rollback()
+            return [False] * len(quantities)
+        granted: list[bool] = []
+        total = 0
+        for quantity in quantities:
+            granted.append(total + quantity <= available)
+            if granted[-1]:
+                total += quantity
+        if total:
+            await db.execute(
+                update(Inventory)
+                .where(Inventory.product_id == product_id)
+                .values(reserved_quantity=Inventory.reserved_quantity + total)
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        return granted
 
     @staticmethod
     async def release_stock(db: AsyncSession, product_id: UUID, quantity: int) -> bool:
-        db_inventory = await InventoryService.get_inventory_by_product(db, product_id)
-        if not db_inventory:
-            return False
-
-        db_inventory.reserved_quantity = max(
-            0, db_inventory.reserved_quantity - quantity
+        if hot_stock.is_hot(product_id):
+            return await hot_stock.store.release({product_id: quantity}) > 0
+        result = await db.execute(
+            update(Inventory)
+            .where(Inventory.product_id == product_id)
+            .values(
+                reserved_quantity=func.greatest(
+                    Inventory.reserved_quantity - quantity, 0
+                )
+            )
+            .returning(Inventory.id)
+            .execution_options(synchronize_session=False)
         )
+        released = result.first() is not None
         await db.commit()
-        return True
+        return released
 
     @staticmethod
     async def confirm_stock_deduction(
         db: AsyncSession, product_id: UUID, quantity: int
     ) -> bool:
-        db_inventory = await InventoryService.get_inventory_by_product(db, product_id)
-        if not db_inventory:
+        if hot_stock.is_hot(product_id):
+            released = await hot_stock.store.release(
+                {product_id: quantity}, deduct=True
+            )
+            return released > 0
+        result = await db.execute(
+            update(Inventory)
+            .where(
+                Inventory.product_id == product_id,
+                Inventory.reserved_quantity >= quantity,
+            )
+            .values(
+                reserved_quantity=Inventory.reserved_quantity - quantity,
+                quantity=Inventory.quantity - quantity,
+            )
+            .returning(Inventory.id)
+            .execution_options(synchronize_session=False)
+        )
+        confirmed = result.first() is not None
+        await db.commit()
+        return confirmed
+
+    @staticmethod
+    async def _reserve_rows(db: AsyncSession, quantities: dict[UUID, int]) -> bool:
+        requested = InventoryService._requested(quantities)
+        result = await db.execute(
+            update(Inventory)
+            .where(
+                Inventory.product_id == requested.c.product_id,
+                Inventory.quantity - Inventory.reserved_quantity
+                >= requested.c.quantity,
+            )
+            .values(
+                reserved_quantity=Inventory.reserved_quantity + requested.c.quantity
+            )
+            .returning(Inventory.product_id)
+            .execution_options(synchronize_session=False)
+        )
+        return len(result.all()) == len(quantities)
+
+    @staticmethod
+    async def _reserve_quantities(
+        db: AsyncSession, quantities: dict[UUID, int]
+    ) -> bool:
+        hot, cold = hot_stock.split(quantities)
+        if hot and not await hot_stock.store.reserve(hot):
             return False
+        if cold and not await InventoryService._reserve_rows(db, cold):
+            # Redis is outside the transaction: undo its part by hand
+            if hot:
+                await hot_stock.store.release(hot)
+            return False
+        return True
 
-        if db_inventory.reserved_quantity >= quantity:
-            db_inventory.reserved_quantity -= quantity
-            db_inventory.quantity -= quantity
-            await db.commit()
+    @staticmethod
+    async def _hold(
+        db: AsyncSession, order_id: UUID, quantities: dict[UUID, int]
+    ) -> bool:
+        # Ledger rows first: a redelivered reservation for the same order
+        # conflicts, inserts nothing and so reserves nothing twice.
+        expires_at = datetime.now(timezone.utc) + timedelta(  # noqa: UP017
+            seconds=settings.RESERVATION_TTL_SECONDS
+        )
+        result = await db.execute(
+            insert(Reservation)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "order_id": order_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "expires_at": expires_at,
+                    }
+                    for product_id, quantity in sorted(quantities.items())
+                ]
+            )
+            .on_conflict_do_nothing(constraint="uq_reservations_order_product")
+            .returning(Reservation.product_id, Reservation.quantity)
+        )
+        held = InventoryService._sum_rows(result.all())
+        if not held:
             return True
-        return False
+        return await InventoryService._reserve_quantities(db, held)
+
+    @staticmethod
+    async def _reserve_for(
+        db: AsyncSession, order_id: UUID | None, items: list[StockReservation]
+    ) -> bool:
+        quantities = InventoryService._merge_quantities(items)
+        if order_id is None:
+            # No order to attribute the hold to: counter only, never expires
+            return await InventoryService._reserve_quantities(db, quantities)
+        return await InventoryService._hold(db, order_id, quantities)
+
+    @staticmethod
+    async def reserve_stock_batch(
+        db: AsyncSession, items: list[StockReservation], order_id: UUID | None = None
+    ) -> bool:
+        # All-or-nothing: any line that did not match rolls back the others
+        if not await InventoryService._reserve_for(db, order_id, items):
+            await db.rollback()
+            return False
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def reserve_orders(
+        db: AsyncSession, orders: list[StockReservationBatch]
+    ) -> list[bool]:
+        # One transaction for the whole batch; a savepoint per order keeps
+        # each order all-or-nothing without failing its neighbours.
+        results = []
+        for order in orders:
+            savepoint = await db.begin_nested()
+            if await InventoryService._reserve_for(db, order.order_id, order.items):
+                await savepoint.commit()
+                results.append(True)
+            else:
+                await savepoint.rollback()
+                results.append(False)
+        await db.commit()
+        return results
+
+    @staticmethod
+    def _sum_rows(rows: Iterable[Row[Any]]) -> dict[UUID, int]:
+        quantities: dict[UUID, int] = {}
+        for product_id, quantity in rows:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        return quantities
+
+    @staticmethod
+    async def _unreserve_rows(
+        db: AsyncSession, quantities: dict[UUID, int], deduct: bool
+    ) -> int:
+        requested = InventoryService._requested(quantities)
+        changes: dict[str, Any] = {
+            "reserved_quantity": func.greatest(
+                Inventory.reserved_quantity - requested.c.quantity, 0
+            )
+        }
+        if deduct:
+            # Confirmed holds leave the building: stock goes down as well
+            changes["quantity"] = func.greatest(
+                Inventory.quantity - requested.c.quantity, 0
+            )
+        result = await db.execute(
+            update(Inventory)
+            .where(Inventory.product_id == requested.c.product_id)
+            .values(changes)
+            .returning(Inventory.product_id)
+            .execution_options(synchronize_session=False)
+        )
+        return len(result.all())
+
+    @staticmethod
+    async def _unreserve(
+        db: AsyncSession, quantities: dict[UUID, int], deduct: bool = False
+    ) -> int:
+        hot, cold = hot_stock.split(quantities)
+        matched = 0
+        if hot:
+            matched += await hot_stock.store.release(hot, deduct=deduct)
+        if cold:
+            matched += await InventoryService._unreserve_rows(db, cold, deduct)
+        return matched
+
+    @staticmethod
+    async def release_stock_batch(
+        db: AsyncSession, items: list[StockReservation]
+    ) -> bool:
+        quantities = InventoryService._merge_quantities(items)
+        if await InventoryService._unreserve(db, quantities) != len(quantities):
+            await db.rollback()
+            return False
+        await db.commit()
+        return True
+
+    @staticmethod
+    async def _deduct_rows(db: AsyncSession, quantities: dict[UUID, int]) -> None:
+        requested = InventoryService._requested(quantities)
+        await db.execute(
+            update(Inventory)
+            .where(Inventory.product_id == requested.c.product_id)
+            .values(
+                quantity=func.greatest(Inventory.quantity - requested.c.quantity, 0)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def _deduct(db: AsyncSession, quantities: dict[UUID, int]) -> None:
+        # Takes sold units off stock that no longer holds a reservation
+        hot, cold = hot_stock.split(quantities)
+        if hot:
+            await hot_stock.store.deduct(hot)
+        if cold:
+            await InventoryService._deduct_rows(db, cold)
+
+    @staticmethod
+    async def _take_holds(
+        db: AsyncSession, order_id: UUID
+    ) -> tuple[dict[UUID, int], dict[UUID, int]]:
+        # The order's holds split into those still reserved and those the
+        # sweeper already gave back
+        result = await db.execute(
+            delete(Reservation)
+            .where(Reservation.order_id == order_id)
+            .returning(
+                Reservation.product_id, Reservation.quantity, Reservation.expired_at
+            )
+        )
+        held: dict[UUID, int] = {}
+        expired: dict[UUID, int] = {}
+        for product_id, quantity, expired_at in result.all():
+            holds = held if expired_at is None else expired
+            holds[product_id] = holds.get(product_id, 0) + quantity
+        return held, expired
+
+    @staticmethod
+    async def release_holds(db: AsyncSession, order_id: UUID) -> bool:
+        # Releases exactly what the ledger holds for the order; a second
+        # release finds nothing and changes nothing. Leaves the commit to
+        # the caller.
+        held, _ = await InventoryService._take_holds(db, order_id)
+        if held:
+            await InventoryService._unreserve(db, held)
+        return bool(held)
+
+    @staticmethod
+    async def release_order(db: AsyncSession, order_id: UUID) -> bool:
+        released = await InventoryService.release_holds(db, order_id)
+        await db.commit()
+        return released
+
+    @staticmethod
+    async def confirm_holds(db: AsyncSession, order_id: UUID) -> bool:
+        held, expired = await InventoryService._take_holds(db, order_id)
+        if held:
+            await InventoryService._unreserve(db, held, deduct=True)
+        if expired:
+            # The order completed after its hold lapsed and the units went back
+            # on sale. They were still sold, so they come off stock now.
+            logger.warning("Order %s completed after its reservation expired", order_id)
+            await InventoryService._deduct(db, expired)
+        return bool(held or expired)
+
+    @staticmethod
+    async def confirm_order(db: AsyncSession, order_id: UUID) -> bool:
+        confirmed = await InventoryService.confirm_holds(db, order_id)
+        await db.commit()
+        return confirmed
+
+    @staticmethod
+    async def release_expired(db: AsyncSession, batch_size: int) -> int:
+        expired = (
+            select(Reservation.id)
+            .where(
+                Reservation.expired_at.is_(None), Reservation.expires_at < func.now()
+            )
+            .order_by(Reservation.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(Reservation)
+            .where(Reservation.id.in_(expired.scalar_subquery()))
+            .values(expired_at=func.now())
+            .returning(Reservation.product_id, Reservation.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if rows:
+            await InventoryService._unreserve(db, InventoryService._sum_rows(rows))
+        # Expired holds nobody completed or cancelled within the retention
+        forgotten = (
+            select(Reservation.id)
+            .where(
+                Reservation.expired_at
+                < func.now()
+                - timedelta(seconds=settings.RESERVATION_EXPIRED_RETENTION_SECONDS)
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        await db.execute(
+            delete(Reservation)
+            .where(Reservation.id.in_(forgotten.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return len(rows)
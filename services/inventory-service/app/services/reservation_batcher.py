@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.inventory_service import InventoryService
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+Waiter = tuple[int, "asyncio.Future[bool]"]
+
+
+# Gathers reservations per product for up to `window` seconds (or until
+# `max_size` are waiting) and applies each group in one transaction, so
+# callers queue in memory instead of on the row lock and share a commit.
+class ReservationBatcher:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        window: float,
+        max_size: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self._window = window
+        self._max_size = max_size
+        self._pending: dict[UUID, list[Waiter]] = {}
+        self._timers: dict[UUID, asyncio.TimerHandle] = {}
+        self._flushing: set[asyncio.Task[None]] = set()
+
+    async def reserve(self, product_id: UUID, quantity: int) -> bool:
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future[bool] = loop.create_future()
+        group = self._pending.setdefault(product_id, [])
+        group.append((quantity, waiter))
+        if len(group) == 1:
+            self._timers[product_id] = loop.call_later(
+                self._window, self._dispatch, product_id
+            )
+        if len(group) >= self._max_size:
+            self._dispatch(product_id)
+        return await waiter
+
+    def _dispatch(self, product_id: UUID) -> None:
+        timer = self._timers.pop(product_id, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(product_id, None)
+        if not group:
+            return
+        task = asyncio.create_task(self._apply(product_id, group))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _apply(self, product_id: UUID, group: list[Waiter]) -> None:
+        # Callers cancelled while queued are not reserved for at all
+        group = [(quantity, waiter) for quantity, waiter in group if not waiter.done()]
+        if not group:
+            return
+        try:
+            async with self._session_factory() as db:
+                granted = await InventoryService.reserve_stock_many(
+                    db, product_id, [quantity for quantity, _ in group]
+                )
+        except Exception as exc:
+            for _, waiter in group:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        unclaimed = 0
+        for (quantity, waiter), ok in zip(group, granted, strict=True):
+            if not waiter.done():
+                waiter.set_result(ok)
+            elif ok:
+                unclaimed += quantity
+        if unclaimed:
+            # Granted to callers that were cancelled during the commit: nobody
+            # will release these units, so hand them back now
+            try:
+                async with self._session_factory() as db:
+                    await InventoryService.release_stock(db, product_id, unclaimed)
+            except Exception:
+                logger.exception(
+                    "Failed to release %s unclaimed units of %s", unclaimed, product_id
+                )
+
+    async def stop(self) -> None:
+        # Let every waiting caller finish before the engine goes away
+        for product_id in list(self._pending):
+            self._dispatch(product_id)
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+reservation_batcher = ReservationBatcher(
+    SessionLocal,
+    window=settings.RESERVATION_BATCH_WINDOW_MS / 1000,
+    max_size=settings.RESERVATION_BATCH_MAX_SIZE,
+)
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from contextlib import suppress
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.inventory_service import InventoryService
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+# Releases holds whose order never paid or cancelled (e.g. a crashed saga).
+# Bounded per sweep so it never holds many inventory rows at once.
+class ReservationSweeper:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+        batch_size: int,
+        max_batches: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self._interval = interval
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+        self._task: asyncio.Task[None] | None = None
+
+    async def sweep_once(self) -> int:
+        total = 0
+        for _ in range(self._max_batches):
+            async with self._session_factory() as db:
+                released = await InventoryService.release_expired(db, self._batch_size)
+            total += released
+            if released < self._batch_size:
+                break
+        return total
+
+    async def run(self) -> None:
+        while True:
+            try:
+                released = await self.sweep_once()
+                if released:
+                    logger.info("Released %d expired reservations", released)
+            except Exception:
+                logger.exception("Reservation sweep failed")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+reservation_sweeper = ReservationSweeper(
+    SessionLocal,
+    interval=settings.RESERVATION_SWEEP_INTERVAL,
+    batch_size=settings.RESERVATION_SWEEP_BATCH_SIZE,
+    max_batches=settings.RESERVATION_SWEEP_MAX_BATCHES,
+)
@@ -0,0 +1,83 @@
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.messaging import publisher
+from app.db.session import SessionLocal
+from app.schemas.inventory import StockReservation
+from app.services.allocation import AllocationService
+from app.services.inventory_service import InventoryService
+
+from shared.messaging.rabbitmq import EventConsumer
+from shared.schemas.events import (
+    OrderCancelledEvent,
+    OrderCompletedEvent,
+    OrderCreatedEvent,
+    StockReservationFailedEvent,
+    StockReservedEvent,
+)
+
+QUEUE_NAME = "inventory-service.saga"
+
+
+async def handle_order_created(message: dict[str, Any]) -> None:
+    event = OrderCreatedEvent.model_validate(message)
+    order = event.payload
+    items = [
+        StockReservation(product_id=item.product_id, quantity=item.quantity)
+        for item in order.items
+    ]
+    async with SessionLocal() as db:
+        reserved = await InventoryService.reserve_stock_batch(db, items, order.order_id)
+
+    if reserved:
+        await publisher.publish_async(
+            StockReservedEvent(
+                correlation_id=event.correlation_id,
+                payload={
+                    "order_id": order.order_id,
+                    "user_id": order.user_id,
+                    "total_amount": order.total_amount,
+                    "status": "reserved",
+                },
+            )
+        )
+    else:
+        await publisher.publish_async(
+            StockReservationFailedEvent(
+                correlation_id=event.correlation_id,
+                payload={"order_id": order.order_id, "reason": "out_of_stock"},
+            )
+        )
+
+
+async def handle_order_cancelled(message: dict[str, Any]) -> None:
+    event = OrderCancelledEvent.model_validate(message)
+    order_id = UUID(str(event.payload["order_id"]))
+    async with SessionLocal() as db:
+        # Product holds and location allocations settle in one transaction
+        await InventoryService.release_holds(db, order_id)
+        await AllocationService.settle(db, order_id, deduct=False)
+        await db.commit()
+
+
+async def handle_order_completed(message: dict[str, Any]) -> None:
+    # Paid: the order's holds become a real stock deduction
+    event = OrderCompletedEvent.model_validate(message)
+    order_id = UUID(str(event.payload["order_id"]))
+    async with SessionLocal() as db:
+        await InventoryService.confirm_holds(db, order_id)
+        await AllocationService.settle(db, order_id, deduct=True)
+        await db.commit()
+
+
+def build_consumer() -> EventConsumer:
+    return EventConsumer(
+        settings.RABBITMQ_URL,
+        QUEUE_NAME,
+        {
+            "OrderCreated": handle_order_created,
+            "OrderCancelled": handle_order_cancelled,
+            "OrderCompleted": handle_order_completed,
+        },
+    )
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "inventory_availability"
+
+# Every write path (guarded updates, ledger, batcher, hot stock flushes) and
+# every replica ends in a row change, so the trigger is the one change feed.
+# Postgres folds identical notifications within a transaction and delivers
+# them on commit.
+TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_inventory_availability() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.quantity - OLD.reserved_quantity
+            = NEW.quantity - NEW.reserved_quantity THEN
+            RETURN NULL;
+        END IF;
+        PERFORM pg_notify(
+            '{CHANNEL}',
+            NEW.product_id::text || ':' || (NEW.quantity - NEW.reserved_quantity)
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER inventory_availability_notify
+    AFTER INSERT OR UPDATE OF quantity, reserved_quantity ON inventory
+    FOR EACH ROW EXECUTE FUNCTION notify_inventory_availability()
+    """,
+]
+
+
+async def install_trigger(conn: AsyncConnection) -> None:
+    for statement in TRIGGER_DDL:
+        await conn.execute(text(statement))
+
+
+class Subscription:
+    def __init__(self, product_ids: frozenset[UUID]) -> None:
+        self.product_ids = product_ids
+        self._pending: dict[UUID, int] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, product_id: UUID, available: int) -> None:
+        # Only the latest value per product is kept: a slow reader skips
+        # intermediate values instead of building a backlog
+        self._pending[product_id] = available
+        self._ready.set()
+
+    async def next(self, timeout: float) -> dict[UUID, int]:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        self._ready.clear()
+        changes, self._pending = self._pending, {}
+        return changes
+
+
+class StockFeed:
+    def __init__(self, dsn: str, coalesce_window: float) -> None:
+        self._dsn = dsn
+        self._coalesce_window = coalesce_window
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        self._changed: dict[UUID, int] = {}
+        self._dispatch: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def subscribe(self, product_ids: list[UUID]) -> Subscription:
+        subscription = Subscription(frozenset(product_ids))
+        for product_id in subscription.product_ids:
+            self._subscribers.setdefault(product_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for product_id in subscription.product_ids:
+            subscribers = self._subscribers.get(product_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[product_id]
+
+    def publish(self, product_id: UUID, available: int) -> None:
+        if product_id not in self._subscribers:
+            return
+        # Rapid changes to a product inside the window go out once
+        self._changed[product_id] = available
+        if self._dispatch is None:
+            self._dispatch = asyncio.get_running_loop().call_later(
+                self._coalesce_window, self._fan_out
+            )
+
+    def _fan_out(self) -> None:
+        self._dispatch = None
+        changed, self._changed = self._changed, {}
+        for product_id, available in changed.items():
+            for subscription in self._subscribers.get(product_id, ()):
+                subscription.push(product_id, available)
+
+    def _on_notification(
+        self, connection: Any, pid: int, channel: str, payload: str
+    ) -> None:
+        product_id, _, available = payload.partition(":")
+        try:
+            self.publish(UUID(product_id), int(available))
+        except ValueError:
+            logger.warning("Ignoring malformed availability notification %r", payload)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self._dsn)
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(CHANNEL, self._on_notification)
+            await closed.wait()
+        finally:
+            await connection.close()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+                logger.warning("Availability feed connection closed, reconnecting")
+            except Exception:
+                logger.exception("Availability feed failed, reconnecting")
+            await asyncio.sleep(settings.STOCK_FEED_RECONNECT_DELAY)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+stock_feed = StockFeed(
+    engine.url.set(drivername="postgresql").render_as_string(hide_password=False),
+    coalesce_window=settings.STOCK_FEED_COALESCE_MS / 1000,
+)
@@ -0,0 +1,328 @@
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from enum import Enum
+from typing import Any
+
+from app.core.config import settings
+from app.models.inventory import Inventory
+from app.models.location import LocationStock, Warehouse
+from app.schemas.inventory import StockImportError, StockImportReport, StockImportRow
+from app.services.hot_stock import hot_stock
+from pydantic import ValidationError
+from sqlalchemy import (
+    UUID,
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    exists,
+    func,
+    literal,
+    literal_column,
+    select,
+    union,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
+
+from shared.streaming import iter_lines
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class StockImportFormatError(Exception):
+    pass
+
+
+# Lives for one import transaction only
+staging = Table(
+    "inventory_import",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("product_id", UUID(as_uuid=True), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("location", String, nullable=True),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _csv_header(fields: list[str]) -> list[str]:
+    header = [field.strip().lower() for field in fields]
+    missing = {"product_id", "quantity"} - set(header)
+    if missing:
+        raise StockImportFormatError(
+            f"CSV header is missing {', '.join(sorted(missing))}"
+        )
+    return header
+
+
+async def _records(
+    chunks: AsyncIterable[bytes], import_format: ImportFormat, report: StockImportReport
+) -> AsyncIterator[tuple[Any, ...]]:
+    header: list[str] | None = None
+    async for line_no, raw in iter_lines(chunks, settings.STOCK_IMPORT_MAX_LINE_BYTES):
+        if raw is None:
+            _reject(report, line_no, "Line too long")
+            continue
+        if not raw.strip():
+            continue
+        try:
+            if import_format == ImportFormat.CSV:
+                fields = next(csv.reader([raw.decode()]))
+                if header is None:
+                    header = _csv_header(fields)
+                    continue
+                data: Any = {
+                    column: value or None
+                    for column, value in zip(header, fields, strict=False)
+                }
+            else:
+                data = json.loads(raw)
+            row = StockImportRow.model_validate(data)
+        except (ValueError, ValidationError) as exc:
+            _reject(report, line_no, str(exc))
+            continue
+        report.received += 1
+        yield line_no, row.product_id, row.quantity, row.location
+
+
+def _reject(report: StockImportReport, line_no: int, error: str) -> None:
+    report.rejected += 1
+    if len(report.errors) < settings.STOCK_IMPORT_MAX_REPORTED_ERRORS:
+        report.errors.append(StockImportError(line=line_no, error=error))
+
+
+# A line whose location is a warehouse code counts that warehouse's stock;
+# the product total moves by the difference, as with PUT .../locations/{id}.
+# Any other line sets the product total, which is only allowed for products
+# not stocked per warehouse.
+def _at_warehouse() -> Any:
+    return exists().where(Warehouse.code == staging.c.location)
+
+
+def _per_warehouse() -> Any:
+    return union(
+        select(LocationStock.product_id),
+        select(staging.c.product_id).where(_at_warehouse()),
+    )
+
+
+def _located() -> Any:
+    # Last line wins per product and warehouse
+    return (
+        select(
+            staging.c.product_id,
+            Warehouse.id.label("warehouse_id"),
+            staging.c.quantity,
+        )
+        .join(Warehouse, Warehouse.code == staging.c.location)
+        .distinct(staging.c.product_id, Warehouse.id)
+        .order_by(staging.c.product_id, Warehouse.id, staging.c.line.desc())
+        .subquery("located")
+    )
+
+
+def _counted(upserted: Any) -> Any:
+    # xmax is zero only for rows the statement inserted
+    counts = upserted.returning(
+        literal_column("xmax = 0", Boolean).label("inserted")
+    ).cte("upserted")
+    return select(
+        func.count().filter(counts.c.inserted),
+        func.count().filter(~counts.c.inserted),
+    )
+
+
+def _located_totals() -> Any:
+    # Makes sure every located product has a totals row and locks the ones
+    # that exist, so the deltas below read settled location stock
+    located = _located()
+    upsert = insert(Inventory).from_select(
+        ["id", "product_id", "quantity", "reserved_quantity"],
+        select(
+            func.gen_random_uuid(), located.c.product_id, literal(0), literal(0)
+        ).distinct(located.c.product_id),
+    )
+    return _counted(
+        upsert.on_conflict_do_update(
+            index_elements=[Inventory.product_id],
+            set_={"quantity": Inventory.quantity},
+        )
+    )
+
+
+def _conflicts(limit: int) -> Any:
+    # Lines that would overwrite the total of a product stocked per warehouse
+    return (
+        select(staging.c.line, func.count().over())
+        .where(
+            ~_at_warehouse(),
+            staging.c.product_id.in_(_per_warehouse()),
+        )
+        .order_by(staging.c.line)
+        .limit(limit)
+    )
+
+
+def _merge() -> Any:
+    # Last line wins for a product listed twice: ON CONFLICT may touch each
+    # row only once per statement
+    latest = (
+        select(staging.c.product_id, staging.c.quantity, staging.c.location)
+        .where(~staging.c.product_id.in_(_per_warehouse()))
+        .distinct(staging.c.product_id)
+        .order_by(staging.c.product_id, staging.c.line.desc())
+        .subquery("latest")
+    )
+    upsert = insert(Inventory).from_select(
+        ["id", "product_id", "quantity", "reserved_quantity", "location"],
+        select(
+            func.gen_random_uuid(),
+            latest.c.product_id,
+            latest.c.quantity,
+            literal(0),
+            latest.c.location,
+        ),
+    )
+    return _counted(
+        upsert.on_conflict_do_update(
+            index_elements=[Inventory.product_id],
+            set_={
+                "quantity": upsert.excluded.quantity,
+                "location": func.coalesce(upsert.excluded.location, Inventory.location),
+            },
+        )
+    )
+
+
+def _location_deltas() -> Any:
+    located = _located()
+    return (
+        select(
+            located.c.product_id,
+            func.sum(
+                located.c.quantity - func.coalesce(LocationStock.quantity, 0)
+            ).label("delta"),
+        )
+        .select_from(
+            located.outerjoin(
+                LocationStock,
+                and_(
+                    LocationStock.product_id == located.c.product_id,
+                    LocationStock.warehouse_id == located.c.warehouse_id,
+                ),
+            )
+        )
+        .group_by(located.c.product_id)
+        .subquery("deltas")
+    )
+
+
+def _apply_location_deltas(hot_product_ids: frozenset[Any]) -> Any:
+    # Hot products take the delta on their counters instead
+    deltas = _location_deltas()
+    condition = [Inventory.product_id == deltas.c.product_id, deltas.c.delta != 0]
+    if hot_product_ids:
+        condition.append(Inventory.product_id.not_in(hot_product_ids))
+    return (
+        update(Inventory)
+        .where(*condition)
+        .values(quantity=func.greatest(Inventory.quantity + deltas.c.delta, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _upsert_locations() -> Any:
+    located = _located()
+    upsert = insert(LocationStock).from_select(
+        ["id", "product_id", "warehouse_id", "quantity", "reserved_quantity"],
+        select(
+            func.gen_random_uuid(),
+            located.c.product_id,
+            located.c.warehouse_id,
+            located.c.quantity,
+            literal(0),
+        ),
+    )
+    return upsert.on_conflict_do_update(
+        constraint="uq_locationstocks_product_warehouse",
+        set_={"quantity": upsert.excluded.quantity},
+    )
+
+
+class StockImportService:
+    @staticmethod
+    async def import_stock(
+        db: AsyncSession, chunks: AsyncIterable[bytes], import_format: ImportFormat
+    ) -> StockImportReport:
+        report = StockImportReport()
+        await db.execute(CreateTable(staging))
+        # COPY straight from the request body: rows are validated as they
+        # arrive and never collected in memory
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        if driver is None:
+            raise RuntimeError("Database connection is closed")
+        await driver.copy_records_to_table(
+            staging.name,
+            records=_records(chunks, import_format, report),
+            columns=[column.name for column in staging.columns],
+        )
+        result = await db.execute(_located_totals())
+        report.inserted, report.updated = result.one()
+        result = await db.execute(_conflicts(settings.STOCK_IMPORT_MAX_REPORTED_ERRORS))
+        conflicts = result.all()
+        for line_no, _ in conflicts:
+            _reject(report, line_no, "Product is stocked per warehouse, give its code")
+        if conflicts:
+            # Lines past the reported ones still count
+            skipped = conflicts[0][1]
+            report.rejected += skipped - len(conflicts)
+            report.received -= skipped
+        result = await db.execute(_merge())
+        inserted, updated = result.one()
+        report.inserted += inserted
+        report.updated += updated
+
+        hot_deltas: list[Any] = []
+        imported: list[Any] = []
+        if hot_stock.product_ids:
+            deltas = _location_deltas()
+            result = await db.execute(
+                select(deltas.c.product_id, deltas.c.delta).where(
+                    deltas.c.product_id.in_(hot_stock.product_ids),
+                    deltas.c.delta != 0,
+                )
+            )
+            hot_deltas = result.all()
+        # Totals first: the deltas are taken against the old location stock
+        await db.execute(_apply_location_deltas(hot_stock.product_ids))
+        await db.execute(_upsert_locations())
+        if hot_stock.product_ids:
+            result = await db.execute(
+                select(Inventory.product_id, Inventory.quantity).where(
+                    Inventory.product_id.in_(hot_stock.product_ids),
+                    Inventory.product_id.in_(
+                        select(staging.c.product_id).where(~_at_warehouse())
+                    ),
+                    ~Inventory.product_id.in_(_per_warehouse()),
+                )
+            )
+            imported = result.all()
+        await db.commit()
+        for product_id, quantity in imported:
+            await hot_stock.store.set_quantity(product_id, quantity)
+        for product_id, delta in hot_deltas:
+            await hot_stock.store.adjust_quantity(product_id, delta)
+        return report
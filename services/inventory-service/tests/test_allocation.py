@@ -0,0 +1,224 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.services.allocation import (
+    AllocationStrategy,
+    InsufficientStockError,
+    WarehouseDirectory,
+    plan_allocation,
+)
+from sqlalchemy.dialects import postgresql
+
+P1, P2, P3 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def test_fewest_shipments_prefers_one_warehouse_over_nearer_splits():
+    # Warehouse 1 is closer but only warehouse 0 holds both lines
+    stock = {P1: {0: 5, 1: 5}, P2: {0: 5}}
+
+    plan = plan_allocation(
+        {P1: 2, P2: 2}, stock, [100.0, 1.0], AllocationStrategy.FEWEST_SHIPMENTS
+    )
+
+    assert plan == {0: {P1: 2, P2: 2}}
+    # The caller's index is left untouched
+    assert stock[P1][0] == 5
+
+
+def test_fewest_shipments_covers_lines_greedily():
+    stock = {P1: {0: 5, 2: 5}, P2: {0: 5}, P3: {1: 5}}
+
+    plan = plan_allocation(
+        {P1: 1, P2: 1, P3: 1},
+        stock,
+        [0.0, 0.0, 0.0],
+        AllocationStrategy.FEWEST_SHIPMENTS,
+    )
+
+    assert plan == {0: {P1: 1, P2: 1}, 1: {P3: 1}}
+
+
+def test_fewest_shipments_splits_a_line_no_warehouse_can_ship_alone():
+    stock = {P1: {0: 3, 1: 4, 2: 1}}
+
+    plan = plan_allocation(
+        {P1: 6}, stock, [0.0, 0.0, 0.0], AllocationStrategy.FEWEST_SHIPMENTS
+    )
+
+    assert plan == {1: {P1: 4}, 0: {P1: 2}}
+
+
+def test_nearest_fills_from_the_closest_warehouse():
+    stock = {P1: {0: 5, 1: 2}, P2: {0: 5}}
+
+    plan = plan_allocation(
+        {P1: 3, P2: 1}, stock, [50.0, 5.0], AllocationStrategy.NEAREST
+    )
+
+    assert plan == {1: {P1: 2}, 0: {P1: 1, P2: 1}}
+
+
+def test_plan_reports_short_products():
+    with pytest.raises(InsufficientStockError) as exc:
+        plan_allocation({P1: 3, P2: 1}, {P1: {0: 2}}, [0.0], AllocationStrategy.NEAREST)
+
+    assert set(exc.value.product_ids) == {P1, P2}
+
+
+def _results(*rows):
+    results = []
+    for result_rows in rows:
+        result = MagicMock()
+        result.all.return_value = result_rows
+        result.tuples.return_value.all.return_value = result_rows
+        results.append(result)
+    return results
+
+
+@pytest.fixture
+def directory():
+    fresh = WarehouseDirectory(ttl=60)
+    with patch("app.services.allocation.warehouse_directory", fresh):
+        yield fresh
+
+
+@pytest.mark.asyncio
+async def test_allocate_applies_plan_atomically(client, mock_db_session, directory):
+    near, far = uuid.uuid4(), uuid.uuid4()
+    order_id = uuid.uuid4()
+    mock_db_session.execute.side_effect = _results(
+        [],  # no earlier allocation for the order
+        [(P1, 3)],  # the order's live holds
+        [(far, 0.0, 0.0), (near, 10.0, 10.0)],
+        [(P1, far, 5), (P1, near, 1)],
+        [(uuid.uuid4(),), (uuid.uuid4(),)],  # guarded location update
+        [(uuid.uuid4(),), (uuid.uuid4(),)],  # allocation rows
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/allocations",
+        json={
+            "order_id": str(order_id),
+            "items": [{"product_id": str(P1), "quantity": 3}],
+            "strategy": "nearest",
+            "destination": {"latitude": 10.0, "longitude": 10.0},
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["shipments"] == [
+        {"warehouse_id": str(near), "items": [{"product_id": str(P1), "quantity": 1}]},
+        {"warehouse_id": str(far), "items": [{"product_id": str(P1), "quantity": 2}]},
+    ]
+    statements = [call.args[0] for call in mock_db_session.execute.await_args_list]
+    sql = str(statements[4].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE locationstocks SET reserved_quantity=")
+    assert "locationstocks.quantity - locationstocks.reserved_quantity >=" in sql
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_allocate_retries_then_reports_conflict(
+    client, mock_db_session, directory
+):
+    warehouse = uuid.uuid4()
+    existing, holds, directory_rows, stock, applied = (
+        [],
+        [(P1, 1)],
+        [(warehouse, 0.0, 0.0)],
+        [(P1, warehouse, 5)],
+        [],
+    )
+    # The directory is loaded once and reused by later attempts
+    mock_db_session.execute.side_effect = _results(
+        *(existing, holds, directory_rows, stock, applied),
+        *(existing, holds, stock, applied),
+        *(existing, holds, stock, applied),
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/allocations",
+        json={
+            "order_id": str(uuid.uuid4()),
+            "items": [{"product_id": str(P1), "quantity": 1}],
+        },
+    )
+
+    assert response.status_code == 409
+    assert mock_db_session.rollback.await_count == 3
+    mock_db_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_existing_allocation_is_returned(client, mock_db_session, directory):
+    warehouse, order_id = uuid.uuid4(), uuid.uuid4()
+    mock_db_session.execute.side_effect = _results([(warehouse, P1, 2)])
+
+    response = await client.post(
+        "/api/v1/inventory/allocations",
+        json={
+            "order_id": str(order_id),
+            "items": [{"product_id": str(P1), "quantity": 2}],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["shipments"][0]["warehouse_id"] == str(warehouse)
+    mock_db_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_location_stock_moves_the_total_by_the_difference(
+    client, mock_db_session
+):
+    warehouse = uuid.uuid4()
+    location = MagicMock(
+        id=uuid.uuid4(),
+        product_id=P1,
+        warehouse_id=warehouse,
+        quantity=7,
+        reserved_quantity=0,
+    )
+    mock_db_session.execute.return_value.scalar_one.return_value = location
+    # The location held 10 units before
+    mock_db_session.scalar.return_value = 10
+
+    response = await client.put(
+        f"/api/v1/inventory/{P1}/locations/{warehouse}", json={"quantity": 7}
+    )
+
+    assert response.status_code == 200
+    lock, _, total = (call.args[0] for call in mock_db_session.execute.await_args_list)
+    assert "FOR UPDATE" in str(lock.compile(dialect=postgresql.dialect()))
+    sql = str(total.compile(dialect=postgresql.dialect()))
+    # A delta, so sales already taken off the total stay taken off
+    assert sql.startswith("UPDATE inventory SET quantity=greatest(inventory.quantity +")
+    assert -3 in total.compile(dialect=postgresql.dialect()).params.values()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_allocation_needs_a_live_hold(client, mock_db_session, directory):
+    mock_db_session.execute.side_effect = _results([], [(P1, 1)])
+
+    response = await client.post(
+        "/api/v1/inventory/allocations",
+        json={
+            "order_id": str(uuid.uuid4()),
+            "items": [
+                {"product_id": str(P1), "quantity": 2},
+                {"product_id": str(P2), "quantity": 1},
+            ],
+        },
+    )
+
+    # An allocation only places units the order already holds, so it can
+    # never claim stock the product-wide hold does not account for
+    assert response.status_code == 409
+    assert str(P1) in response.json()["detail"]
+    assert str(P2) in response.json()["detail"]
+    holds = mock_db_session.execute.await_args_list[1].args[0]
+    sql = str(holds.compile(dialect=postgresql.dialect()))
+    assert "reservations.expired_at IS NULL" in sql
+    mock_db_session.commit.assert_not_awaited()
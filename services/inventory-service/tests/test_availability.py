@@ -0,0 +1,92 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from app.services.hot_stock import HotStock
+from sqlalchemy.dialects import postgresql
+
+from shared.cache import TTLCache
+
+
+@pytest.fixture
+def cache():
+    fresh = TTLCache(ttl=60, max_entries=100)
+    with patch("app.services.availability.availability_cache", fresh):
+        yield fresh
+
+
+def _rows(mock_db_session, *rows):
+    mock_db_session.execute.return_value.tuples.return_value.all.return_value = list(
+        rows
+    )
+
+
+@pytest.mark.asyncio
+async def test_availability_uses_one_array_query(client, mock_db_session):
+    first, second, unknown = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    _rows(mock_db_session, (second, 0), (first, 7))
+
+    response = await client.post(
+        "/api/v1/inventory/availability",
+        json={"product_ids": [str(first), str(unknown), str(second), str(first)]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {"product_id": str(first), "available_quantity": 7},
+        {"product_id": str(second), "available_quantity": 0},
+    ]
+    mock_db_session.execute.assert_awaited_once()
+    statement = mock_db_session.execute.await_args.args[0]
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert "inventory.product_id = ANY (%(product_ids)s::UUID[])" in str(compiled)
+    assert compiled.params["product_ids"] == [first, unknown, second]
+
+
+@pytest.mark.asyncio
+async def test_availability_rejects_empty_request(client):
+    response = await client.post(
+        "/api/v1/inventory/availability", json={"product_ids": []}
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_cached_availability_skips_the_query(client, mock_db_session, cache):
+    cached, fresh = uuid.uuid4(), uuid.uuid4()
+    cache.put_many({cached: 3})
+    _rows(mock_db_session, (fresh, 5))
+
+    for _ in range(2):
+        response = await client.post(
+            "/api/v1/inventory/availability",
+            json={"product_ids": [str(cached), str(fresh)]},
+        )
+        assert [item["available_quantity"] for item in response.json()["items"]] == [
+            3,
+            5,
+        ]
+
+    mock_db_session.execute.assert_awaited_once()
+    params = mock_db_session.execute.await_args.args[0].compile().params
+    assert params["product_ids"] == [fresh]
+
+
+@pytest.mark.asyncio
+async def test_hot_products_report_live_counters(
+    client, mock_db_session, hot_stock_store
+):
+    product = uuid.uuid4()
+    hot = HotStock(hot_stock_store, [product], None, flush_interval=1)
+    await hot.store.seed({product: (10, 4)})
+
+    with patch("app.services.availability.hot_stock", hot):
+        response = await client.post(
+            "/api/v1/inventory/availability", json={"product_ids": [str(product)]}
+        )
+
+    assert response.json()["items"] == [
+        {"product_id": str(product), "available_quantity": 6}
+    ]
+    mock_db_session.execute.assert_not_awaited()
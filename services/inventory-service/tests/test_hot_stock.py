@@ -0,0 +1,215 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+from app.services.allocation import AllocationService
+from app.services.hot_stock import (
+    PENDING_KEY,
+    STOCK_KEY,
+    HotStock,
+)
+from app.services.inventory_service import InventoryService
+from sqlalchemy.dialects import postgresql
+
+
+def _hot_stock(session, store, *product_ids):
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return HotStock(store, list(product_ids), session_factory, flush_interval=1)
+
+
+@pytest.mark.asyncio
+async def test_store_reserves_all_or_nothing(redis_hot_stock_store):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    store = redis_hot_stock_store
+    await store.seed({first: (10, 0), second: (3, 0)})
+
+    assert await store.reserve({first: 4, second: 3})
+    assert not await store.reserve({first: 1, second: 1})
+    assert await store.get(first) == (10, 4)
+
+    assert await store.release({first: 2, second: 3}, deduct=True) == 2
+    assert await store.get(first) == (8, 2)
+    assert await store.drain() == {first: (2, -2), second: (0, -3)}
+    assert await store.drain() == {}
+
+
+@pytest.mark.asyncio
+async def test_hot_reservations_skip_the_database(
+    client, mock_db_session, hot_stock_store
+):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, hot_stock_store, product)
+    await hot.store.seed({product: (5, 0)})
+
+    with patch("app.services.inventory_service.hot_stock", hot):
+        ok = await client.post(
+            "/api/v1/inventory/reserve",
+            json={"product_id": str(product), "quantity": 5},
+        )
+        sold_out = await client.post(
+            "/api/v1/inventory/reserve",
+            json={"product_id": str(product), "quantity": 1},
+        )
+
+    assert ok.status_code == 200
+    assert sold_out.status_code == 400
+    mock_db_session.execute.assert_not_awaited()
+    assert await hot.store.get(product) == (5, 5)
+
+
+@pytest.mark.asyncio
+async def test_mixed_batch_undoes_hot_part_when_rows_fail(
+    client, mock_db_session, hot_stock_store
+):
+    hot_product, cold_product = uuid.uuid4(), uuid.uuid4()
+    hot = _hot_stock(mock_db_session, hot_stock_store, hot_product)
+    await hot.store.seed({hot_product: (5, 0)})
+    # The cold line finds no stock
+    mock_db_session.execute.return_value.all.return_value = []
+
+    with patch("app.services.inventory_service.hot_stock", hot):
+        response = await client.post(
+            "/api/v1/inventory/reserve/batch",
+            json={
+                "items": [
+                    {"product_id": str(hot_product), "quantity": 2},
+                    {"product_id": str(cold_product), "quantity": 2},
+                ]
+            },
+        )
+
+    assert response.status_code == 400
+    assert await hot.store.get(hot_product) == (5, 0)
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_deltas_behind(mock_db_session, hot_stock_store):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, hot_stock_store, product)
+    await hot.store.seed({product: (10, 0)})
+    await hot.store.reserve({product: 3})
+
+    assert await hot.flush_once() == 1
+
+    statement = mock_db_session.execute.await_args.args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE inventory SET")
+    assert "FROM (VALUES" in sql
+    mock_db_session.commit.assert_awaited_once()
+    assert await hot.flush_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_deltas(mock_db_session, hot_stock_store):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, hot_stock_store, product)
+    await hot.store.seed({product: (10, 0)})
+    await hot.store.reserve({product: 3})
+    mock_db_session.commit.side_effect = ConnectionError
+
+    with pytest.raises(ConnectionError):
+        await hot.flush_once()
+
+    assert await hot.store.drain() == {product: (3, 0)}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_seeds_from_database_plus_pending(
+    mock_db_session, redis_hot_stock_store
+):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, redis_hot_stock_store, product)
+    mock_db_session.execute.return_value.all.return_value = [(product, 20, 4)]
+
+    await hot.reconcile()
+
+    assert await hot.store.get(product) == (20, 4)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_live_counters(mock_db_session, redis_hot_stock_store):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, redis_hot_stock_store, product)
+    await hot.store.seed({product: (20, 0)})
+    # Another replica sold units since; this one read the row before that
+    await hot.store.reserve({product: 5})
+    await hot.store.release({product: 5}, deduct=True)
+    mock_db_session.execute.return_value.all.return_value = [(product, 20, 0)]
+
+    await hot.reconcile()
+
+    assert await hot.store.get(product) == (15, 0)
+
+
+@pytest.mark.asyncio
+async def test_hot_confirm_without_reservation_is_rejected(
+    mock_db_session, redis_hot_stock_store
+):
+    product = uuid.uuid4()
+    hot = _hot_stock(mock_db_session, redis_hot_stock_store, product)
+    await hot.store.seed({product: (10, 1)})
+
+    with patch("app.services.inventory_service.hot_stock", hot):
+        confirmed = await InventoryService.confirm_stock_deduction(
+            mock_db_session, product, 3
+        )
+
+    # Same as the guarded SQL confirm: nothing reserved, nothing deducted
+    assert not confirmed
+    assert await hot.store.get(product) == (10, 1)
+    assert await hot.store.drain() == {}
+
+
+@pytest.mark.asyncio
+async def test_hot_stock_requires_a_store():
+    with pytest.raises(RuntimeError):
+        HotStock(None, [uuid.uuid4()], None, flush_interval=1)
+
+
+@pytest.mark.asyncio
+async def test_redis_store_scripts_keep_pending_deltas(redis_hot_stock_store):
+    product, unknown = uuid.uuid4(), uuid.uuid4()
+    store = redis_hot_stock_store
+    await store.seed({product: (10, 2)})
+
+    await store.deduct({product: 3, unknown: 1})
+    await store.adjust_quantity(product, -20)
+    assert await store.get(product) == (0, 2)
+    assert await store.get(unknown) is None
+
+    # An absolute quantity overrides, and drops, any pending stock delta
+    await store.set_quantity(product, 6)
+    await store.adjust_quantity(product, 1)
+    assert await store.get(product) == (7, 2)
+    assert await store._redis.hgetall(PENDING_KEY) == {
+        f"{STOCK_KEY % product}:quantity": "1"
+    }
+
+    deltas = await store.drain()
+    assert deltas == {product: (0, 1)}
+    await store.restore(deltas)
+    assert await store.drain() == {product: (0, 1)}
+
+
+@pytest.mark.asyncio
+async def test_hot_location_stock_adjusts_the_counters(
+    mock_db_session, redis_hot_stock_store
+):
+    product, warehouse = uuid.uuid4(), uuid.uuid4()
+    hot = _hot_stock(mock_db_session, redis_hot_stock_store, product)
+    await hot.store.seed({product: (10, 2)})
+    mock_db_session.scalar.return_value = 4
+
+    with patch("app.services.allocation.hot_stock", hot):
+        await AllocationService.set_location_stock(
+            mock_db_session, product, warehouse, 1
+        )
+
+    # Lock and upsert only: the total row catches up on the next flush
+    assert mock_db_session.execute.await_count == 2
+    assert await hot.store.get(product) == (7, 2)
+    assert await hot.store.drain() == {product: (0, -3)}
@@ -1,7 +1,10 @@
 import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from app.models.inventory import Inventory
+from app.services.inventory_service import InventoryService
+from sqlalchemy.dialects import postgresql
 
 
 @pytest.mark.asyncio
@@ -28,26 +31,28 @@ async def test_create_inventory(client, mock_db_session):
     assert response.json()["reserved_quantity"] == 0
 
 
+def _compile(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
 @pytest.mark.asyncio
 async def test_reserve_stock(client, mock_db_session):
     product_id = str(uuid.uuid4())
     reservation_data = {"product_id": product_id, "quantity": 10}
 
-    # Mock existing inventory
-    mock_inventory = Inventory(
-        id=uuid.uuid4(),
-        product_id=uuid.UUID(product_id),
-        quantity=100,
-        reserved_quantity=0,
-    )
-    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
-        mock_inventory
-    )
+    # Guarded UPDATE matched the row
+    mock_db_session.execute.return_value.first.return_value = (uuid.uuid4(),)
 
     response = await client.post("/api/v1/inventory/reserve", json=reservation_data)
     assert response.status_code == 200
     assert response.json()["status"] == "success"
-    assert mock_inventory.reserved_quantity == 10
+
+    mock_db_session.execute.assert_awaited_once()
+    sql = _compile(mock_db_session.execute.await_args.args[0])
+    assert sql.startswith("UPDATE inventory SET reserved_quantity=")
+    assert "inventory.quantity - inventory.reserved_quantity >=" in sql
+    assert "RETURNING" in sql
+    mock_db_session.commit.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -55,17 +60,217 @@ async def test_reserve_stock_insufficient(client, mock_db_session):
     product_id = str(uuid.uuid4())
     reservation_data = {"product_id": product_id, "quantity": 110}
 
-    # Mock existing inventory
-    mock_inventory = Inventory(
-        id=uuid.uuid4(),
-        product_id=uuid.UUID(product_id),
-        quantity=100,
-        reserved_quantity=0,
-    )
-    mock_db_session.execute.return_value.scalar_one_or_none.return_value = (
-        mock_inventory
-    )
+    # Guarded UPDATE matched nothing: not enough stock (or unknown product)
+    mock_db_session.execute.return_value.first.return_value = None
 
     response = await client.post("/api/v1/inventory/reserve", json=reservation_data)
     assert response.status_code == 400
     assert "Insufficient stock" in response.json()["detail"]
+
+
+def _results(*rows):
+    results = []
+    for result_rows in rows:
+        result = MagicMock()
+        result.all.return_value = result_rows
+        results.append(result)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_reserve_stock_batch(client, mock_db_session):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    order_id = uuid.uuid4()
+    # Ledger rows inserted, then the guarded counter update
+    mock_db_session.execute.side_effect = _results(
+        [(first, 3), (second, 4)], [(first,), (second,)]
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/reserve/batch",
+        json={
+            "order_id": str(order_id),
+            "items": [
+                {"product_id": str(first), "quantity": 2},
+                {"product_id": str(second), "quantity": 4},
+                {"product_id": str(first), "quantity": 1},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    assert mock_db_session.execute.await_count == 2
+    hold, statement = (call.args[0] for call in mock_db_session.execute.await_args_list)
+    hold_sql = _compile(hold)
+    assert hold_sql.startswith("INSERT INTO reservations")
+    assert "ON CONFLICT ON CONSTRAINT uq_reservations_order_product DO NOTHING" in (
+        hold_sql
+    )
+    assert "FROM (VALUES" in _compile(statement)
+    params = statement.compile(dialect=postgresql.dialect()).params
+    assert sorted(params.values(), key=str) == sorted([first, 3, second, 4], key=str)
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reserve_stock_batch_redelivery_reserves_nothing(client, mock_db_session):
+    # Every ledger row already exists for this order
+    mock_db_session.execute.side_effect = _results([])
+
+    response = await client.post(
+        "/api/v1/inventory/reserve/batch",
+        json={
+            "order_id": str(uuid.uuid4()),
+            "items": [{"product_id": str(uuid.uuid4()), "quantity": 2}],
+        },
+    )
+
+    assert response.status_code == 200
+    mock_db_session.execute.assert_awaited_once()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_release_batch_releases_the_order_ledger(client, mock_db_session):
+    product = uuid.uuid4()
+    mock_db_session.execute.side_effect = _results(
+        [(product, 2, None), (product, 1, None)], [], []
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/release/batch",
+        json={
+            "order_id": str(uuid.uuid4()),
+            "items": [{"product_id": str(product), "quantity": 99}],
+        },
+    )
+
+    assert response.status_code == 200
+    take, release, settle = (
+        call.args[0] for call in mock_db_session.execute.await_args_list
+    )
+    assert _compile(take).startswith("DELETE FROM reservations")
+    # The ledger quantity wins over whatever the caller sent
+    params = release.compile(dialect=postgresql.dialect()).params
+    assert {product, 3} <= set(params.values())
+    assert "reserved_quantity=greatest(" in _compile(release)
+    # Location allocations made from the hold go with it, in the same commit
+    assert _compile(settle).startswith("DELETE FROM locationallocations")
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_release_expired_skips_locked_holds(mock_db_session):
+    product = uuid.uuid4()
+    mock_db_session.execute.side_effect = _results([(product, 4)], [(product,)], [])
+
+    released = await InventoryService.release_expired(mock_db_session, 100)
+
+    assert released == 1
+    expire, release, forget = (
+        _compile(call.args[0]) for call in mock_db_session.execute.await_args_list
+    )
+    # Expired holds are marked, not deleted, so a late completion finds them
+    assert expire.startswith("UPDATE reservations SET expired_at=now()")
+    assert "reservations.expired_at IS NULL" in expire
+    assert "reservations.expires_at < now()" in expire
+    assert "FOR UPDATE SKIP LOCKED" in expire
+    assert "reserved_quantity=greatest(" in release
+    assert forget.startswith("DELETE FROM reservations")
+    assert "reservations.expired_at < now() - " in forget
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_order_completed_after_hold_expired_still_deducts(mock_db_session):
+    held, lapsed = uuid.uuid4(), uuid.uuid4()
+    # The sweeper released the hold on one product before the order completed
+    mock_db_session.execute.side_effect = _results(
+        [(held, 2, None), (lapsed, 3, datetime.now(timezone.utc))],  # noqa: UP017
+        [(held,)],
+        [],
+    )
+
+    assert await InventoryService.confirm_order(mock_db_session, uuid.uuid4())
+
+    take, confirm, deduct = (
+        call.args[0] for call in mock_db_session.execute.await_args_list
+    )
+    assert _compile(take).startswith("DELETE FROM reservations")
+    # The live hold is released and deducted as usual
+    assert "reserved_quantity=greatest(" in _compile(confirm)
+    assert {held, 2} <= set(
+        confirm.compile(dialect=postgresql.dialect()).params.values()
+    )
+    # The lapsed one was already unreserved: only stock goes down
+    deduct_sql = _compile(deduct)
+    assert "SET quantity=greatest(inventory.quantity - requested.quantity" in deduct_sql
+    assert "reserved_quantity" not in deduct_sql
+    params = deduct.compile(dialect=postgresql.dialect()).params
+    assert {lapsed, 3} <= set(params.values())
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_order_completed_redelivery_deducts_nothing(mock_db_session):
+    mock_db_session.execute.side_effect = _results([])
+
+    assert not await InventoryService.confirm_order(mock_db_session, uuid.uuid4())
+    mock_db_session.execute.assert_awaited_once()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reserve_stock_batch_is_all_or_nothing(client, mock_db_session):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    # Only one of the two lines had enough stock
+    mock_db_session.execute.return_value.all.return_value = [(first,)]
+
+    response = await client.post(
+        "/api/v1/inventory/reserve/batch",
+        json={
+            "items": [
+                {"product_id": str(first), "quantity": 2},
+                {"product_id": str(second), "quantity": 2},
+            ],
+        },
+    )
+
+    assert response.status_code == 400
+    mock_db_session.commit.assert_not_awaited()
+    mock_db_session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reserve_orders_isolates_each_order(client, mock_db_session):
+    product = uuid.uuid4()
+    first_order, second_order = uuid.uuid4(), uuid.uuid4()
+    savepoint = AsyncMock()
+    mock_db_session.begin_nested.return_value = savepoint
+    # The second order finds no stock left for its line
+    mock_db_session.execute.side_effect = _results(
+        [(product, 5)], [(product,)], [(product, 5)], []
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/reserve/orders",
+        json={
+            "orders": [
+                {
+                    "order_id": str(order_id),
+                    "items": [{"product_id": str(product), "quantity": 5}],
+                }
+                for order_id in (first_order, second_order)
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"order_id": str(first_order), "reserved": True},
+        {"order_id": str(second_order), "reserved": False},
+    ]
+    assert mock_db_session.begin_nested.await_count == 2
+    savepoint.commit.assert_awaited_once()
+    savepoint.rollback.assert_awaited_once()
+    mock_db_session.commit.assert_awaited_once()
@@ -0,0 +1,151 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.inventory_service import InventoryService
+from app.services.reservation_batcher import ReservationBatcher
+from sqlalchemy.dialects import postgresql
+
+
+def _batcher(session, window=0.01, max_size=64):
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return ReservationBatcher(session_factory, window=window, max_size=max_size)
+
+
+def _grant_all(db, product_id, quantities):
+    return [True] * len(quantities)
+
+
+@pytest.mark.asyncio
+async def test_reserve_many_grants_in_arrival_order(mock_db_session):
+    product = uuid.uuid4()
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = 5
+
+    granted = await InventoryService.reserve_stock_many(
+        mock_db_session, product, [3, 4, 2]
+    )
+
+    assert granted == [True, False, True]
+    lock, apply = (call.args[0] for call in mock_db_session.execute.await_args_list)
+    assert "FOR UPDATE" in str(lock.compile(dialect=postgresql.dialect()))
+    assert 5 in apply.compile(dialect=postgresql.dialect()).params.values()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_callers_per_product(mock_db_session):
+    hot, other = uuid.uuid4(), uuid.uuid4()
+    batcher = _batcher(mock_db_session)
+
+    with patch.object(
+        InventoryService,
+        "reserve_stock_many",
+        new_callable=AsyncMock,
+        side_effect=lambda db, product_id, quantities: [
+            quantity < 3 for quantity in quantities
+        ],
+    ) as mock_many:
+        results = await asyncio.gather(
+            batcher.reserve(hot, 1),
+            batcher.reserve(hot, 5),
+            batcher.reserve(other, 2),
+            batcher.reserve(hot, 2),
+        )
+
+    assert results == [True, False, True, True]
+    calls = {call.args[1]: call.args[2] for call in mock_many.await_args_list}
+    assert calls == {hot: [1, 5, 2], other: [2]}
+
+
+@pytest.mark.asyncio
+async def test_full_batch_does_not_wait_for_the_window(mock_db_session):
+    product = uuid.uuid4()
+    batcher = _batcher(mock_db_session, window=60, max_size=2)
+
+    with patch.object(
+        InventoryService,
+        "reserve_stock_many",
+        new_callable=AsyncMock,
+        side_effect=_grant_all,
+    ):
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.reserve(product, 1), batcher.reserve(product, 1)),
+            timeout=1,
+        )
+
+    assert results == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller(mock_db_session):
+    product = uuid.uuid4()
+    batcher = _batcher(mock_db_session)
+
+    with patch.object(
+        InventoryService,
+        "reserve_stock_many",
+        new_callable=AsyncMock,
+        side_effect=ConnectionError,
+    ):
+        results = await asyncio.gather(
+            batcher.reserve(product, 1),
+            batcher.reserve(product, 1),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_caller_cancelled_in_the_window_is_not_reserved(mock_db_session):
+    product = uuid.uuid4()
+    batcher = _batcher(mock_db_session, window=0.05)
+
+    with patch.object(
+        InventoryService,
+        "reserve_stock_many",
+        new_callable=AsyncMock,
+        side_effect=_grant_all,
+    ) as mock_many:
+        gone = asyncio.create_task(batcher.reserve(product, 4))
+        kept = asyncio.create_task(batcher.reserve(product, 1))
+        await asyncio.sleep(0)
+        gone.cancel()
+        assert await kept
+
+    mock_many.assert_awaited_once_with(mock_db_session, product, [1])
+
+
+@pytest.mark.asyncio
+async def test_grant_for_caller_cancelled_during_commit_is_released(
+    mock_db_session,
+):
+    product = uuid.uuid4()
+    batcher = _batcher(mock_db_session)
+    committing, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow_commit(db, product_id, quantities):
+        committing.set()
+        await cancelled.wait()
+        return [True] * len(quantities)
+
+    with (
+        patch.object(InventoryService, "reserve_stock_many", side_effect=slow_commit),
+        patch.object(
+            InventoryService, "release_stock", new_callable=AsyncMock
+        ) as mock_release,
+    ):
+        gone = asyncio.create_task(batcher.reserve(product, 4))
+        kept = asyncio.create_task(batcher.reserve(product, 1))
+        await committing.wait()
+        gone.cancel()
+        cancelled.set()
+        assert await kept
+        await batcher.stop()
+
+    mock_release.assert_awaited_once_with(mock_db_session, product, 4)
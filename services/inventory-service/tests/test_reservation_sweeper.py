@@ -0,0 +1,41 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.services.reservation_sweeper import ReservationSweeper
+
+
+def _sweeper(session, batch_size=10, max_batches=3):
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return ReservationSweeper(
+        session_factory, interval=30, batch_size=batch_size, max_batches=max_batches
+    )
+
+
+@pytest.mark.asyncio
+async def test_sweeper_stops_when_caught_up(mock_db_session):
+    with patch(
+        "app.services.reservation_sweeper.InventoryService.release_expired",
+        new_callable=AsyncMock,
+        side_effect=[10, 4, 10],
+    ) as mock_release:
+        released = await _sweeper(mock_db_session).sweep_once()
+
+    assert released == 14
+    assert mock_release.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_sweeper_bounds_batches_per_sweep(mock_db_session):
+    with patch(
+        "app.services.reservation_sweeper.InventoryService.release_expired",
+        new_callable=AsyncMock,
+        return_value=10,
+    ) as mock_release:
+        released = await _sweeper(mock_db_session, max_batches=3).sweep_once()
+
+    assert released == 30
+    assert mock_release.await_count == 3
@@ -0,0 +1,95 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services import saga
+
+from shared.schemas.events import OrderCreatedEvent, OrderItem, OrderPayload
+
+
+@pytest.fixture
+def session_factory(mock_db_session):
+    @asynccontextmanager
+    async def _session():
+        yield mock_db_session
+
+    return _session
+
+
+def _order_created() -> OrderCreatedEvent:
+    order_id = uuid.uuid4()
+    return OrderCreatedEvent(
+        correlation_id=order_id,
+        payload=OrderPayload(
+            order_id=order_id,
+            user_id=uuid.uuid4(),
+            items=[OrderItem(product_id=uuid.uuid4(), quantity=3, price=2.0)],
+            total_amount=6.0,
+            status="pending",
+        ),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("reserved", "expected_event"),
+    [(True, "StockReserved"), (False, "StockReservationFailed")],
+)
+async def test_order_created_reserves_stock(session_factory, reserved, expected_event):
+    event = _order_created()
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga, "publisher", MagicMock(publish_async=AsyncMock())) as pub,
+        patch.object(
+            saga.InventoryService,
+            "reserve_stock_batch",
+            new_callable=AsyncMock,
+            return_value=reserved,
+        ) as mock_reserve,
+    ):
+        await saga.handle_order_created(event.model_dump(mode="json"))
+
+    items = mock_reserve.await_args.args[1]
+    assert [(item.product_id, item.quantity) for item in items] == [
+        (event.payload.items[0].product_id, 3)
+    ]
+    published = pub.publish_async.await_args.args[0]
+    assert published.event_type == expected_event
+    assert published.correlation_id == event.correlation_id
+    assert published.payload["order_id"] == event.payload.order_id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("handler", "event_type", "method", "deduct"),
+    [
+        (saga.handle_order_cancelled, "OrderCancelled", "release_holds", False),
+        (saga.handle_order_completed, "OrderCompleted", "confirm_holds", True),
+    ],
+)
+async def test_order_outcome_settles_the_ledger(
+    session_factory, mock_db_session, handler, event_type, method, deduct
+):
+    order_id = uuid.uuid4()
+    message = {
+        "event_type": event_type,
+        "correlation_id": str(order_id),
+        "payload": {"order_id": str(order_id)},
+    }
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga.InventoryService, method, new_callable=AsyncMock) as mock,
+        patch.object(
+            saga.AllocationService, "settle", new_callable=AsyncMock
+        ) as mock_allocation,
+    ):
+        await handler(message)
+
+    assert mock.await_args.args[1] == order_id
+    assert mock_allocation.await_args.args[1] == order_id
+    assert mock_allocation.await_args.kwargs == {"deduct": deduct}
+    # Product and location changes land together or not at all
+    mock_db_session.commit.assert_awaited_once()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.api.v1.endpoints.inventory import stream_availability
+from app.services.stock_feed import StockFeed
+
+
+@pytest.fixture
+def feed():
+    fresh = StockFeed("postgresql://unused", coalesce_window=0.01)
+    with patch("app.api.v1.endpoints.inventory.stock_feed", fresh):
+        yield fresh
+
+
+@pytest.mark.asyncio
+async def test_feed_coalesces_rapid_changes(feed):
+    product, other = uuid.uuid4(), uuid.uuid4()
+    subscription = feed.subscribe([product])
+
+    for available in (9, 8, 7):
+        feed.publish(product, available)
+    feed.publish(other, 1)
+
+    assert await subscription.next(timeout=1) == {product: 7}
+
+
+@pytest.mark.asyncio
+async def test_feed_fans_out_one_change_to_every_subscriber(feed):
+    product = uuid.uuid4()
+    first, second = feed.subscribe([product]), feed.subscribe([product])
+    feed.unsubscribe(second)
+
+    feed._on_notification(None, 0, "inventory_availability", f"{product}:4")
+
+    assert await first.next(timeout=1) == {product: 4}
+    assert await second.next(timeout=0.05) == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_then_changes(feed, mock_db_session):
+    product = uuid.uuid4()
+    with patch(
+        "app.api.v1.endpoints.inventory.AvailabilityService.lookup",
+        new_callable=AsyncMock,
+        return_value={product: 5},
+    ):
+        response = await stream_availability(product_ids=[product], db=mock_db_session)
+
+    assert response.media_type == "text/event-stream"
+    events = response.body_iterator
+    snapshot = await events.__anext__()
+    assert snapshot.startswith("event: availability\n")
+    feed.publish(product, 2)
+    change = await asyncio.wait_for(events.__anext__(), timeout=1)
+    data = json.loads(change.split("data: ", 1)[1])
+    assert data == [{"product_id": str(product), "available_quantity": 2}]
+
+    await events.aclose()
+    assert feed._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_limits_products(client):
+    response = await client.get(
+        "/api/v1/inventory/availability/stream",
+        params={"product_ids": [str(uuid.uuid4()) for _ in range(101)]},
+    )
+
+    assert response.status_code == 400
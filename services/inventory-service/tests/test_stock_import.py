@@ -0,0 +1,148 @@
+import json
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+
+@pytest.fixture
+def copied(mock_db_session):
+    rows = []
+
+    async def copy_records_to_table(table, records, columns):
+        assert table == "inventory_import"
+        assert columns == ["line", "product_id", "quantity", "location"]
+        async for record in records:
+            rows.append(record)
+
+    driver = MagicMock()
+    driver.copy_records_to_table = AsyncMock(side_effect=copy_records_to_table)
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(
+        return_value=MagicMock(driver_connection=driver)
+    )
+    mock_db_session.connection.return_value = connection
+    return rows
+
+
+def _compile(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _results(located=(0, 0), conflicts=(), merged=(0, 0)):
+    # create, located totals, conflicts, merge, location deltas, locations
+    totals, conflicting, merge = MagicMock(), MagicMock(), MagicMock()
+    totals.one.return_value = located
+    conflicting.all.return_value = list(conflicts)
+    merge.one.return_value = merged
+    return [MagicMock(), totals, conflicting, merge, MagicMock(), MagicMock()]
+
+
+@pytest.mark.asyncio
+async def test_csv_import_copies_then_merges(client, mock_db_session, copied):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    mock_db_session.execute.side_effect = _results(merged=(1, 1))
+    body = (
+        "product_id,quantity,location\n"
+        f"{first},10,Warehouse A\n"
+        "not-a-uuid,3,\n"
+        f"{second},-1,\n"
+        f"{second},7,\n"
+    )
+
+    response = await client.post(
+        "/api/v1/inventory/import",
+        params={"format": "csv"},
+        content=body.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert {key: report[key] for key in ("received", "inserted", "updated")} == {
+        "received": 2,
+        "inserted": 1,
+        "updated": 1,
+    }
+    assert report["rejected"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert copied == [(2, first, 10, "Warehouse A"), (5, second, 7, None)]
+
+    create, _, _, merge, _, _ = (
+        call.args[0] for call in mock_db_session.execute.await_args_list
+    )
+    assert _compile(create).startswith("\nCREATE TEMPORARY TABLE inventory_import")
+    sql = _compile(merge)
+    assert "DISTINCT ON (inventory_import.product_id)" in sql
+    assert "ON CONFLICT (product_id) DO UPDATE" in sql
+    # Products stocked per warehouse keep their total out of the merge
+    assert "NOT IN (SELECT locationstocks.product_id" in sql
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_warehouse_lines_update_locations_and_move_totals(
+    client, mock_db_session, copied
+):
+    product = uuid.uuid4()
+    mock_db_session.execute.side_effect = _results(located=(0, 1), conflicts=[(3, 1)])
+    body = "product_id,quantity,location\n" f"{product},10,WH-1\n" f"{product},4,\n"
+
+    response = await client.post(
+        "/api/v1/inventory/import",
+        params={"format": "csv"},
+        content=body.encode(),
+    )
+
+    report = response.json()
+    assert (report["received"], report["updated"], report["rejected"]) == (1, 1, 1)
+    assert [error["line"] for error in report["errors"]] == [3]
+    _, totals, _, _, deltas, locations = (
+        _compile(call.args[0]) for call in mock_db_session.execute.await_args_list
+    )
+    assert "JOIN warehouses ON warehouses.code = inventory_import.location" in totals
+    # The total moves by what the locations gained or lost
+    assert deltas.startswith(
+        "UPDATE inventory SET quantity=greatest(inventory.quantity + deltas.delta"
+    )
+    assert "coalesce(locationstocks.quantity" in deltas
+    assert locations.startswith("INSERT INTO locationstocks")
+    assert "ON CONFLICT ON CONSTRAINT uq_locationstocks_product_warehouse" in locations
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import(client, mock_db_session, copied):
+    product = uuid.uuid4()
+    mock_db_session.execute.side_effect = _results(merged=(1, 0))
+    lines = [
+        json.dumps({"product_id": str(product), "quantity": 4}),
+        "{broken",
+        "",
+    ]
+
+    response = await client.post(
+        "/api/v1/inventory/import",
+        params={"format": "ndjson"},
+        content="\n".join(lines).encode(),
+    )
+
+    assert response.json()["received"] == 1
+    assert response.json()["rejected"] == 1
+    assert copied == [(1, product, 4, None)]
+
+
+@pytest.mark.asyncio
+async def test_csv_without_required_columns_is_rejected(
+    client, mock_db_session, copied
+):
+    response = await client.post(
+        "/api/v1/inventory/import",
+        params={"format": "csv"},
+        content=b"sku,stock\nabc,1\n",
+    )
+
+    assert response.status_code == 400
+    assert "product_id, quantity" in response.json()["detail"]
+    mock_db_session.commit.assert_not_awaited()
@@ -1,28 +1,165 @@
-from typing import Any
+import hashlib
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import Any, Literal
 from uuid import UUID
 
+from app.core.config import settings
 from app.db.session import get_db
-from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
+from app.schemas.order import (
+    OrderCreate,
+    OrderResponse,
+    OrderSummaryResponse,
+    OrderUpdate,
+)
+from app.services.bulk_orders import BulkOrderService
+from app.services.idempotency import (
+    IdempotencyKeyInUseError,
+    IdempotencyKeyMismatchError,
+    IdempotencyKeysUnavailableError,
+    idempotency,
+)
+from app.services.order_export import OrderExportService
 from app.services.order_service import OrderService
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.services.pricing import (
+    PriceLookupUnavailableError,
+    PricingService,
+    UnknownProductsError,
+)
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
 from shared.enums.status import OrderStatus
 
 router = APIRouter()
 
 
-@router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_order(
-    *, db: AsyncSession = Depends(get_db), order_in: OrderCreate
-) -> Any:
+async def _submit_order(db: AsyncSession, order_in: OrderCreate) -> tuple[int, Any]:
+    try:
+        order_in = await PricingService.price_order(order_in)
+    except UnknownProductsError as exc:
+        return status.HTTP_400_BAD_REQUEST, {"detail": f"Unknown products: {exc}"}
+    except PriceLookupUnavailableError:
+        return status.HTTP_503_SERVICE_UNAVAILABLE, {
+            "detail": "Product catalog unavailable, retry later"
+        }
+
+    if settings.ORDER_SAGA_ASYNC:
+        order = await OrderService.place_order(db, order_in)
+        return status.HTTP_202_ACCEPTED, jsonable_encoder(
+            OrderResponse.model_validate(order)
+        )
+
     order = await OrderService.create_order(db, order_in)
     if order.status == OrderStatus.FAILED:
-        raise HTTPException(
-            status_code=400,
-            detail="Order creation failed (insufficient stock or payment failure)",
+        return status.HTTP_400_BAD_REQUEST, {
+            "detail": "Order creation failed (insufficient stock or payment failure)"
+        }
+    return status.HTTP_201_CREATED, jsonable_encoder(
+        OrderResponse.model_validate(order)
+    )
+
+
+@router.post(
+    "/",
+    response_model=OrderResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": OrderResponse, "description": "Order accepted"}},
+)
+async def create_order(
+    *,
+    db: AsyncSession = Depends(get_db),
+    order_in: OrderCreate,
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
+) -> Any:
+    if idempotency_key is None:
+        status_code, body = await _submit_order(db, order_in)
+        return JSONResponse(body, status_code=status_code)
+
+    key = f"idempotency:orders:{order_in.user_id}:{idempotency_key}"
+    fingerprint = hashlib.sha256(order_in.model_dump_json().encode()).hexdigest()
+    try:
+        status_code, body, replayed = await idempotency.execute(
+            key, fingerprint, lambda: _submit_order(db, order_in)
         )
-    return order
+    except IdempotencyKeyInUseError:
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed",
+        ) from None
+    except IdempotencyKeyMismatchError:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request",
+        ) from None
+    except IdempotencyKeysUnavailableError:
+        raise HTTPException(
+            status_code=503,
+            detail="Idempotency-Key is not supported: no key store is configured",
+        ) from None
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(body, status_code=status_code, headers=headers)
+
+
+@router.post(
+    "/bulk",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def bulk_create_orders(request: Request) -> StreamingResponse:
+    # One OrderCreate per line in, one result per line out. Records are
+    # ingested batch by batch while the body uploads; results are spooled
+    # (to disk past BULK_ORDER_RESULT_SPOOL_BYTES) and streamed back once
+    # the body has been read, since middleware may not share receive().
+    spool = SpooledTemporaryFile(max_size=settings.BULK_ORDER_RESULT_SPOOL_BYTES)
+    async for result in BulkOrderService.ingest(request.stream()):
+        spool.write(result)
+    spool.seek(0)
+    return StreamingResponse(
+        iter(lambda: spool.read(64 * 1024), b""),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(spool.close),
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_orders(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    order_status: OrderStatus | None = Query(None, alias="status"),
+) -> StreamingResponse:
+    query = OrderExportService.export_query(created_from, created_to, order_status)
+    if export_format == "csv":
+        body, media_type = OrderExportService.csv(query), "text/csv"
+    else:
+        body, media_type = OrderExportService.ndjson(query), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="orders.{export_format}"'
+        },
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -34,8 +171,41 @@ async def get_order(order_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
 
 
 @router.get("/user/{user_id}", response_model=list[OrderResponse])
-async def get_user_orders(user_id: UUID, db: AsyncSession = Depends(get_db)) -> Any:
-    return await OrderService.get_user_orders(db, user_id)
+async def get_user_orders(
+    user_id: UUID,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    try:
+        orders, next_cursor = await OrderService.get_user_orders(
+            db, user_id, limit, cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+
+@router.get("/user/{user_id}/summary", response_model=list[OrderSummaryResponse])
+async def get_user_order_summaries(
+    user_id: UUID,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    try:
+        orders, next_cursor = await OrderService.get_user_order_summaries(
+            db, user_id, limit, cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
 
 
 @router.patch("/{order_id}", response_model=OrderResponse)
@@ -14,11 +14,74 @@ class Settings(BaseSettings):
     # RABBITMQ
     RABBITMQ_URL: str
 
+    # REDIS
+    REDIS_URL: str | None = None
+
+    # IDEMPOTENCY (POST /orders with an Idempotency-Key header)
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+
+    # ORDER SAGA
+    # When enabled, POST /orders only records a PENDING order and publishes
+    # OrderCreated; inventory and payment consumers drive the rest.
+    ORDER_SAGA_ASYNC: bool = False
+
+    # BULK ORDER INGEST (POST /orders/bulk, NDJSON)
+    BULK_ORDER_BATCH_SIZE: int = 200
+    BULK_ORDER_MAX_LINE_BYTES: int = 64 * 1024
+    BULK_ORDER_RESULT_SPOOL_BYTES: int = 1024 * 1024
+
+    # ORDER EXPORT (rows fetched per server-side cursor round trip)
+    ORDER_EXPORT_BATCH_SIZE: int = 1000
+
+    # PENDING ORDER REAPER
+    ORDER_REAPER_ENABLED: bool = True
+    ORDER_PENDING_TIMEOUT_SECONDS: float = 15 * 60
+    ORDER_REAPER_INTERVAL: float = 60.0
+    ORDER_REAPER_BATCH_SIZE: int = 50
+    ORDER_REAPER_MAX_BATCHES: int = 20
+    ORDER_REAPER_CONCURRENCY: int = 4
+
+    # PRICE CACHE (product prices resolved server-side)
+    PRICE_CACHE_TTL_SECONDS: float = 300.0
+    PRICE_CACHE_MAX_ENTRIES: int = 10_000
+
+    # OUTBOX RELAY
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+
     # INTERNAL SERVICES
     INVENTORY_SERVICE_URL: str = "http://inventory-service:8000"
     PAYMENT_SERVICE_URL: str = "http://payment-service:8000"
     PRODUCT_SERVICE_URL: str = "http://product-service:8000"
 
+    # INTERNAL HTTP CLIENT
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_CONNECT_TIMEOUT: float = 1.0
+    HTTP_POOL_TIMEOUT: float = 2.0
+    INVENTORY_TIMEOUT: float = 3.0
+    PAYMENT_TIMEOUT: float = 5.0
+    PRODUCT_TIMEOUT: float = 2.0
+
+    # INTERNAL CALL RESILIENCE
+    # INVENTORY_TIMEOUT / PAYMENT_TIMEOUT are the ceilings for adaptive timeouts
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 10.0
+    RETRY_MAX_ATTEMPTS: int = 3
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_MIN_PER_SECOND: float = 1.0
+    RETRY_BACKOFF_BASE: float = 0.05
+    RETRY_BACKOFF_MAX: float = 1.0
+    # A 503 is only retried when its Retry-After asks for at most this long
+    RETRY_AFTER_MAX: float = 2.0
+    ADAPTIVE_TIMEOUT_MIN: float = 0.25
+    ADAPTIVE_TIMEOUT_PERCENTILE: float = 0.99
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = 2.0
+
     class Config:
         case_sensitive = True
 
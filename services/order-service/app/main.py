@@ -4,12 +4,20 @@ from typing import Any
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+from starlette_prometheus import PrometheusMiddleware, metrics
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.messaging import publisher
 from app.db.base import Base
 from app.db.init_db import init_db
 from app.db.session import SessionLocal, engine
+from app.services.idempotency import idempotency
+from app.services.internal_client import InternalServiceClient
+from app.services.outbox import outbox_relay
+from app.services.pricing import build_price_cache_consumer
+from app.services.reaper import pending_order_reaper
+from app.services.saga import build_consumer
 
 
 @asynccontextmanager
@@ -22,8 +30,34 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     async with SessionLocal() as db:
         await init_db(db)
 
+    # Shared keep-alive client for calls to inventory/payment services
+    await InternalServiceClient.startup()
+
+    # Saga replies from inventory/payment services
+    consumer = build_consumer()
+    await consumer.start()
+
+    # Drops cached product prices when product-service announces a change
+    price_cache_consumer = build_price_cache_consumer()
+    await price_cache_consumer.start()
+
+    # Drains the transactional outbox to RabbitMQ
+    outbox_relay.start()
+
+    # Fails orders stuck in PENDING and releases their stock
+    if settings.ORDER_REAPER_ENABLED:
+        pending_order_reaper.start()
+
     yield
     # Shutdown
+    await pending_order_reaper.stop()
+    await outbox_relay.stop()
+    await price_cache_consumer.stop()
+    await consumer.stop()
+    publisher.close()
+    if idempotency.store is not None:
+        await idempotency.store.close()
+    await InternalServiceClient.shutdown()
     await engine.dispose()
 
 
@@ -41,8 +75,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+app.add_middleware(PrometheusMiddleware)
+app.add_route("/metrics", metrics)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -1,7 +1,8 @@
 import uuid
+from datetime import datetime
 
 from app.db.base import Base
-from sqlalchemy import UUID, Float, ForeignKey, String
+from sqlalchemy import UUID, DateTime, Float, ForeignKey, Index, String, func
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,18 +19,30 @@ class Order(Base):
         SQLEnum(OrderStatus), default=OrderStatus.PENDING
     )
     shipping_address: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     items: Mapped[list["OrderItem"]] = relationship(
         "OrderItem", back_populates="order", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Serves the keyset-paginated order history (newest first)
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Serves date-ranged exports in (created_at, id) order
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        # Lets the reaper find the oldest PENDING orders without a scan
+        Index("ix_orders_status_created_at", "status", "created_at"),
+    )
+
 
 class OrderItem(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     order_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False, index=True
     )
     product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
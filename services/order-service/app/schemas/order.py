@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -35,10 +36,22 @@ class OrderUpdate(BaseModel):
     status: OrderStatus | None = None
 
 
+class OrderSummaryResponse(OrderBase):
+    id: UUID
+    total_amount: float
+    status: OrderStatus
+    created_at: datetime | None = None
+    item_count: int
+
+    class Config:
+        from_attributes = True
+
+
 class OrderResponse(OrderBase):
     id: UUID
     total_amount: float
     status: OrderStatus
+    created_at: datetime | None = None
     items: list[OrderItemResponse]
 
     class Config:
@@ -0,0 +1,219 @@
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderItem
+from app.schemas.order import OrderCreate
+from app.services.internal_client import InternalServiceClient
+from app.services.outbox import OutboxService, outbox_relay
+from app.services.pricing import (
+    PriceLookupUnavailableError,
+    PricingService,
+    UnknownProductsError,
+)
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from shared.enums.status import OrderStatus
+from shared.schemas.events import StockReservedEvent
+from shared.streaming import iter_lines
+
+logger = logging.getLogger(__name__)
+
+REJECTED = "rejected"
+
+
+def _result_line(result: dict[str, Any]) -> bytes:
+    return json.dumps(result, default=str).encode() + b"\n"
+
+
+class BulkOrderService:
+    @staticmethod
+    async def ingest(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        batch: list[tuple[int, OrderCreate]] = []
+        async for line_no, raw in iter_lines(
+            chunks, settings.BULK_ORDER_MAX_LINE_BYTES
+        ):
+            if raw is None:
+                yield _result_line(
+                    {
+                        "line": line_no,
+                        "status": REJECTED,
+                        "error": "Record exceeds "
+                        f"{settings.BULK_ORDER_MAX_LINE_BYTES} bytes",
+                    }
+                )
+                continue
+            if not raw.strip():
+                continue
+            try:
+                order_in = OrderCreate.model_validate_json(raw)
+            except ValidationError as exc:
+                yield _result_line(
+                    {
+                        "line": line_no,
+                        "status": REJECTED,
+                        "error": exc.errors(include_url=False, include_input=False),
+                    }
+                )
+                continue
+            if not order_in.items:
+                yield _result_line(
+                    {"line": line_no, "status": REJECTED, "error": "Order has no items"}
+                )
+                continue
+
+            batch.append((line_no, order_in))
+            if len(batch) >= settings.BULK_ORDER_BATCH_SIZE:
+                for result in await BulkOrderService.ingest_batch(batch):
+                    yield _result_line(result)
+                batch = []
+
+        if batch:
+            for result in await BulkOrderService.ingest_batch(batch):
+                yield _result_line(result)
+
+    @staticmethod
+    async def ingest_batch(
+        batch: list[tuple[int, OrderCreate]],
+    ) -> list[dict[str, Any]]:
+        # 1. Price the batch from the catalog: one lookup at most
+        try:
+            prices = await PricingService.resolve(
+                {item.product_id for _, order_in in batch for item in order_in.items}
+            )
+        except PriceLookupUnavailableError:
+            return [
+                {
+                    "line": line_no,
+                    "status": REJECTED,
+                    "error": "Product catalog unavailable, resubmit this record",
+                }
+                for line_no, _ in batch
+            ]
+        results: list[dict[str, Any]] = []
+        orders: list[tuple[UUID, int, OrderCreate]] = []
+        for line_no, order_in in batch:
+            try:
+                priced = PricingService.apply(order_in, prices)
+            except UnknownProductsError as exc:
+                results.append(
+                    {
+                        "line": line_no,
+                        "status": REJECTED,
+                        "error": f"Unknown products: {exc}",
+                    }
+                )
+                continue
+            orders.append((uuid.uuid4(), line_no, priced))
+        if not orders:
+            return results
+
+        # 2. Reserve stock for the whole batch in one call (each order atomic)
+        reserved = await InternalServiceClient.reserve_orders(
+            [
+                (
+                    order_id,
+                    [(item.product_id, item.quantity) for item in order_in.items],
+                )
+                for order_id, _, order_in in orders
+            ]
+        )
+        if reserved is None:
+            return results + [
+                {
+                    "line": line_no,
+                    "status": REJECTED,
+                    "error": "Inventory service unavailable, resubmit this record",
+                }
+                for _, line_no, _ in orders
+            ]
+
+        # 3. Build multi-row inserts; reserved orders continue in the saga
+        created_at = datetime.now(timezone.utc)  # noqa: UP017
+        order_rows: list[dict[str, Any]] = []
+        item_rows: list[dict[str, Any]] = []
+        events: list[StockReservedEvent] = []
+        for order_id, line_no, order_in in orders:
+            total_amount = sum(item.price * item.quantity for item in order_in.items)
+            order_status = (
+                OrderStatus.PENDING if reserved.get(order_id) else OrderStatus.FAILED
+            )
+            order_rows.append(
+                {
+                    "id": order_id,
+                    "user_id": order_in.user_id,
+                    "total_amount": total_amount,
+                    "status": order_status,
+                    "shipping_address": order_in.shipping_address,
+                    "created_at": created_at,
+                }
+            )
+            item_rows.extend(
+                {"id": uuid.uuid4(), "order_id": order_id, **item.model_dump()}
+                for item in order_in.items
+            )
+            result: dict[str, Any] = {
+                "line": line_no,
+                "order_id": order_id,
+                "status": order_status.value,
+            }
+            if order_status == OrderStatus.PENDING:
+                # Payment picks the order up exactly as after OrderCreated
+                events.append(
+                    StockReservedEvent(
+                        correlation_id=order_id,
+                        payload={
+                            "order_id": order_id,
+                            "user_id": order_in.user_id,
+                            "total_amount": total_amount,
+                            "status": "reserved",
+                        },
+                    )
+                )
+            else:
+                result["error"] = "Insufficient stock or product not found"
+            results.append(result)
+
+        # 4. One short transaction per batch
+        async with SessionLocal() as db:
+            try:
+                await db.execute(insert(Order), order_rows)
+                await db.execute(insert(OrderItem), item_rows)
+                for event in events:
+                    OutboxService.add_event(db, event)
+                await db.commit()
+            except SQLAlchemyError:
+                logger.exception("Bulk order batch of %d failed to commit", len(batch))
+                await db.rollback()
+                await BulkOrderService._release(orders, reserved)
+                return results + [
+                    {
+                        "line": line_no,
+                        "status": REJECTED,
+                        "error": "Order could not be stored, resubmit this record",
+                    }
+                    for _, line_no, _ in orders
+                ]
+
+        if events:
+            outbox_relay.notify()
+        return results
+
+    @staticmethod
+    async def _release(
+        orders: list[tuple[UUID, int, OrderCreate]], reserved: dict[UUID, bool]
+    ) -> None:
+        for order_id, _, order_in in orders:
+            if reserved.get(order_id):
+                await InternalServiceClient.release_stock_batch(
+                    order_id,
+                    [(item.product_id, item.quantity) for item in order_in.items],
+                )
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+
+import redis.asyncio as redis
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+
+
+class IdempotencyKeyInUseError(Exception):
+    pass
+
+
+class IdempotencyKeyMismatchError(Exception):
+    pass
+
+
+class IdempotencyKeysUnavailableError(Exception):
+    pass
+
+
+class IdempotencyStore(Protocol):
+    async def claim(self, key: str, record: dict[str, Any], ttl: int) -> bool:
+        ...
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        ...
+
+    async def save(self, key: str, record: dict[str, Any], ttl: int) -> None:
+        ...
+
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class RedisIdempotencyStore:
+    def __init__(self, url: str) -> None:
+        self._redis = redis.Redis.from_url(url)
+
+    async def claim(self, key: str, record: dict[str, Any], ttl: int) -> bool:
+        return bool(await self._redis.set(key, json.dumps(record), nx=True, ex=ttl))
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        raw = await self._redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def save(self, key: str, record: dict[str, Any], ttl: int) -> None:
+        await self._redis.set(key, json.dumps(record), ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def build_store() -> IdempotencyStore | None:
+    # Keys held by one process would not stop a retry that reaches another
+    # replica, so there is no local fallback
+    if not settings.REDIS_URL:
+        logger.warning(
+            "REDIS_URL is not set: requests carrying an Idempotency-Key will be "
+            "rejected"
+        )
+        return None
+    return RedisIdempotencyStore(settings.REDIS_URL)
+
+
+Handler = Callable[[], Awaitable[tuple[int, Any]]]
+
+
+class IdempotencyService:
+    def __init__(
+        self,
+        store: IdempotencyStore | None,
+        ttl: int,
+        in_flight_ttl: int,
+        wait_timeout: float,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.store = store
+        self._ttl = ttl
+        self._in_flight_ttl = in_flight_ttl
+        self._wait_timeout = wait_timeout
+        self._poll_interval = poll_interval
+        # Duplicates inside this process wait on the running request directly
+        self._running: dict[str, asyncio.Future[None]] = {}
+
+    async def _wait_for_result(
+        self, store: IdempotencyStore, key: str
+    ) -> dict[str, Any] | None:
+        deadline = time.monotonic() + self._wait_timeout
+        running = self._running.get(key)
+        if running is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(running), self._wait_timeout)
+            except asyncio.TimeoutError:
+                return None
+        while True:
+            record = await store.get(key)
+            if record is None or record["state"] == COMPLETED:
+                return record
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self._poll_interval)
+
+    async def execute(
+        self, key: str, fingerprint: str, handler: Handler
+    ) -> tuple[int, Any, bool]:
+        store = self.store
+        if store is None:
+            raise IdempotencyKeysUnavailableError(key)
+        while True:
+            if key not in self._running and await store.claim(
+                key,
+                {"state": IN_FLIGHT, "fingerprint": fingerprint},
+                self._in_flight_ttl,
+            ):
+                break
+            record = await self._wait_for_result(store, key)
+            if record is None:
+                if key in self._running or await store.get(key) is not None:
+                    raise IdempotencyKeyInUseError(key)
+                # The original attempt failed and gave the key back: retry it
+                continue
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyKeyMismatchError(key)
+            return record["status_code"], record["body"], True
+
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._running[key] = done
+        try:
+            status_code, body = await handler()
+        except BaseException:
+            await store.delete(key)
+            raise
+        else:
+            # Server errors are not cached so the client may retry them
+            if status_code >= 500:
+                await store.delete(key)
+            else:
+                await store.save(
+                    key,
+                    {
+                        "state": COMPLETED,
+                        "fingerprint": fingerprint,
+                        "status_code": status_code,
+                        "body": body,
+                    },
+                    self._ttl,
+                )
+        finally:
+            del self._running[key]
+            done.set_result(None)
+        return status_code, body, False
+
+
+idempotency = IdempotencyService(
+    build_store(),
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    in_flight_ttl=settings.IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+)
@@ -1,50 +1,291 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, ClassVar
 from uuid import UUID
 
 import httpx
 from app.core.config import settings
+from app.services.resilience import RETRIES, RETRY_BUDGET_EXHAUSTED, Downstream
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Counted at the client rather than read from httpx's private pool state: a
+# request in flight holds one pooled connection (or one HTTP/2 stream)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "internal_http_requests_in_flight",
+    "Requests sent through the shared internal HTTP client awaiting a response",
+    ["downstream"],
+)
+HTTP_REQUESTS = Counter(
+    "internal_http_requests_total",
+    "Requests sent through the shared internal HTTP client, retries included",
+)
+HTTP_POOL_MAX_CONNECTIONS = Gauge(
+    "internal_http_pool_max_connections",
+    "Configured upper bound of the shared internal HTTP client pool",
+)
+
+INVENTORY = Downstream("inventory", settings.INVENTORY_TIMEOUT)
+PAYMENT = Downstream("payment", settings.PAYMENT_TIMEOUT)
+PRODUCT = Downstream("product", settings.PRODUCT_TIMEOUT)
+
+# product-service caps POST /products/batch at this many IDs
+PRODUCT_BATCH_MAX_IDS = 200
+
+# Only failures where the request never reached the downstream are retried:
+# stock reservation is not idempotent, so a read timeout must not re-send it.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    # A 503 means the downstream is shedding load. It is retried only at the
+    # time it names in Retry-After, and only when that is soon enough to be
+    # worth holding the caller; without the header it is not retried at all.
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)  # noqa: UP017
+        delay = (when - datetime.now(timezone.utc)).total_seconds()  # noqa: UP017
+    if delay > settings.RETRY_AFTER_MAX:
+        return None
+    return max(delay, 0.0)
 
 
 class InternalServiceClient:
+    _client: ClassVar[httpx.AsyncClient | None] = None
+
     @staticmethod
-    async def reserve_stock(product_id: UUID, quantity: int) -> bool:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{settings.INVENTORY_SERVICE_URL}/api/v1/inventory/reserve",
-                    json={"product_id": str(product_id), "quantity": quantity},
-                    timeout=5.0,
-                )
-                return response.status_code == 200
-            except Exception:
-                return False
+    def _http2_available() -> bool:
+        if not settings.HTTP2_ENABLED:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed")
+            return False
+        return True
+
+    @classmethod
+    def _build_client(
+        cls, transport: httpx.AsyncBaseTransport | None = None
+    ) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.PAYMENT_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        )
+        HTTP_POOL_MAX_CONNECTIONS.set(settings.HTTP_MAX_CONNECTIONS)
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=cls._http2_available(),
+            transport=transport,
+            event_hooks={"request": [cls._on_request]},
+        )
+
+    @staticmethod
+    async def _on_request(request: httpx.Request) -> None:
+        HTTP_REQUESTS.inc()
+
+    @classmethod
+    async def startup(cls, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = cls._build_client(transport)
+        for downstream in (INVENTORY, PAYMENT, PRODUCT):
+            downstream.reset()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        # Lazily created when the app runs without its lifespan (e.g. in tests)
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._build_client()
+        return cls._client
+
+    @staticmethod
+    def _timeout(seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(
+            seconds,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        )
+
+    @staticmethod
+    async def _send(
+        downstream: Downstream, url: str, payload: dict[str, Any]
+    ) -> httpx.Response:
+        client = InternalServiceClient.get_client()
+        started = time.perf_counter()
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(downstream=downstream.name)
+        with in_flight.track_inprogress():
+            response = await client.post(
+                url,
+                json=payload,
+                timeout=InternalServiceClient._timeout(downstream.latency.timeout()),
+            )
+        if response.status_code < 500:
+            downstream.latency.observe(time.perf_counter() - started)
+        return response
 
     @staticmethod
-    async def release_stock(product_id: UUID, quantity: int) -> bool:
-        async with httpx.AsyncClient() as client:
+    async def _request(
+        downstream: Downstream, url: str, payload: Any
+    ) -> httpx.Response | None:
+        # An open circuit fails fast instead of tying up a pooled connection
+        if not downstream.breaker.allow():
+            logger.warning("Circuit for %s is open, skipping %s", downstream.name, url)
+            return None
+        downstream.retry_budget.record_request()
+
+        attempt = 0
+        while True:
+            # Seconds to wait before the next attempt, None to give up
+            delay: float | None = None
+            attempt += 1
             try:
-                response = await client.post(
-                    f"{settings.INVENTORY_SERVICE_URL}/api/v1/inventory/release",
-                    json={"product_id": str(product_id), "quantity": quantity},
-                    timeout=5.0,
+                response = await InternalServiceClient._send(downstream, url, payload)
+            except httpx.HTTPError as exc:
+                logger.warning("Internal call to %s failed", url, exc_info=True)
+                downstream.breaker.record_failure()
+                if isinstance(exc, RETRYABLE_ERRORS):
+                    delay = downstream.backoff(attempt)
+            else:
+                if response.status_code < 500:
+                    # 4xx is a healthy downstream rejecting the request
+                    downstream.breaker.record_success()
+                    return response
+                downstream.breaker.record_failure()
+                if response.status_code == 503:
+                    delay = _retry_after(response)
+
+            if delay is None or attempt >= settings.RETRY_MAX_ATTEMPTS:
+                return None
+            if not downstream.retry_budget.try_spend():
+                RETRY_BUDGET_EXHAUSTED.labels(downstream=downstream.name).inc()
+                return None
+            await asyncio.sleep(delay)
+            if not downstream.breaker.allow():
+                return None
+            RETRIES.labels(downstream=downstream.name).inc()
+
+    @staticmethod
+    async def _post(downstream: Downstream, url: str, payload: dict[str, Any]) -> bool:
+        response = await InternalServiceClient._request(downstream, url, payload)
+        return response is not None and response.status_code == 200
+
+    @staticmethod
+    def _stock_payload(order_id: UUID, items: list[tuple[UUID, int]]) -> dict[str, Any]:
+        return {
+            "order_id": str(order_id),
+            "items": [
+                {"product_id": str(product_id), "quantity": quantity}
+                for product_id, quantity in items
+            ],
+        }
+
+    @staticmethod
+    async def reserve_stock_batch(
+        order_id: UUID, items: list[tuple[UUID, int]]
+    ) -> bool:
+        return await InternalServiceClient._post(
+            INVENTORY,
+            f"{settings.INVENTORY_SERVICE_URL}/api/v1/inventory/reserve/batch",
+            InternalServiceClient._stock_payload(order_id, items),
+        )
+
+    @staticmethod
+    async def reserve_orders(
+        orders: list[tuple[UUID, list[tuple[UUID, int]]]],
+    ) -> dict[UUID, bool] | None:
+        # One call for many orders; None means the outcome is unknown
+        response = await InternalServiceClient._request(
+            INVENTORY,
+            f"{settings.INVENTORY_SERVICE_URL}/api/v1/inventory/reserve/orders",
+            {
+                "orders": [
+                    InternalServiceClient._stock_payload(order_id, items)
+                    for order_id, items in orders
+                ]
+            },
+        )
+        if response is None or response.status_code != 200:
+            return None
+        return {
+            UUID(result["order_id"]): bool(result["reserved"])
+            for result in response.json()["results"]
+        }
+
+    @staticmethod
+    async def release_stock_batch(
+        order_id: UUID, items: list[tuple[UUID, int]]
+    ) -> bool:
+        return await InternalServiceClient._post(
+            INVENTORY,
+            f"{settings.INVENTORY_SERVICE_URL}/api/v1/inventory/release/batch",
+            InternalServiceClient._stock_payload(order_id, items),
+        )
+
+    @staticmethod
+    async def _get_product_price_chunk(
+        product_ids: list[UUID],
+    ) -> dict[UUID, float] | None:
+        response = await InternalServiceClient._request(
+            PRODUCT,
+            f"{settings.PRODUCT_SERVICE_URL}/api/v1/products/batch",
+            {"ids": [str(product_id) for product_id in product_ids]},
+        )
+        if response is None or response.status_code != 200:
+            return None
+        return {
+            UUID(result["id"]): float(result["product"]["price"])
+            for result in response.json()["results"]
+            if result["found"]
+        }
+
+    @staticmethod
+    async def get_product_prices(product_ids: list[UUID]) -> dict[UUID, float] | None:
+        # Unknown products are absent from the result; None means unavailable
+        chunks = await asyncio.gather(
+            *(
+                InternalServiceClient._get_product_price_chunk(
+                    product_ids[start : start + PRODUCT_BATCH_MAX_IDS]
                 )
-                return response.status_code == 200
-            except Exception:
-                return False
+                for start in range(0, len(product_ids), PRODUCT_BATCH_MAX_IDS)
+            )
+        )
+        prices: dict[UUID, float] = {}
+        for chunk in chunks:
+            if chunk is None:
+                return None
+            prices.update(chunk)
+        return prices
 
     @staticmethod
     async def process_payment(order_id: UUID, amount: float) -> bool:
-        # Mock payment for now or call payment-service
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{settings.PAYMENT_SERVICE_URL}/api/v1/payments/process",
-                    json={"order_id": str(order_id), "amount": amount},
-                    timeout=5.0,
-                )
-                return response.status_code == 200
-            except Exception:
-                # If payment service is not yet ready, we might want to return True
-                # for testing but for core logic we should probably return False.
-                # However, during development of Order logic, we might need a way
-                # to bypass.
-                return False
+        return await InternalServiceClient._post(
+            PAYMENT,
+            f"{settings.PAYMENT_SERVICE_URL}/api/v1/payments/process",
+            {"order_id": str(order_id), "amount": amount},
+        )
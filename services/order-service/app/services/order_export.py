@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.order import Order, OrderItem
+from sqlalchemy import Row, Select, select
+
+from shared.enums.status import OrderStatus
+
+ORDER_COLUMNS = (
+    "order_id",
+    "user_id",
+    "status",
+    "total_amount",
+    "shipping_address",
+    "created_at",
+)
+ITEM_COLUMNS = ("item_id", "product_id", "quantity", "price")
+CSV_COLUMNS = ORDER_COLUMNS + ITEM_COLUMNS
+
+
+class OrderExportService:
+    @staticmethod
+    def export_query(
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        status: OrderStatus | None = None,
+    ) -> Select[Any]:
+        # One row per item, orders kept contiguous so NDJSON can regroup them
+        query = (
+            select(
+                Order.id.label("order_id"),
+                Order.user_id,
+                Order.status,
+                Order.total_amount,
+                Order.shipping_address,
+                Order.created_at,
+                OrderItem.id.label("item_id"),
+                OrderItem.product_id,
+                OrderItem.quantity,
+                OrderItem.price,
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .order_by(Order.created_at, Order.id, OrderItem.id)
+        )
+        if created_from is not None:
+            query = query.where(Order.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Order.created_at < created_to)
+        if status is not None:
+            query = query.where(Order.status == status)
+        return query.execution_options(yield_per=settings.ORDER_EXPORT_BATCH_SIZE)
+
+    @staticmethod
+    async def partitions(query: Select[Any]) -> AsyncIterator[Sequence[Row[Any]]]:
+        # A server-side cursor: only one partition of rows is in memory at a
+        # time. The session is our own because the request's closes before
+        # the response body streams.
+        async with SessionLocal() as db:
+            result = await db.stream(query)
+            async for partition in result.partitions():
+                yield partition
+
+    @staticmethod
+    def _order_fields(row: Row[Any]) -> dict[str, Any]:
+        return {
+            "order_id": row.order_id,
+            "user_id": row.user_id,
+            "status": row.status.value,
+            "total_amount": row.total_amount,
+            "shipping_address": row.shipping_address,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+
+    @staticmethod
+    async def ndjson(query: Select[Any]) -> AsyncIterator[bytes]:
+        current: dict[str, Any] | None = None
+        async for partition in OrderExportService.partitions(query):
+            chunk: list[bytes] = []
+            for row in partition:
+                if current is None or current["order_id"] != row.order_id:
+                    if current is not None:
+                        chunk.append(json.dumps(current, default=str).encode() + b"\n")
+                    current = {**OrderExportService._order_fields(row), "items": []}
+                if row.item_id is not None:
+                    current["items"].append(
+                        {
+                            "id": row.item_id,
+                            "product_id": row.product_id,
+                            "quantity": row.quantity,
+                            "price": row.price,
+                        }
+                    )
+            if chunk:
+                yield b"".join(chunk)
+        if current is not None:
+            yield json.dumps(current, default=str).encode() + b"\n"
+
+    @staticmethod
+    async def csv(query: Select[Any]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        async for partition in OrderExportService.partitions(query):
+            for row in partition:
+                order = OrderExportService._order_fields(row)
+                writer.writerow(
+                    [order[column] for column in ORDER_COLUMNS]
+                    + [row.item_id, row.product_id, row.quantity, row.price]
+                )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -1,35 +1,108 @@
 import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any
 from uuid import UUID
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.order import Order, OrderItem
 from app.schemas.order import OrderCreate
 from app.services.internal_client import InternalServiceClient
-from sqlalchemy import select
+from app.services.outbox import OutboxService, outbox_relay
+from sqlalchemy import Row, Select, func, literal, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from shared.enums.status import OrderStatus
+from shared.schemas.events import (
+    OrderCompletedEvent,
+    OrderCreatedEvent,
+    OrderPayload,
+)
+from shared.schemas.events import OrderItem as EventOrderItem
 
 
 class OrderService:
     @staticmethod
-    async def get_order(db: AsyncSession, order_id: UUID) -> Order | None:
-        result = await db.execute(
+    async def get_order(
+        db: AsyncSession, order_id: UUID, for_update: bool = False
+    ) -> Order | None:
+        query = (
             select(Order).where(Order.id == order_id).options(selectinload(Order.items))
         )
+        if for_update:
+            query = query.with_for_update(of=Order)
+        result = await db.execute(query)
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_user_orders(db: AsyncSession, user_id: UUID) -> list[Order]:
+    def _user_orders_page(
+        query: Select[Any], user_id: UUID, limit: int, cursor: str | None
+    ) -> Select[Any]:
+        query = query.where(Order.user_id == user_id)
+        if cursor:
+            created_at, order_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Order.created_at, Order.id)
+                < tuple_(literal(created_at), literal(order_id))
+            )
+        # One extra row tells us whether another page exists
+        return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def _next_cursor(rows: Sequence[Any], limit: int) -> str | None:
+        if len(rows) <= limit:
+            return None
+        last = rows[limit - 1]
+        return encode_cursor(last.created_at, last.id)
+
+    @staticmethod
+    async def get_user_orders(
+        db: AsyncSession, user_id: UUID, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[Order], str | None]:
         result = await db.execute(
-            select(Order)
-            .where(Order.user_id == user_id)
-            .options(selectinload(Order.items))
+            OrderService._user_orders_page(
+                select(Order).options(selectinload(Order.items)),
+                user_id,
+                limit,
+                cursor,
+            )
         )
-        return list(result.scalars().all())
+        orders = list(result.scalars().all())
+        return orders[:limit], OrderService._next_cursor(orders, limit)
 
     @staticmethod
-    async def create_order(db: AsyncSession, order_in: OrderCreate) -> Order:
+    async def get_user_order_summaries(
+        db: AsyncSession, user_id: UUID, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[Row[Any]], str | None]:
+        # Column projection only: no OrderItem rows are loaded
+        item_count = (
+            select(func.count(OrderItem.id))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+            .label("item_count")
+        )
+        result = await db.execute(
+            OrderService._user_orders_page(
+                select(
+                    Order.id,
+                    Order.user_id,
+                    Order.total_amount,
+                    Order.status,
+                    Order.shipping_address,
+                    Order.created_at,
+                    item_count,
+                ),
+                user_id,
+                limit,
+                cursor,
+            )
+        )
+        rows = list(result.all())
+        return rows[:limit], OrderService._next_cursor(rows, limit)
+
+    @staticmethod
+    async def _add_order(db: AsyncSession, order_in: OrderCreate) -> Order:
         # 1. Calculate total amount
         total_amount = sum(item.price * item.quantity for item in order_in.items)
 
@@ -40,39 +113,67 @@ class OrderService:
             total_amount=total_amount,
             shipping_address=order_in.shipping_address,
             status=OrderStatus.PENDING,
+            created_at=datetime.now(timezone.utc),  # noqa: UP017
         )
         db.add(db_order)
         await db.flush()  # Get order ID
 
         # 3. Create OrderItems
-        items_to_reserve = []
         for item_in in order_in.items:
             db_item = OrderItem(
                 id=uuid.uuid4(), order_id=db_order.id, **item_in.model_dump()
             )
             db.add(db_item)
             db_order.items.append(db_item)  # Ensure items are available in memory
-            items_to_reserve.append(item_in)
-
-        # 4. Reserve Stock (Synchronous)
-        reserved_items = []
-        stock_success = True
-        for item in items_to_reserve:
-            success = await InternalServiceClient.reserve_stock(
-                item.product_id, item.quantity
-            )
-            if not success:
-                stock_success = False
-                break
-            reserved_items.append(item)
 
-        if not stock_success:
-            # Rollback stock reservations
-            for item in reserved_items:
-                await InternalServiceClient.release_stock(
-                    item.product_id, item.quantity
+        return db_order
+
+    @staticmethod
+    def order_payload(order: Order) -> OrderPayload:
+        return OrderPayload(
+            order_id=order.id,
+            user_id=order.user_id,
+            items=[
+                EventOrderItem(
+                    product_id=item.product_id,
+                    quantity=int(item.quantity),
+                    price=item.price,
                 )
+                for item in order.items
+            ],
+            total_amount=order.total_amount,
+            status=order.status.value,
+        )
+
+    @staticmethod
+    async def place_order(db: AsyncSession, order_in: OrderCreate) -> Order:
+        db_order = await OrderService._add_order(db, order_in)
+        # The event is committed atomically with the order; the relay sends it
+        OutboxService.add_event(
+            db,
+            OrderCreatedEvent(
+                correlation_id=db_order.id,
+                payload=OrderService.order_payload(db_order),
+            ),
+        )
+        await db.commit()
+        await db.refresh(db_order)
+        outbox_relay.notify()
+        return db_order
 
+    @staticmethod
+    async def create_order(db: AsyncSession, order_in: OrderCreate) -> Order:
+        db_order = await OrderService._add_order(db, order_in)
+        # Persist PENDING before touching stock: if we die mid-checkout the
+        # reaper finds the order and releases whatever was reserved.
+        await db.commit()
+
+        # 4. Reserve Stock (Synchronous, all items in one call)
+        items_to_reserve = [(item.product_id, item.quantity) for item in order_in.items]
+        stock_success = await InternalServiceClient.reserve_stock_batch(
+            db_order.id, items_to_reserve
+        )
+        if not stock_success:
             db_order.status = OrderStatus.FAILED
             await db.commit()
             await db.refresh(db_order)
@@ -80,14 +181,13 @@ class OrderService:
 
         # 5. Process Payment (Synchronous)
         payment_success = await InternalServiceClient.process_payment(
-            db_order.id, total_amount
+            db_order.id, db_order.total_amount
         )
         if not payment_success:
             # Rollback stock reservations
-            for item in reserved_items:
-                await InternalServiceClient.release_stock(
-                    item.product_id, item.quantity
-                )
+            await InternalServiceClient.release_stock_batch(
+                db_order.id, items_to_reserve
+            )
 
             db_order.status = OrderStatus.FAILED
             await db.commit()
@@ -96,10 +196,15 @@ class OrderService:
 
         # 6. Finalize Order
         db_order.status = OrderStatus.PAID
+        OutboxService.add_event(
+            db,
+            OrderCompletedEvent(
+                correlation_id=db_order.id, payload={"order_id": db_order.id}
+            ),
+        )
         await db.commit()
         await db.refresh(db_order)
-
-        # TODO: Publish Order.Placed event to RabbitMQ
+        outbox_relay.notify()
 
         return db_order
 
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.messaging import publisher
+from app.db.session import SessionLocal
+from app.models.outbox import OutboxEvent
+from pydantic import ValidationError
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.messaging.rabbitmq import EventPublisher
+from shared.schemas.base import DomainEvent
+
+logger = logging.getLogger(__name__)
+
+# Only one relay publishes at a time so events of the same correlation_id
+# always leave in the order they were written.
+OUTBOX_LOCK_ID = 0x6F75_7462
+
+
+class OutboxService:
+    @staticmethod
+    def add_event(db: AsyncSession, event: DomainEvent) -> None:
+        # Staged on the caller's session, committed with its business rows
+        db.add(
+            OutboxEvent(
+                event_id=event.event_id,
+                event_type=event.event_type,
+                correlation_id=event.correlation_id,
+                message=event.model_dump(mode="json"),
+            )
+        )
+
+
+class OutboxRelay:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        event_publisher: EventPublisher,
+        batch_size: int,
+        poll_interval: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._publisher = event_publisher
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _publish(self, events: Sequence[DomainEvent]) -> bool:
+        # The batch is published all or nothing, with one broker round trip
+        try:
+            self._publisher.publish_many(events)
+        except Exception:
+            logger.warning("Outbox publish of %d events failed", len(events))
+            return False
+        return True
+
+    async def relay_once(self) -> int:
+        async with self._session_factory() as db:
+            locked = await db.scalar(
+                select(func.pg_try_advisory_xact_lock(OUTBOX_LOCK_ID))
+            )
+            if not locked:
+                return 0
+
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(
+                    OutboxEvent.published_at.is_(None),
+                    OutboxEvent.dead_lettered_at.is_(None),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self._batch_size)
+            )
+            rows = list(result.scalars().all())
+            if not rows:
+                await db.commit()
+                return 0
+
+            # A row that no longer parses would fail every batch it is in,
+            # stalling everything behind it: it is set aside instead
+            valid: list[OutboxEvent] = []
+            events: list[DomainEvent] = []
+            dead: list[int] = []
+            for row in rows:
+                try:
+                    events.append(DomainEvent.model_validate(row.message))
+                except ValidationError:
+                    logger.error(
+                        "Outbox event %s (%s) is malformed, dead-lettering it",
+                        row.event_id,
+                        row.event_type,
+                    )
+                    dead.append(row.id)
+                else:
+                    valid.append(row)
+            now = datetime.now(timezone.utc)  # noqa: UP017
+            if dead:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(dead))
+                    .values(dead_lettered_at=now, attempts=OutboxEvent.attempts + 1)
+                )
+
+            published = not events or await asyncio.to_thread(self._publish, events)
+            if events:
+                batch = OutboxEvent.id.in_([row.id for row in valid])
+                if published:
+                    await db.execute(
+                        update(OutboxEvent).where(batch).values(published_at=now)
+                    )
+                else:
+                    await db.execute(
+                        update(OutboxEvent)
+                        .where(batch)
+                        .values(attempts=OutboxEvent.attempts + 1)
+                    )
+            await db.commit()
+            return len(dead) + (len(events) if published else 0)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                sent = await self.relay_once()
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                sent = 0
+            if sent < self._batch_size:
+                # Caught up: sleep until the next poll or a fresh write
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+outbox_relay = OutboxRelay(
+    SessionLocal,
+    publisher,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+)
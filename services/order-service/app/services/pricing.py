@@ -0,0 +1,94 @@
+import logging
+import uuid
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.schemas.order import OrderCreate
+from app.services.internal_client import InternalServiceClient
+from prometheus_client import Counter
+
+from shared.cache import TTLCache
+from shared.messaging.rabbitmq import EventConsumer
+from shared.schemas.events import ProductChangedEvent
+
+logger = logging.getLogger(__name__)
+
+PRICE_CACHE_LOOKUPS = Counter(
+    "price_cache_lookups_total",
+    "Product price lookups served from the local cache or product-service",
+    ["result"],
+)
+
+
+class UnknownProductsError(Exception):
+    def __init__(self, product_ids: Iterable[UUID]) -> None:
+        self.product_ids = sorted(product_ids)
+        super().__init__(", ".join(str(product_id) for product_id in self.product_ids))
+
+
+class PriceLookupUnavailableError(Exception):
+    pass
+
+
+# Prices live for PRICE_CACHE_TTL_SECONDS and are dropped early when
+# product-service announces a change.
+price_cache: TTLCache[UUID, float] = TTLCache(
+    ttl=settings.PRICE_CACHE_TTL_SECONDS, max_entries=settings.PRICE_CACHE_MAX_ENTRIES
+)
+
+
+class PricingService:
+    @staticmethod
+    async def resolve(product_ids: set[UUID]) -> dict[UUID, float]:
+        # Cached prices first, then one batch call for everything missing
+        prices = price_cache.get_many(product_ids)
+        missing = product_ids - prices.keys()
+        PRICE_CACHE_LOOKUPS.labels(result="hit").inc(len(prices))
+        PRICE_CACHE_LOOKUPS.labels(result="miss").inc(len(missing))
+        if missing:
+            generation = price_cache.generation
+            fetched = await InternalServiceClient.get_product_prices(sorted(missing))
+            if fetched is None:
+                raise PriceLookupUnavailableError
+            price_cache.put_many(fetched, since=generation)
+            prices.update(fetched)
+        return prices
+
+    @staticmethod
+    def apply(order_in: OrderCreate, prices: dict[UUID, float]) -> OrderCreate:
+        unknown = {item.product_id for item in order_in.items} - prices.keys()
+        if unknown:
+            raise UnknownProductsError(unknown)
+        return order_in.model_copy(
+            update={
+                "items": [
+                    item.model_copy(update={"price": prices[item.product_id]})
+                    for item in order_in.items
+                ]
+            }
+        )
+
+    @staticmethod
+    async def price_order(order_in: OrderCreate) -> OrderCreate:
+        # Client-supplied prices are never trusted
+        prices = await PricingService.resolve(
+            {item.product_id for item in order_in.items}
+        )
+        return PricingService.apply(order_in, prices)
+
+
+async def handle_product_changed(message: dict[str, Any]) -> None:
+    event = ProductChangedEvent.model_validate(message)
+    price_cache.invalidate(UUID(str(event.payload["product_id"])))
+
+
+def build_price_cache_consumer() -> EventConsumer:
+    # Every replica holds its own cache, so each needs its own copy of events
+    return EventConsumer(
+        settings.RABBITMQ_URL,
+        f"order-service.price-cache.{uuid.uuid4().hex}",
+        {"ProductChanged": handle_product_changed},
+        exclusive=True,
+    )
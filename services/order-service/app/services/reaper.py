@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.order import Order
+from app.services.internal_client import InternalServiceClient
+from app.services.outbox import OutboxService, outbox_relay
+from app.services.saga import order_cancelled
+from prometheus_client import Counter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from shared.enums.status import OrderStatus
+
+logger = logging.getLogger(__name__)
+
+ORDERS_REAPED = Counter(
+    "orders_reaped_total",
+    "Expired PENDING orders failed by the reaper, by how their stock went back",
+    ["outcome"],
+)
+
+
+# Fails orders left PENDING past ORDER_PENDING_TIMEOUT_SECONDS (e.g. the
+# process died mid-checkout) and gives their reserved stock back. Each sweep
+# is bounded in rows, batches and concurrent release calls so it stays in the
+# background next to checkout traffic.
+#
+# A batch is claimed by failing its orders and committing, so no row lock is
+# held across the release calls. From then on the saga leaves the order alone
+# and a payment that still lands for it is refunded. Inventory releases by
+# order from its reservation ledger, so a release that is repeated later is a
+# no-op; one that fails now is retried through an OrderCancelled event.
+class PendingOrderReaper:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        pending_timeout: float,
+        interval: float,
+        batch_size: int,
+        max_batches: int,
+        concurrency: int,
+    ) -> None:
+        self._session_factory = session_factory
+        self._pending_timeout = pending_timeout
+        self._interval = interval
+        self._batch_size = batch_size
+        self._max_batches = max_batches
+        self._concurrency = concurrency
+        self._task: asyncio.Task[None] | None = None
+
+    async def _release(self, order: Order, limit: asyncio.Semaphore) -> bool:
+        async with limit:
+            return await InternalServiceClient.release_stock_batch(
+                order.id,
+                [(item.product_id, int(item.quantity)) for item in order.items],
+            )
+
+    async def _claim(self) -> list[Order]:
+        cutoff = datetime.now(timezone.utc) - timedelta(  # noqa: UP017
+            seconds=self._pending_timeout
+        )
+        async with self._session_factory() as db:
+            # SKIP LOCKED lets several replicas sweep without claiming twice
+            result = await db.execute(
+                select(Order)
+                .options(selectinload(Order.items))
+                .where(Order.status == OrderStatus.PENDING, Order.created_at < cutoff)
+                .order_by(Order.created_at)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True, of=Order)
+            )
+            orders = list(result.scalars().all())
+            for order in orders:
+                order.status = OrderStatus.FAILED
+            await db.commit()
+        return orders
+
+    async def _defer_releases(self, orders: list[Order]) -> None:
+        async with self._session_factory() as db:
+            for order in orders:
+                logger.warning("Could not release stock for order %s", order.id)
+                OutboxService.add_event(db, order_cancelled(order, "expired"))
+            await db.commit()
+        outbox_relay.notify()
+
+    async def reap_batch(self) -> tuple[int, int]:
+        orders = await self._claim()
+        if not orders:
+            return 0, 0
+
+        limit = asyncio.Semaphore(self._concurrency)
+        released = await asyncio.gather(
+            *(self._release(order, limit) for order in orders)
+        )
+        deferred = [order for order, ok in zip(orders, released, strict=True) if not ok]
+        if deferred:
+            await self._defer_releases(deferred)
+
+        ORDERS_REAPED.labels(outcome="released").inc(len(orders) - len(deferred))
+        ORDERS_REAPED.labels(outcome="release_deferred").inc(len(deferred))
+        return len(orders), len(orders) - len(deferred)
+
+    async def reap_once(self) -> int:
+        total = 0
+        for _ in range(self._max_batches):
+            handled, released = await self.reap_batch()
+            total += handled
+            # Stop early when caught up or when inventory is refusing releases
+            if handled < self._batch_size or released < handled:
+                break
+        return total
+
+    async def run(self) -> None:
+        while True:
+            try:
+                reaped = await self.reap_once()
+                if reaped:
+                    logger.info("Reaped %d expired pending orders", reaped)
+            except Exception:
+                logger.exception("Pending order sweep failed")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+pending_order_reaper = PendingOrderReaper(
+    SessionLocal,
+    pending_timeout=settings.ORDER_PENDING_TIMEOUT_SECONDS,
+    interval=settings.ORDER_REAPER_INTERVAL,
+    batch_size=settings.ORDER_REAPER_BATCH_SIZE,
+    max_batches=settings.ORDER_REAPER_MAX_BATCHES,
+    concurrency=settings.ORDER_REAPER_CONCURRENCY,
+)
@@ -0,0 +1,209 @@
+import random
+import time
+from collections import deque
+from enum import IntEnum
+
+from app.core.config import settings
+from prometheus_client import Counter, Gauge
+
+CIRCUIT_BREAKER_STATE = Gauge(
+    "internal_http_circuit_state",
+    "Circuit breaker state per downstream (0=closed, 1=open, 2=half-open)",
+    ["downstream"],
+)
+CIRCUIT_SHORT_CIRCUITED = Counter(
+    "internal_http_short_circuited_total",
+    "Calls rejected without reaching the downstream because its circuit is open",
+    ["downstream"],
+)
+RETRIES = Counter(
+    "internal_http_retries_total",
+    "Retried internal calls per downstream",
+    ["downstream"],
+)
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "internal_http_retry_budget_exhausted_total",
+    "Retries skipped because the downstream's retry budget was spent",
+    ["downstream"],
+)
+ADAPTIVE_TIMEOUT = Gauge(
+    "internal_http_adaptive_timeout_seconds",
+    "Current read timeout derived from observed latency per downstream",
+    ["downstream"],
+)
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self.reset()
+
+    def reset(self) -> None:
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._set_state(CircuitState.CLOSED)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        CIRCUIT_BREAKER_STATE.labels(downstream=self.name).set(int(state))
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self._reset_timeout
+        ):
+            self._half_open_calls = 0
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        # Half-open lets a few probe calls through to test the downstream
+        if (
+            state == CircuitState.HALF_OPEN
+            and self._half_open_calls < self._half_open_max_calls
+        ):
+            self._half_open_calls += 1
+            return True
+        CIRCUIT_SHORT_CIRCUITED.labels(downstream=self.name).inc()
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self._state == CircuitState.HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+
+# Retries may add at most `ratio` extra load on top of first attempts, plus a
+# small floor so a quiet service can still retry the odd blip.
+class RetryBudget:
+    def __init__(
+        self, ratio: float, min_per_second: float, max_tokens: float = 10.0
+    ) -> None:
+        self._ratio = ratio
+        self._min_per_second = min_per_second
+        self._max_tokens = max_tokens
+        self.reset()
+
+    def reset(self) -> None:
+        self._tokens = 0.0
+        self._refilled_at = time.monotonic()
+
+    def _refill(self, amount: float) -> None:
+        self._tokens = min(self._max_tokens, self._tokens + amount)
+
+    def record_request(self) -> None:
+        self._refill(self._ratio)
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._refill((now - self._refilled_at) * self._min_per_second)
+        self._refilled_at = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+# Read timeout follows a high percentile of recent successful latencies,
+# clamped between a floor and the configured per-downstream ceiling.
+class LatencyTracker:
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        min_timeout: float,
+        percentile: float,
+        multiplier: float,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        self.name = name
+        self._max_timeout = max_timeout
+        self._min_timeout = min_timeout
+        self._percentile = percentile
+        self._multiplier = multiplier
+        self._min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._timeout = self._max_timeout
+        ADAPTIVE_TIMEOUT.labels(downstream=self.name).set(self._timeout)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        if len(self._samples) < self._min_samples:
+            return
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self._percentile))
+        self._timeout = max(
+            self._min_timeout,
+            min(self._max_timeout, ordered[index] * self._multiplier),
+        )
+        ADAPTIVE_TIMEOUT.labels(downstream=self.name).set(self._timeout)
+
+    def timeout(self) -> float:
+        return self._timeout
+
+
+class Downstream:
+    def __init__(self, name: str, max_timeout: float) -> None:
+        self.name = name
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+        )
+        self.retry_budget = RetryBudget(
+            ratio=settings.RETRY_BUDGET_RATIO,
+            min_per_second=settings.RETRY_MIN_PER_SECOND,
+        )
+        self.latency = LatencyTracker(
+            name,
+            max_timeout=max_timeout,
+            min_timeout=settings.ADAPTIVE_TIMEOUT_MIN,
+            percentile=settings.ADAPTIVE_TIMEOUT_PERCENTILE,
+            multiplier=settings.ADAPTIVE_TIMEOUT_MULTIPLIER,
+        )
+
+    def reset(self) -> None:
+        self.breaker.reset()
+        self.retry_budget.reset()
+        self.latency.reset()
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying callers from synchronising
+        ceiling = min(
+            settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2**attempt
+        )
+        return random.uniform(0, ceiling)
@@ -0,0 +1,122 @@
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.order import Order
+from app.services.order_service import OrderService
+from app.services.outbox import OutboxService, outbox_relay
+
+from shared.enums.status import OrderStatus
+from shared.messaging.rabbitmq import EventConsumer
+from shared.schemas.base import DomainEvent
+from shared.schemas.events import (
+    OrderCancelledEvent,
+    OrderCompletedEvent,
+    PaymentFailedEvent,
+    PaymentProcessedEvent,
+    PaymentRefundRequestedEvent,
+    StockReservationFailedEvent,
+)
+
+QUEUE_NAME = "order-service.saga"
+
+
+async def _finish_pending_order(
+    order_id: UUID,
+    status: OrderStatus,
+    follow_up: Callable[[Order], DomainEvent] | None = None,
+) -> Order | None:
+    # Only a PENDING order moves on, so redelivered events are no-ops. The
+    # row lock keeps this and a concurrent reaper sweep from both winning.
+    async with SessionLocal() as db:
+        order = await OrderService.get_order(db, order_id, for_update=True)
+        if order is None or order.status != OrderStatus.PENDING:
+            return None
+        order.status = status
+        if follow_up is not None:
+            OutboxService.add_event(db, follow_up(order))
+        await db.commit()
+    if follow_up is not None:
+        outbox_relay.notify()
+    return order
+
+
+def _order_completed(order: Order) -> DomainEvent:
+    return OrderCompletedEvent(correlation_id=order.id, payload={"order_id": order.id})
+
+
+def order_cancelled(order: Order, reason: str) -> DomainEvent:
+    # Compensation: inventory releases the stock it reserved for this order
+    return OrderCancelledEvent(
+        correlation_id=order.id,
+        payload={
+            "order_id": order.id,
+            "reason": reason,
+            "items": [
+                {"product_id": item.product_id, "quantity": int(item.quantity)}
+                for item in order.items
+            ],
+        },
+    )
+
+
+async def handle_stock_reservation_failed(message: dict[str, Any]) -> None:
+    event = StockReservationFailedEvent.model_validate(message)
+    await _finish_pending_order(
+        UUID(str(event.payload["order_id"])), OrderStatus.FAILED
+    )
+
+
+async def _refund_failed_order(order_id: UUID, payment_id: Any) -> None:
+    # The order was failed (e.g. by the reaper) while its payment was still in
+    # flight. The charge went through for an order that will not be fulfilled,
+    # so it is handed back; payment-service refunds each payment at most once.
+    async with SessionLocal() as db:
+        order = await OrderService.get_order(db, order_id, for_update=True)
+        if order is None or order.status != OrderStatus.FAILED:
+            return
+        OutboxService.add_event(
+            db,
+            PaymentRefundRequestedEvent(
+                correlation_id=order.id,
+                payload={
+                    "order_id": order.id,
+                    "payment_id": payment_id,
+                    "reason": "order_failed",
+                },
+            ),
+        )
+        await db.commit()
+    outbox_relay.notify()
+
+
+async def handle_payment_processed(message: dict[str, Any]) -> None:
+    event = PaymentProcessedEvent.model_validate(message)
+    order_id = UUID(str(event.payload["order_id"]))
+    order = await _finish_pending_order(order_id, OrderStatus.PAID, _order_completed)
+    if order is None:
+        await _refund_failed_order(order_id, event.payload.get("payment_id"))
+
+
+async def handle_payment_failed(message: dict[str, Any]) -> None:
+    event = PaymentFailedEvent.model_validate(message)
+    reason = event.payload.get("reason", "payment_failed")
+    await _finish_pending_order(
+        UUID(str(event.payload["order_id"])),
+        OrderStatus.FAILED,
+        lambda order: order_cancelled(order, reason),
+    )
+
+
+def build_consumer() -> EventConsumer:
+    return EventConsumer(
+        settings.RABBITMQ_URL,
+        QUEUE_NAME,
+        {
+            "StockReservationFailed": handle_stock_reservation_failed,
+            "PaymentProcessed": handle_payment_processed,
+            "PaymentFailed": handle_payment_failed,
+        },
+    )
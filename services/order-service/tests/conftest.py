@@ -1,5 +1,7 @@
 import os
-from unittest.mock import AsyncMock, MagicMock
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 import pytest_asyncio
@@ -13,6 +15,69 @@ from app.main import app
 from httpx import ASGITransport, AsyncClient
 
 
+class ClientPrices:
+    # Keeps the prices sent by the test; test_pricing covers catalog lookups
+    @staticmethod
+    async def price_order(order_in):
+        return order_in
+
+    @staticmethod
+    async def resolve(product_ids):
+        return {}
+
+    @staticmethod
+    def apply(order_in, prices):
+        return order_in
+
+
+class FakeIdempotencyStore:
+    # In-process stand-in for RedisIdempotencyStore (SET NX with expiry)
+    def __init__(self) -> None:
+        self._records: dict[str, tuple[float, dict[str, Any]]] = {}
+
+    def _live(self, key: str) -> dict[str, Any] | None:
+        entry = self._records.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= time.monotonic():
+            del self._records[key]
+            return None
+        return record
+
+    async def claim(self, key: str, record: dict[str, Any], ttl: int) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._records[key] = (time.monotonic() + ttl, record)
+        return True
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        return self._live(key)
+
+    async def save(self, key: str, record: dict[str, Any], ttl: int) -> None:
+        self._records[key] = (time.monotonic() + ttl, record)
+
+    async def delete(self, key: str) -> None:
+        self._records.pop(key, None)
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def idempotency_store():
+    return FakeIdempotencyStore()
+
+
+@pytest.fixture(autouse=True)
+def client_prices():
+    with (
+        patch("app.api.v1.endpoints.orders.PricingService", ClientPrices),
+        patch("app.services.bulk_orders.PricingService", ClientPrices),
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_db_session():
     session = AsyncMock()
@@ -0,0 +1,154 @@
+import json
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.models.order import Order, OrderItem
+from app.models.outbox import OutboxEvent
+
+from shared.streaming import iter_lines
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _collect(chunks, max_line_bytes=64):
+    return [line async for line in iter_lines(chunks, max_line_bytes)]
+
+
+def _record(quantity=1):
+    return {
+        "user_id": str(uuid.uuid4()),
+        "shipping_address": "123 Street",
+        "items": [
+            {"product_id": str(uuid.uuid4()), "quantity": quantity, "price": 10.0}
+        ],
+    }
+
+
+@pytest.fixture
+def bulk_session(mock_db_session):
+    mock_db_session.add = MagicMock()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield mock_db_session
+
+    with (
+        patch("app.services.bulk_orders.SessionLocal", session_factory),
+        patch("app.services.bulk_orders.outbox_relay") as relay,
+    ):
+        yield mock_db_session, relay
+
+
+@pytest.mark.asyncio
+async def test_lines_are_split_across_chunks():
+    lines = await _collect(_chunks(b'{"a"', b": 1}\n\n{", b'"b": 2}'))
+    assert lines == [(1, b'{"a": 1}'), (2, b""), (3, b'{"b": 2}')]
+
+
+@pytest.mark.asyncio
+async def test_oversized_line_is_skipped():
+    lines = await _collect(_chunks(b"x" * 40, b"x" * 40, b"\n{}\n"), max_line_bytes=64)
+    assert lines == [(1, None), (2, b"{}")]
+
+
+@pytest.mark.asyncio
+async def test_bulk_orders_stream_results_per_record(client, bulk_session):
+    db, relay = bulk_session
+    reserved_record, short_record = _record(), _record(quantity=500)
+    body = b"\n".join(
+        [
+            json.dumps(reserved_record).encode(),
+            b'{"user_id": "not-a-uuid"}',
+            json.dumps(short_record).encode(),
+        ]
+    )
+
+    async def reserve_orders(orders):
+        # Stock runs out for the second valid record
+        return {order_id: index == 0 for index, (order_id, _) in enumerate(orders)}
+
+    with patch(
+        "app.services.bulk_orders.InternalServiceClient.reserve_orders",
+        new_callable=AsyncMock,
+        side_effect=reserve_orders,
+    ) as mock_reserve:
+        response = await client.post(
+            "/api/v1/orders/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["line"], r["status"]) for r in results] == [
+        (2, "rejected"),
+        (1, "pending"),
+        (3, "failed"),
+    ]
+
+    # One reservation call and one multi-row insert per table for the batch
+    mock_reserve.assert_awaited_once()
+    order_insert, item_insert = db.execute.await_args_list
+    assert order_insert.args[0].table.name == Order.__tablename__
+    assert len(order_insert.args[1]) == 2
+    assert item_insert.args[0].table.name == OrderItem.__tablename__
+    assert len(item_insert.args[1]) == 2
+    db.commit.assert_awaited_once()
+
+    outbox_rows = [call.args[0] for call in db.add.call_args_list]
+    assert [type(row) for row in outbox_rows] == [OutboxEvent]
+    assert outbox_rows[0].event_type == "StockReserved"
+    assert outbox_rows[0].correlation_id == uuid.UUID(results[1]["order_id"])
+    relay.notify.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_orders_are_batched(client, bulk_session):
+    db, _ = bulk_session
+    body = b"\n".join(json.dumps(_record()).encode() for _ in range(5))
+
+    async def reserve_orders(orders):
+        return {order_id: True for order_id, _ in orders}
+
+    with (
+        patch("app.services.bulk_orders.settings.BULK_ORDER_BATCH_SIZE", 2),
+        patch(
+            "app.services.bulk_orders.InternalServiceClient.reserve_orders",
+            new_callable=AsyncMock,
+            side_effect=reserve_orders,
+        ) as mock_reserve,
+    ):
+        response = await client.post("/api/v1/orders/bulk", content=body)
+
+    assert [json.loads(line)["line"] for line in response.text.splitlines()] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+    assert [len(call.args[0]) for call in mock_reserve.await_args_list] == [2, 2, 1]
+    assert db.commit.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_orders_inventory_unavailable(client, bulk_session):
+    db, _ = bulk_session
+    with patch(
+        "app.services.bulk_orders.InternalServiceClient.reserve_orders",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        response = await client.post(
+            "/api/v1/orders/bulk", content=json.dumps(_record()).encode()
+        )
+
+    result = json.loads(response.text)
+    assert result["status"] == "rejected"
+    db.execute.assert_not_awaited()
@@ -0,0 +1,155 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.models.order import Order
+from app.services.idempotency import (
+    IdempotencyKeyInUseError,
+    IdempotencyService,
+)
+
+from shared.enums.status import OrderStatus
+
+
+def _order_data(quantity=2):
+    return {
+        "user_id": str(uuid.uuid4()),
+        "shipping_address": "123 Street",
+        "items": [
+            {"product_id": str(uuid.uuid4()), "quantity": quantity, "price": 50.0}
+        ],
+    }
+
+
+def _paid_order(order_data):
+    return Order(
+        id=uuid.uuid4(),
+        user_id=uuid.UUID(order_data["user_id"]),
+        status=OrderStatus.PAID,
+        total_amount=100.0,
+        shipping_address=order_data["shipping_address"],
+        items=[],
+    )
+
+
+@pytest.fixture
+def fresh_idempotency(idempotency_store):
+    service = IdempotencyService(
+        idempotency_store, ttl=60, in_flight_ttl=5, wait_timeout=1.0
+    )
+    with patch("app.api.v1.endpoints.orders.idempotency", service):
+        yield service
+
+
+@pytest.mark.asyncio
+async def test_create_order_replays_stored_response(client, fresh_idempotency):
+    order_data = _order_data()
+    headers = {"Idempotency-Key": "retry-1"}
+    with patch(
+        "app.api.v1.endpoints.orders.OrderService.create_order",
+        new_callable=AsyncMock,
+    ) as mock_create:
+        mock_create.return_value = _paid_order(order_data)
+
+        first = await client.post("/api/v1/orders/", json=order_data, headers=headers)
+        second = await client.post("/api/v1/orders/", json=order_data, headers=headers)
+
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.json() == first.json()
+    mock_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_create_one_order(client, fresh_idempotency):
+    order_data = _order_data()
+    headers = {"Idempotency-Key": "double-click"}
+
+    async def slow_create(db, order_in):
+        await asyncio.sleep(0.05)
+        return _paid_order(order_data)
+
+    with patch(
+        "app.api.v1.endpoints.orders.OrderService.create_order",
+        new_callable=AsyncMock,
+        side_effect=slow_create,
+    ) as mock_create:
+        responses = await asyncio.gather(
+            *(
+                client.post("/api/v1/orders/", json=order_data, headers=headers)
+                for _ in range(3)
+            )
+        )
+
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert len({r.json()["id"] for r in responses}) == 1
+    mock_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reused_key_with_different_body_is_rejected(client, fresh_idempotency):
+    headers = {"Idempotency-Key": "reused"}
+    order_data = _order_data()
+    with patch(
+        "app.api.v1.endpoints.orders.OrderService.create_order",
+        new_callable=AsyncMock,
+    ) as mock_create:
+        mock_create.return_value = _paid_order(order_data)
+
+        await client.post("/api/v1/orders/", json=order_data, headers=headers)
+        order_data["items"][0]["quantity"] = 3
+        response = await client.post(
+            "/api/v1/orders/", json=order_data, headers=headers
+        )
+
+    assert response.status_code == 422
+    mock_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_releases_the_key(idempotency_store):
+    service = IdempotencyService(
+        idempotency_store, ttl=60, in_flight_ttl=5, wait_timeout=0.1
+    )
+    handler = AsyncMock(side_effect=[(503, {"detail": "down"}), (201, {"id": "1"})])
+
+    assert await service.execute("k", "f", handler) == (503, {"detail": "down"}, False)
+    assert await service.execute("k", "f", handler) == (201, {"id": "1"}, False)
+    assert await service.execute("k", "f", handler) == (201, {"id": "1"}, True)
+    assert handler.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_in_flight_key_held_elsewhere_times_out(idempotency_store):
+    store = idempotency_store
+    # Another replica claimed the key and has not finished yet
+    await store.claim("k", {"state": "in_flight", "fingerprint": "f"}, 5)
+    service = IdempotencyService(
+        store, ttl=60, in_flight_ttl=5, wait_timeout=0.1, poll_interval=0.01
+    )
+
+    with pytest.raises(IdempotencyKeyInUseError):
+        await service.execute("k", "f", AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_without_a_store_is_rejected(client):
+    service = IdempotencyService(None, ttl=60, in_flight_ttl=5, wait_timeout=0.1)
+    with (
+        patch("app.api.v1.endpoints.orders.idempotency", service),
+        patch(
+            "app.api.v1.endpoints.orders.OrderService.create_order",
+            new_callable=AsyncMock,
+        ) as mock_create,
+    ):
+        response = await client.post(
+            "/api/v1/orders/",
+            json=_order_data(),
+            headers={"Idempotency-Key": "retry-1"},
+        )
+
+    assert response.status_code == 503
+    mock_create.assert_not_awaited()
@@ -0,0 +1,195 @@
+import uuid
+from unittest.mock import patch
+
+import httpx
+import pytest
+from app.core.config import settings
+from app.services.internal_client import (
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    INVENTORY,
+    PAYMENT,
+    InternalServiceClient,
+)
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitState,
+    LatencyTracker,
+    RetryBudget,
+)
+
+
+@pytest.mark.asyncio
+async def test_calls_share_one_client():
+    seen_paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_paths.append(request.url.path)
+        return httpx.Response(200, json={"status": "success"})
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        client = InternalServiceClient.get_client()
+        assert await InternalServiceClient.reserve_stock_batch(
+            uuid.uuid4(), [(uuid.uuid4(), 1)]
+        )
+        assert await InternalServiceClient.process_payment(uuid.uuid4(), 10.0)
+        assert InternalServiceClient.get_client() is client
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert seen_paths == [
+        "/api/v1/inventory/reserve/batch",
+        "/api/v1/payments/process",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transport_error_returns_false():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        assert not await InternalServiceClient.release_stock_batch(
+            uuid.uuid4(), [(uuid.uuid4(), 1)]
+        )
+    finally:
+        await InternalServiceClient.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_in_flight():
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(downstream="payment")
+    during = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        during.append(in_flight._value.get())
+        return httpx.Response(200)
+
+    sent = HTTP_REQUESTS._value.get()
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        assert await InternalServiceClient.process_payment(uuid.uuid4(), 10.0)
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert during == [1]
+    assert in_flight._value.get() == 0
+    assert HTTP_REQUESTS._value.get() == sent + 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_downstream_is_retried_after_retry_after():
+    responses = iter([httpx.Response(503, headers={"Retry-After": "0"}), None])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return next(responses) or httpx.Response(200)
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        # The retry budget's per-second floor covers an occasional retry
+        PAYMENT.retry_budget._tokens = 1.0
+        assert await InternalServiceClient.process_payment(uuid.uuid4(), 10.0)
+    finally:
+        await InternalServiceClient.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"Retry-After": "120"}])
+async def test_shedding_downstream_is_not_retried(headers):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503, headers=headers)
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        PAYMENT.retry_budget._tokens = 5.0
+        assert not await InternalServiceClient.process_payment(uuid.uuid4(), 10.0)
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_timeout_is_not_retried():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        raise httpx.ReadTimeout("slow", request=request)
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        INVENTORY.retry_budget._tokens = 5.0
+        assert not await InternalServiceClient.reserve_stock_batch(
+            uuid.uuid4(), [(uuid.uuid4(), 1)]
+        )
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_short_circuits_calls():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(500)
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD + 3):
+            assert not await InternalServiceClient.process_payment(uuid.uuid4(), 1.0)
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert len(calls) == settings.CIRCUIT_FAILURE_THRESHOLD
+    assert PAYMENT.breaker.state == CircuitState.OPEN
+
+
+def test_breaker_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10.0)
+    with patch("app.services.resilience.time.monotonic", return_value=100.0):
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow()
+
+    with patch("app.services.resilience.time.monotonic", return_value=111.0):
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+
+    with patch("app.services.resilience.time.monotonic", return_value=122.0):
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+
+def test_retry_budget_caps_retries():
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0)
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_latency_tracker_tightens_timeout():
+    tracker = LatencyTracker(
+        "test", max_timeout=3.0, min_timeout=0.25, percentile=0.99, multiplier=2.0
+    )
+    assert tracker.timeout() == 3.0
+    for _ in range(50):
+        tracker.observe(0.2)
+    assert tracker.timeout() == pytest.approx(0.4)
+    for _ in range(50):
+        tracker.observe(10.0)
+    assert tracker.timeout() == 3.0
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from shared.enums.status import OrderStatus
+
+
+def _row(order_id, item_id=None, status=OrderStatus.PAID):
+    return SimpleNamespace(
+        order_id=order_id,
+        user_id=uuid.UUID(int=1),
+        status=status,
+        total_amount=20.0,
+        shipping_address="123 Street",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),  # noqa: UP017
+        item_id=item_id,
+        product_id=uuid.UUID(int=2) if item_id else None,
+        quantity=2.0 if item_id else None,
+        price=10.0 if item_id else None,
+    )
+
+
+@pytest.fixture
+def export_stream():
+    db = AsyncMock()
+
+    def stream_partitions(*partitions):
+        async def partitions_iter():
+            for partition in partitions:
+                yield partition
+
+        result = MagicMock()
+        result.partitions.return_value = partitions_iter()
+        db.stream.return_value = result
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db
+
+    with patch("app.services.order_export.SessionLocal", session_factory):
+        yield db, stream_partitions
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_groups_items_across_partitions(client, export_stream):
+    db, stream_partitions = export_stream
+    first, second = uuid.uuid4(), uuid.uuid4()
+    stream_partitions(
+        [_row(first, uuid.uuid4()), _row(first, uuid.uuid4())],
+        [_row(first, uuid.uuid4()), _row(second)],
+    )
+
+    response = await client.get(
+        "/api/v1/orders/export",
+        params={"status": "paid", "created_from": "2024-01-01T00:00:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert [order["order_id"] for order in orders] == [str(first), str(second)]
+    assert len(orders[0]["items"]) == 3
+    assert orders[1]["items"] == []
+
+    statement = db.stream.await_args.args[0]
+    assert statement.get_execution_options()["yield_per"] > 0
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "orders.status = " in sql
+    assert "orders.created_at >= " in sql
+    assert "orders.created_at < " not in sql
+
+
+@pytest.mark.asyncio
+async def test_export_csv_writes_one_row_per_item(client, export_stream):
+    _, stream_partitions = export_stream
+    order_id = uuid.uuid4()
+    stream_partitions([_row(order_id, uuid.uuid4())], [_row(order_id, uuid.uuid4())])
+
+    response = await client.get("/api/v1/orders/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="orders.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert {row["order_id"] for row in rows} == {str(order_id)}
+    assert rows[0]["status"] == "paid"
+
+
+@pytest.mark.asyncio
+async def test_export_csv_without_orders_has_header(client, export_stream):
+    _, stream_partitions = export_stream
+    stream_partitions()
+
+    response = await client.get("/api/v1/orders/export", params={"format": "csv"})
+
+    assert response.text.splitlines() == [
+        "order_id,user_id,status,total_amount,shipping_address,created_at,"
+        "item_id,product_id,quantity,price"
+    ]
@@ -1,7 +1,11 @@
 import uuid
-from unittest.mock import AsyncMock, patch
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from app.core.pagination import decode_cursor
+from app.models.order import Order
+from sqlalchemy.dialects import postgresql
 
 from shared.enums.status import OrderStatus
 
@@ -19,7 +23,7 @@ async def test_create_order_success(client, mock_db_session):
     # Mock InternalServiceClient
     with (
         patch(
-            "app.services.order_service.InternalServiceClient.reserve_stock",
+            "app.services.order_service.InternalServiceClient.reserve_stock_batch",
             new_callable=AsyncMock,
         ) as mock_reserve,
         patch(
@@ -57,11 +61,11 @@ async def test_create_order_stock_failure(client, mock_db_session):
     # Mock InternalServiceClient
     with (
         patch(
-            "app.services.order_service.InternalServiceClient.reserve_stock",
+            "app.services.order_service.InternalServiceClient.reserve_stock_batch",
             new_callable=AsyncMock,
         ) as mock_reserve,
         patch(
-            "app.services.order_service.InternalServiceClient.release_stock",
+            "app.services.order_service.InternalServiceClient.release_stock_batch",
             new_callable=AsyncMock,
         ) as mock_release,
     ):
@@ -75,3 +79,117 @@ async def test_create_order_stock_failure(client, mock_db_session):
 
         assert response.status_code == 400
         assert "insufficient stock" in response.json()["detail"].lower()
+        mock_reserve.assert_awaited_once()
+        mock_release.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_order_reserves_all_items_in_one_call(client, mock_db_session):
+    user_id = str(uuid.uuid4())
+    product_ids = [uuid.uuid4() for _ in range(3)]
+    order_data = {
+        "user_id": user_id,
+        "items": [
+            {"product_id": str(product_id), "quantity": 1, "price": 10.0}
+            for product_id in product_ids
+        ],
+    }
+
+    with (
+        patch(
+            "app.services.order_service.InternalServiceClient.reserve_stock_batch",
+            new_callable=AsyncMock,
+        ) as mock_reserve,
+        patch(
+            "app.services.order_service.InternalServiceClient.process_payment",
+            new_callable=AsyncMock,
+        ) as mock_payment,
+        patch(
+            "app.services.order_service.InternalServiceClient.release_stock_batch",
+            new_callable=AsyncMock,
+        ) as mock_release,
+    ):
+        mock_reserve.return_value = True
+        mock_payment.return_value = False
+        mock_db_session.refresh = AsyncMock()
+
+        response = await client.post("/api/v1/orders/", json=order_data)
+
+        assert response.status_code == 400
+        mock_reserve.assert_awaited_once()
+        reserved_items = mock_reserve.await_args.args[1]
+        assert [product_id for product_id, _ in reserved_items] == product_ids
+        mock_release.assert_awaited_once_with(
+            mock_reserve.await_args.args[0], reserved_items
+        )
+
+
+def _order(created_at: datetime) -> Order:
+    return Order(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        total_amount=10.0,
+        status=OrderStatus.PAID,
+        created_at=created_at,
+        items=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_user_orders_keyset_pagination(client, mock_db_session):
+    now = datetime.now(timezone.utc)  # noqa: UP017
+    orders = [_order(now - timedelta(minutes=i)) for i in range(3)]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = orders
+
+    user_id = uuid.uuid4()
+    response = await client.get(f"/api/v1/orders/user/{user_id}?limit=2")
+
+    assert response.status_code == 200
+    assert [order["id"] for order in response.json()] == [
+        str(order.id) for order in orders[:2]
+    ]
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_cursor(cursor) == (orders[1].created_at, orders[1].id)
+
+    response = await client.get(
+        f"/api/v1/orders/user/{user_id}", params={"limit": 2, "cursor": cursor}
+    )
+    assert response.status_code == 200
+    sql = str(
+        mock_db_session.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert "(orders.created_at, orders.id) < (" in sql
+    assert "ORDER BY orders.created_at DESC, orders.id DESC" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_user_orders_rejects_bad_cursor(client):
+    response = await client.get(
+        f"/api/v1/orders/user/{uuid.uuid4()}", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_user_order_summaries_skip_items(client, mock_db_session):
+    order = _order(datetime.now(timezone.utc))  # noqa: UP017
+    row = MagicMock(
+        id=order.id,
+        user_id=order.user_id,
+        total_amount=order.total_amount,
+        status=order.status,
+        shipping_address=None,
+        created_at=order.created_at,
+        item_count=4,
+    )
+    mock_db_session.execute.return_value.all.return_value = [row]
+
+    response = await client.get(f"/api/v1/orders/user/{order.user_id}/summary")
+
+    assert response.status_code == 200
+    assert response.json()[0]["item_count"] == 4
+    assert "items" not in response.json()[0]
+    assert "X-Next-Cursor" not in response.headers
+    sql = str(mock_db_session.execute.await_args.args[0])
+    assert "orderitems" in sql  # only inside the count subquery
+    assert "orderitems.price" not in sql
@@ -0,0 +1,97 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from app.models.outbox import OutboxEvent
+from app.services.outbox import OutboxRelay
+
+from shared.schemas.events import OrderCompletedEvent
+
+
+def _outbox_row(row_id: int, correlation_id: uuid.UUID) -> OutboxEvent:
+    event = OrderCompletedEvent(
+        correlation_id=correlation_id, payload={"order_id": correlation_id}
+    )
+    return OutboxEvent(
+        id=row_id,
+        event_id=event.event_id,
+        event_type=event.event_type,
+        correlation_id=correlation_id,
+        message=event.model_dump(mode="json"),
+    )
+
+
+def _relay(mock_db_session, publisher, batch_size=10) -> OutboxRelay:
+    @asynccontextmanager
+    async def session_factory():
+        yield mock_db_session
+
+    return OutboxRelay(session_factory, publisher, batch_size, poll_interval=0.01)
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_batch_in_order(mock_db_session):
+    correlation_id = uuid.uuid4()
+    rows = [_outbox_row(i, correlation_id) for i in (1, 2, 3)]
+    mock_db_session.scalar.return_value = True
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = rows
+    publisher = MagicMock()
+
+    sent = await _relay(mock_db_session, publisher).relay_once()
+
+    assert sent == 3
+    publisher.publish_many.assert_called_once()
+    published = [event.event_id for event in publisher.publish_many.call_args.args[0]]
+    assert published == [row.event_id for row in rows]
+    publisher.publish.assert_not_called()
+    # One SELECT for the batch, one UPDATE marking all of it sent
+    assert mock_db_session.execute.await_count == 2
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_relay_keeps_batch_queued_when_publish_fails(mock_db_session):
+    rows = [_outbox_row(i, uuid.uuid4()) for i in (1, 2, 3)]
+    mock_db_session.scalar.return_value = True
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = rows
+    publisher = MagicMock()
+    publisher.publish_many.side_effect = ConnectionError("broker down")
+
+    sent = await _relay(mock_db_session, publisher).relay_once()
+
+    assert sent == 0
+    publisher.publish_many.assert_called_once()
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_relay_skips_when_another_relay_holds_the_lock(mock_db_session):
+    mock_db_session.scalar.return_value = False
+    publisher = MagicMock()
+
+    assert await _relay(mock_db_session, publisher).relay_once() == 0
+    publisher.publish_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_relay_dead_letters_malformed_rows(mock_db_session):
+    rows = [_outbox_row(i, uuid.uuid4()) for i in (1, 2, 3)]
+    rows[1].message = {"event_type": "OrderCompleted"}
+    mock_db_session.scalar.return_value = True
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = rows
+    publisher = MagicMock()
+
+    sent = await _relay(mock_db_session, publisher).relay_once()
+
+    assert sent == 3
+    published = [event.event_id for event in publisher.publish_many.call_args.args[0]]
+    assert published == [rows[0].event_id, rows[2].event_id]
+    select_rows, dead_letter, mark_sent = (
+        call.args[0] for call in mock_db_session.execute.await_args_list
+    )
+    assert "outboxevents.dead_lettered_at IS NULL" in str(select_rows)
+    assert "dead_lettered_at" in str(dead_letter)
+    assert dead_letter.compile().params["id_1"] == [2]
+    assert mark_sent.compile().params["id_1"] == [1, 3]
+    mock_db_session.commit.assert_awaited_once()
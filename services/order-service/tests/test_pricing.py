@@ -0,0 +1,240 @@
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from app.schemas.order import OrderCreate
+from app.services import pricing
+from app.services.internal_client import PRODUCT_BATCH_MAX_IDS, InternalServiceClient
+from app.services.pricing import (
+    PriceLookupUnavailableError,
+    PricingService,
+    UnknownProductsError,
+)
+
+from shared.cache import TTLCache
+from shared.schemas.events import ProductChangedEvent
+
+
+@pytest.fixture
+def cache():
+    fresh = TTLCache(ttl=60, max_entries=100)
+    with patch("app.services.pricing.price_cache", fresh):
+        yield fresh
+
+
+def _order(*product_ids, price=1.0):
+    return OrderCreate(
+        user_id=uuid.uuid4(),
+        items=[
+            {"product_id": product_id, "quantity": 2, "price": price}
+            for product_id in product_ids
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_prices_come_from_catalog_not_client(cache):
+    product = uuid.uuid4()
+    with patch(
+        "app.services.pricing.InternalServiceClient.get_product_prices",
+        new_callable=AsyncMock,
+        return_value={product: 25.0},
+    ):
+        priced = await PricingService.price_order(_order(product, price=0.01))
+
+    assert priced.items[0].price == 25.0
+
+
+@pytest.mark.asyncio
+async def test_cached_prices_skip_the_lookup(cache):
+    cached, fresh = uuid.uuid4(), uuid.uuid4()
+    cache.put_many({cached: 5.0})
+    with patch(
+        "app.services.pricing.InternalServiceClient.get_product_prices",
+        new_callable=AsyncMock,
+        return_value={fresh: 7.0},
+    ) as mock_lookup:
+        first = await PricingService.price_order(_order(cached, fresh))
+        second = await PricingService.price_order(_order(cached, fresh))
+
+    # Only the uncached product is fetched, and only once
+    mock_lookup.assert_awaited_once_with([fresh])
+    assert [item.price for item in first.items] == [5.0, 7.0]
+    assert [item.price for item in second.items] == [5.0, 7.0]
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_unavailable_products(cache):
+    product = uuid.uuid4()
+    with (
+        patch(
+            "app.services.pricing.InternalServiceClient.get_product_prices",
+            new_callable=AsyncMock,
+            return_value={},
+        ),
+        pytest.raises(UnknownProductsError),
+    ):
+        await PricingService.price_order(_order(product))
+
+    with (
+        patch(
+            "app.services.pricing.InternalServiceClient.get_product_prices",
+            new_callable=AsyncMock,
+            return_value=None,
+        ),
+        pytest.raises(PriceLookupUnavailableError),
+    ):
+        await PricingService.price_order(_order(product))
+
+
+@pytest.mark.asyncio
+async def test_product_changed_event_invalidates(cache):
+    product = uuid.uuid4()
+    cache.put_many({product: 5.0})
+
+    await pricing.handle_product_changed(
+        ProductChangedEvent(payload={"product_id": product, "price": 6.0}).model_dump(
+            mode="json"
+        )
+    )
+
+    assert cache.get_many([product]) == {}
+
+
+def test_cache_expires_and_evicts():
+    cache = TTLCache(ttl=10, max_entries=2)
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    with patch("shared.cache.time.monotonic", return_value=100.0):
+        cache.put_many({first: 1.0, second: 2.0, third: 3.0})
+        assert cache.get_many([first, second, third]) == {second: 2.0, third: 3.0}
+    with patch("shared.cache.time.monotonic", return_value=111.0):
+        assert cache.get_many([second, third]) == {}
+
+
+@pytest.mark.asyncio
+async def test_create_order_rejects_unknown_product(client, cache):
+    order_data = {
+        "user_id": str(uuid.uuid4()),
+        "items": [{"product_id": str(uuid.uuid4()), "quantity": 1, "price": 1.0}],
+    }
+    with (
+        patch("app.api.v1.endpoints.orders.PricingService", PricingService),
+        patch(
+            "app.services.pricing.InternalServiceClient.get_product_prices",
+            new_callable=AsyncMock,
+            return_value={},
+        ),
+    ):
+        response = await client.post("/api/v1/orders/", json=order_data)
+
+    assert response.status_code == 400
+    assert "Unknown products" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_get_product_prices_uses_batch_endpoint():
+    product = uuid.uuid4()
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "results": [
+                    {
+                        "id": str(product),
+                        "found": True,
+                        "product": {"id": str(product), "price": 9.5},
+                    }
+                ]
+            },
+        )
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        prices = await InternalServiceClient.get_product_prices([product])
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert prices == {product: 9.5}
+    assert requests[0].url.path == "/api/v1/products/batch"
+
+
+@pytest.mark.asyncio
+async def test_get_product_prices_splits_capped_batches():
+    product_ids = [uuid.uuid4() for _ in range(PRODUCT_BATCH_MAX_IDS + 1)]
+    unknown = product_ids[0]
+    batch_sizes = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["ids"]
+        batch_sizes.append(len(ids))
+        return httpx.Response(
+            200,
+            json={
+                "results": [
+                    {"id": product_id, "found": False, "product": None}
+                    if product_id == str(unknown)
+                    else {
+                        "id": product_id,
+                        "found": True,
+                        "product": {"id": product_id, "price": 2.5},
+                    }
+                    for product_id in ids
+                ]
+            },
+        )
+
+    await InternalServiceClient.startup(transport=httpx.MockTransport(handler))
+    try:
+        prices = await InternalServiceClient.get_product_prices(product_ids)
+    finally:
+        await InternalServiceClient.shutdown()
+
+    assert sorted(batch_sizes) == [1, PRODUCT_BATCH_MAX_IDS]
+    assert prices == {product_id: 2.5 for product_id in product_ids[1:]}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_fetch_is_not_overwritten(cache):
+    changed, unchanged = uuid.uuid4(), uuid.uuid4()
+    fetch_started, event_handled = asyncio.Event(), asyncio.Event()
+
+    async def slow_lookup(product_ids):
+        fetch_started.set()
+        await event_handled.wait()
+        return {changed: 5.0, unchanged: 7.0}
+
+    with patch(
+        "app.services.pricing.InternalServiceClient.get_product_prices",
+        side_effect=slow_lookup,
+    ):
+        pending = asyncio.create_task(PricingService.resolve({changed, unchanged}))
+        await fetch_started.wait()
+        await pricing.handle_product_changed(
+            ProductChangedEvent(
+                payload={"product_id": changed, "price": 6.0}
+            ).model_dump(mode="json")
+        )
+        event_handled.set()
+        prices = await pending
+
+    # The order still gets what was fetched, but the stale price is not cached
+    assert prices == {changed: 5.0, unchanged: 7.0}
+    assert cache.get_many([changed, unchanged]) == {unchanged: 7.0}
+
+
+def test_forgotten_invalidations_skip_late_puts():
+    cache = TTLCache(ttl=60, max_entries=2)
+    product = uuid.uuid4()
+    since = cache.generation
+    for _ in range(3):
+        cache.invalidate(uuid.uuid4())
+
+    cache.put_many({product: 1.0}, since=since)
+
+    assert cache.get_many([product]) == {}
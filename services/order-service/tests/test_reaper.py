@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.models.order import Order, OrderItem
+from app.models.outbox import OutboxEvent
+from app.services.reaper import PendingOrderReaper
+from sqlalchemy.dialects import postgresql
+
+from shared.enums.status import OrderStatus
+
+
+def _pending_order():
+    return Order(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        status=OrderStatus.PENDING,
+        total_amount=10.0,
+        items=[OrderItem(id=uuid.uuid4(), product_id=uuid.uuid4(), quantity=2.0)],
+    )
+
+
+def _reaper(session, batch_size=10, max_batches=5, concurrency=2):
+    @asynccontextmanager
+    async def session_factory():
+        yield session
+
+    return PendingOrderReaper(
+        session_factory,
+        pending_timeout=900,
+        interval=60,
+        batch_size=batch_size,
+        max_batches=max_batches,
+        concurrency=concurrency,
+    )
+
+
+def _batches(session, *batches):
+    results = []
+    for batch in batches:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = batch
+        results.append(result)
+    session.execute.side_effect = results
+
+
+def _outbox_rows(session) -> list[OutboxEvent]:
+    return [
+        call.args[0]
+        for call in session.add.call_args_list
+        if isinstance(call.args[0], OutboxEvent)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reaper_claims_then_releases_expired_orders(mock_db_session):
+    orders = [_pending_order(), _pending_order()]
+    _batches(mock_db_session, orders)
+    mock_db_session.add = MagicMock()
+    commits_at_release = []
+
+    async def release(order_id, items):
+        # The claim is committed before inventory is called
+        commits_at_release.append(mock_db_session.commit.await_count)
+        return order_id == orders[0].id
+
+    with (
+        patch(
+            "app.services.reaper.InternalServiceClient.release_stock_batch",
+            side_effect=release,
+        ) as mock_release,
+        patch("app.services.reaper.outbox_relay") as relay,
+    ):
+        reaped = await _reaper(mock_db_session).reap_once()
+
+    assert reaped == 2
+    assert commits_at_release == [1, 1]
+    assert mock_release.await_args_list[0].args == (
+        orders[0].id,
+        [(orders[0].items[0].product_id, 2)],
+    )
+    assert [order.status for order in orders] == [OrderStatus.FAILED] * 2
+    # A failed release is handed to inventory through the outbox
+    (outbox_row,) = _outbox_rows(mock_db_session)
+    assert outbox_row.event_type == "OrderCancelled"
+    assert outbox_row.message["payload"]["order_id"] == str(orders[1].id)
+    assert mock_db_session.commit.await_count == 2
+    relay.notify.assert_called_once()
+
+    statement = mock_db_session.execute.await_args_list[0].args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE OF orders SKIP LOCKED" in sql
+    assert "orders.created_at < " in sql
+
+
+@pytest.mark.asyncio
+async def test_reaper_sweeps_bounded_batches(mock_db_session):
+    _batches(
+        mock_db_session,
+        [_pending_order(), _pending_order()],
+        [_pending_order(), _pending_order()],
+        [_pending_order(), _pending_order()],
+    )
+
+    with patch(
+        "app.services.reaper.InternalServiceClient.release_stock_batch",
+        new_callable=AsyncMock,
+        return_value=True,
+    ):
+        reaped = await _reaper(mock_db_session, batch_size=2, max_batches=2).reap_once()
+
+    assert reaped == 4
+    assert mock_db_session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_limits_concurrent_releases(mock_db_session):
+    _batches(mock_db_session, [_pending_order() for _ in range(6)])
+    running = peak = 0
+
+    async def release(order_id, items):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    with patch(
+        "app.services.reaper.InternalServiceClient.release_stock_batch",
+        side_effect=release,
+    ):
+        await _reaper(mock_db_session, concurrency=2).reap_once()
+
+    assert peak == 2
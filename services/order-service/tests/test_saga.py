@@ -0,0 +1,156 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.core.config import settings
+from app.models.order import Order, OrderItem
+from app.models.outbox import OutboxEvent
+from app.services import saga
+from sqlalchemy.dialects import postgresql
+
+from shared.enums.status import OrderStatus
+from shared.schemas.events import PaymentFailedEvent, PaymentProcessedEvent
+
+
+@pytest.fixture
+def session_factory(mock_db_session):
+    @asynccontextmanager
+    async def _session():
+        yield mock_db_session
+
+    return _session
+
+
+def _outbox_rows(session) -> list[OutboxEvent]:
+    return [
+        call.args[0]
+        for call in session.add.call_args_list
+        if isinstance(call.args[0], OutboxEvent)
+    ]
+
+
+def _pending_order() -> Order:
+    order_id = uuid.uuid4()
+    return Order(
+        id=order_id,
+        user_id=uuid.uuid4(),
+        total_amount=20.0,
+        status=OrderStatus.PENDING,
+        items=[
+            OrderItem(
+                id=uuid.uuid4(),
+                order_id=order_id,
+                product_id=uuid.uuid4(),
+                quantity=2,
+                price=10.0,
+            )
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_placement_returns_accepted(client, mock_db_session):
+    order_data = {
+        "user_id": str(uuid.uuid4()),
+        "items": [{"product_id": str(uuid.uuid4()), "quantity": 1, "price": 5.0}],
+    }
+    mock_db_session.refresh = AsyncMock()
+    mock_db_session.add = MagicMock()
+
+    with (
+        patch.object(settings, "ORDER_SAGA_ASYNC", True),
+        patch(
+            "app.services.order_service.InternalServiceClient.reserve_stock_batch",
+            new_callable=AsyncMock,
+        ) as mock_reserve,
+    ):
+        response = await client.post("/api/v1/orders/", json=order_data)
+
+    assert response.status_code == 202
+    assert response.json()["status"] == OrderStatus.PENDING
+    mock_reserve.assert_not_awaited()
+    # The event is staged in the same transaction as the order
+    (outbox_row,) = _outbox_rows(mock_db_session)
+    assert outbox_row.event_type == "OrderCreated"
+    assert outbox_row.message["payload"]["order_id"] == response.json()["id"]
+    assert str(outbox_row.correlation_id) == response.json()["id"]
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_payment_processed_completes_order(mock_db_session, session_factory):
+    order = _pending_order()
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = order
+    event = PaymentProcessedEvent(
+        payload={"order_id": str(order.id), "payment_id": str(uuid.uuid4())}
+    )
+
+    mock_db_session.add = MagicMock()
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga, "outbox_relay") as relay,
+    ):
+        await saga.handle_payment_processed(event.model_dump(mode="json"))
+        # Redelivery of the same event leaves the order alone
+        await saga.handle_payment_processed(event.model_dump(mode="json"))
+
+    assert order.status == OrderStatus.PAID
+    (outbox_row,) = _outbox_rows(mock_db_session)
+    assert outbox_row.event_type == "OrderCompleted"
+    mock_db_session.commit.assert_awaited_once()
+    relay.notify.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_payment_failed_cancels_and_compensates(mock_db_session, session_factory):
+    order = _pending_order()
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = order
+    event = PaymentFailedEvent(
+        payload={"order_id": str(order.id), "reason": "declined"}
+    )
+
+    mock_db_session.add = MagicMock()
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga, "outbox_relay"),
+    ):
+        await saga.handle_payment_failed(event.model_dump(mode="json"))
+
+    assert order.status == OrderStatus.FAILED
+    (outbox_row,) = _outbox_rows(mock_db_session)
+    assert outbox_row.event_type == "OrderCancelled"
+    assert outbox_row.message["payload"]["items"] == [
+        {"product_id": str(order.items[0].product_id), "quantity": 2}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_payment_for_failed_order_is_refunded(mock_db_session, session_factory):
+    # The reaper failed the order while its payment was still in flight
+    order = _pending_order()
+    order.status = OrderStatus.FAILED
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = order
+    payment_id = uuid.uuid4()
+    event = PaymentProcessedEvent(
+        payload={"order_id": str(order.id), "payment_id": str(payment_id)}
+    )
+
+    mock_db_session.add = MagicMock()
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga, "outbox_relay"),
+    ):
+        await saga.handle_payment_processed(event.model_dump(mode="json"))
+
+    assert order.status == OrderStatus.FAILED
+    (outbox_row,) = _outbox_rows(mock_db_session)
+    assert outbox_row.event_type == "PaymentRefundRequested"
+    assert outbox_row.message["payload"]["order_id"] == str(order.id)
+    assert outbox_row.message["payload"]["payment_id"] == str(payment_id)
+
+    statement = mock_db_session.execute.await_args.args[0]
+    assert "FOR UPDATE" in str(statement.compile(dialect=postgresql.dialect()))
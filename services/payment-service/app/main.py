@@ -1,3 +1,5 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import FastAPI
@@ -5,9 +7,27 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.messaging import publisher
+from app.services.saga import build_consumer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Order saga: charge orders once their stock is reserved
+    consumer = build_consumer()
+    await consumer.start()
+
+    yield
+    # Shutdown
+    await consumer.stop()
+    publisher.close()
+
 
 app = FastAPI(
-    title=settings.PROJECT_NAME, version=settings.VERSION, openapi_url="/openapi.json"
+    title=settings.PROJECT_NAME,
+    version=settings.VERSION,
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
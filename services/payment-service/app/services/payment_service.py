@@ -2,7 +2,7 @@ import uuid
 
 from app.models.payment import Payment
 from app.schemas.payment import PaymentRequest
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.enums.status import PaymentStatus
@@ -46,3 +46,19 @@ class PaymentService:
     ) -> Payment | None:
         result = await db.execute(select(Payment).where(Payment.order_id == order_id))
         return result.scalar_one_or_none()
+
+    @staticmethod
+    async def refund_payment(db: AsyncSession, order_id: uuid.UUID) -> bool:
+        # Only a successful charge is refunded, so a repeated request is a no-op
+        result = await db.execute(
+            update(Payment)
+            .where(
+                Payment.order_id == order_id,
+                Payment.status == PaymentStatus.SUCCESS,
+            )
+            .values(status=PaymentStatus.REFUNDED)
+            .returning(Payment.id)
+        )
+        refunded = result.first() is not None
+        await db.commit()
+        return refunded
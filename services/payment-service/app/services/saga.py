@@ -0,0 +1,67 @@
+import logging
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.messaging import publisher
+from app.db.session import SessionLocal
+from app.schemas.payment import PaymentRequest
+from app.services.payment_service import PaymentService
+
+from shared.enums.status import PaymentStatus
+from shared.messaging.rabbitmq import EventConsumer
+from shared.schemas.events import (
+    PaymentFailedEvent,
+    PaymentProcessedEvent,
+    PaymentRefundRequestedEvent,
+    StockReservedEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "payment-service.saga"
+
+
+async def handle_stock_reserved(message: dict[str, Any]) -> None:
+    event = StockReservedEvent.model_validate(message)
+    payment_in = PaymentRequest(
+        order_id=event.payload["order_id"], amount=event.payload["total_amount"]
+    )
+    # process_payment is idempotent per order, so redelivery is safe
+    async with SessionLocal() as db:
+        payment = await PaymentService.process_payment(db, payment_in)
+
+    if payment.status == PaymentStatus.SUCCESS:
+        await publisher.publish_async(
+            PaymentProcessedEvent(
+                correlation_id=event.correlation_id,
+                payload={"order_id": payment.order_id, "payment_id": payment.id},
+            )
+        )
+    else:
+        await publisher.publish_async(
+            PaymentFailedEvent(
+                correlation_id=event.correlation_id,
+                payload={"order_id": payment.order_id, "reason": "payment_declined"},
+            )
+        )
+
+
+async def handle_payment_refund_requested(message: dict[str, Any]) -> None:
+    # The order was failed after it had been charged
+    event = PaymentRefundRequestedEvent.model_validate(message)
+    order_id = UUID(str(event.payload["order_id"]))
+    async with SessionLocal() as db:
+        if await PaymentService.refund_payment(db, order_id):
+            logger.info("Refunded payment for order %s", order_id)
+
+
+def build_consumer() -> EventConsumer:
+    return EventConsumer(
+        settings.RABBITMQ_URL,
+        QUEUE_NAME,
+        {
+            "StockReserved": handle_stock_reserved,
+            "PaymentRefundRequested": handle_payment_refund_requested,
+        },
+    )
@@ -0,0 +1,63 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services import saga
+
+from shared.schemas.events import PaymentRefundRequestedEvent, StockReservedEvent
+
+
+@pytest.fixture
+def session_factory(mock_db_session):
+    @asynccontextmanager
+    async def _session():
+        yield mock_db_session
+
+    return _session
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("amount", "expected_event"),
+    [(100.0, "PaymentProcessed"), (20000.0, "PaymentFailed")],
+)
+async def test_stock_reserved_processes_payment(
+    mock_db_session, session_factory, amount, expected_event
+):
+    mock_db_session.refresh = AsyncMock()
+    order_id = uuid.uuid4()
+    event = StockReservedEvent(
+        correlation_id=order_id,
+        payload={"order_id": str(order_id), "total_amount": amount},
+    )
+
+    with (
+        patch.object(saga, "SessionLocal", session_factory),
+        patch.object(saga, "publisher", MagicMock(publish_async=AsyncMock())) as pub,
+    ):
+        await saga.handle_stock_reserved(event.model_dump(mode="json"))
+
+    published = pub.publish_async.await_args.args[0]
+    assert published.event_type == expected_event
+    assert published.correlation_id == order_id
+    assert published.payload["order_id"] == order_id
+
+
+@pytest.mark.asyncio
+async def test_refund_request_refunds_successful_payment(
+    mock_db_session, session_factory
+):
+    order_id = uuid.uuid4()
+    event = PaymentRefundRequestedEvent(
+        correlation_id=order_id, payload={"order_id": str(order_id)}
+    )
+
+    with patch.object(saga, "SessionLocal", session_factory):
+        await saga.handle_payment_refund_requested(event.model_dump(mode="json"))
+
+    statement = mock_db_session.execute.await_args.args[0]
+    sql = str(statement.compile(compile_kwargs={"literal_binds": True}))
+    assert "SET status='REFUNDED'" in sql
+    assert "payments.status = 'SUCCESS'" in sql
+    mock_db_session.commit.assert_awaited_once()
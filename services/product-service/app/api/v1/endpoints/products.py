@@ -1,12 +1,28 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.search import SearchUnavailableError
 from app.db.session import get_db
-from app.schemas.product import Category, CategoryCreate, Product, ProductCreate
+from app.schemas.product import (
+    Category,
+    CategoryCreate,
+    CategoryUpdate,
+    Product,
+    ProductBatchRequest,
+    ProductBatchResponse,
+    ProductBatchResult,
+    ProductCreate,
+    ProductSearchResponse,
+    ProductSort,
+    ProductUpdate,
+)
+from app.services.catalog_version import catalog_version
+from app.services.local_search import local_search
 from app.services.product_service import product_service
+from app.services.search_index import SearchIndexService
 
 router = APIRouter()
 
@@ -20,14 +36,91 @@ async def create_product(
 
 @router.get("/products", response_model=list[Product])
 async def list_products(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: str | None = None,
+    sort: ProductSort = ProductSort.NAME,
+    category_id: uuid.UUID | None = None,
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    in_stock: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    not_modified = await catalog_version.check(request, response)
+    if not_modified:
+        return not_modified
+    try:
+        products, next_cursor = await product_service.get_products(
+            db, limit, cursor, sort, category_id, min_price, max_price, in_stock
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return products
+
+
+@router.post("/products/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    batch_in: ProductBatchRequest, db: AsyncSession = Depends(get_db)
+) -> Any:
+    # One query plus one category load for up to 200 IDs. Results follow
+    # the request order, one per requested ID, with unknown IDs marked
+    products = {
+        product.id: Product.model_validate(product)
+        for product in await product_service.get_products_by_ids(db, batch_in.ids)
+    }
+    return ProductBatchResponse(
+        results=[
+            ProductBatchResult(
+                id=product_id,
+                found=product_id in products,
+                product=products.get(product_id),
+            )
+            for product_id in batch_in.ids
+        ]
+    )
+
+
+@router.get("/products/search", response_model=ProductSearchResponse)
+async def search_products(
+    q: str = Query(max_length=200),
+    category_id: uuid.UUID | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_db),
 ) -> Any:
-    return await product_service.get_products(db, skip, limit)
+    try:
+        result = await SearchIndexService.search(q, limit, offset, category_id)
+    except SearchUnavailableError:
+        if local_search.index is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Search is unavailable",
+            ) from None
+        return await SearchIndexService.search_locally(
+            db, local_search.index, q, limit, offset, category_id
+        )
+    return ProductSearchResponse(
+        hits=result["hits"], estimated_total=result.get("estimatedTotalHits", 0)
+    )
 
 
 @router.get("/products/{product_id}", response_model=Product)
 async def get_product(product_id: uuid.UUID, db: AsyncSession = Depends(get_db)) -> Any:
-    product = await product_service.get_product(db, product_id)
+    body = await product_service.get_product_detail(db, product_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    # Already serialized through the response model
+    return Response(content=body, media_type="application/json")
+
+
+@router.patch("/products/{product_id}", response_model=Product)
+async def update_product(
+    product_id: uuid.UUID, product_in: ProductUpdate, db: AsyncSession = Depends(get_db)
+) -> Any:
+    product = await product_service.update_product(db, product_id, product_in)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -42,8 +135,27 @@ async def create_category(
     return await product_service.create_category(db, category_in)
 
 
+@router.patch("/categories/{category_id}", response_model=Category)
+async def update_category(
+    category_id: uuid.UUID,
+    category_in: CategoryUpdate,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    category = await product_service.update_category(db, category_id, category_in)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+
 @router.get("/categories", response_model=list[Category])
 async def list_categories(
-    skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
 ) -> Any:
+    not_modified = await catalog_version.check(request, response)
+    if not_modified:
+        return not_modified
     return await product_service.get_categories(db, skip, limit)
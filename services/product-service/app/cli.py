@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import logging
+
+from app.core.search import search_client
+from app.db.session import engine
+from app.services.search_index import search_indexer
+
+
+async def _search(args: argparse.Namespace) -> None:
+    try:
+        if args.action == "reindex":
+            count = await search_indexer.reindex(resume=args.resume)
+            print(f"Reindexed {count} products")
+        else:
+            count = await search_indexer.drain()
+            print(f"Indexed {count} queued changes")
+    finally:
+        await search_client.close()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Maintain the product search index")
+    search.add_argument("action", choices=["reindex", "sync"])
+    search.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted reindex from its last checkpoint",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_search(args))
+
+
+if __name__ == "__main__":
+    main()
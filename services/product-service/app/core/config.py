@@ -14,9 +14,33 @@ class Settings(BaseSettings):
     # RABBITMQ
     RABBITMQ_URL: str
 
+    # REDIS
+    REDIS_URL: str | None = None
+
     # MEILISEARCH
     MEILISEARCH_URL: str
     MEILISEARCH_KEY: str
+    MEILISEARCH_INDEX: str = "products"
+    MEILISEARCH_TIMEOUT: float = 5.0
+
+    # SEARCH INDEXING
+    SEARCH_INDEX_BATCH_SIZE: int = 500
+    SEARCH_INDEX_POLL_INTERVAL: float = 1.0
+
+    # In-process search, used while Meilisearch is unreachable
+    LOCAL_SEARCH_ENABLED: bool = True
+    LOCAL_SEARCH_BATCH_SIZE: int = 5000
+    # Checked this often; rebuilt once this share of documents are tombstones
+    LOCAL_SEARCH_REBUILD_INTERVAL: float = 300.0
+    LOCAL_SEARCH_MAX_STALE_FRACTION: float = 0.25
+
+    # PRODUCT DETAIL CACHE
+    PRODUCT_CACHE_TTL_SECONDS: float = 300.0
+    PRODUCT_CACHE_TTL_JITTER: float = 0.1
+    PRODUCT_CACHE_TOMBSTONE_SECONDS: float = 5.0
+
+    # CATALOG LIST ETAGS
+    CATALOG_MAX_AGE: int = 0
 
     class Config:
         case_sensitive = True
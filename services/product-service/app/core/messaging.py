@@ -0,0 +1,4 @@
+from app.core.config import settings
+from shared.messaging.rabbitmq import EventPublisher
+
+publisher = EventPublisher(settings.RABBITMQ_URL)
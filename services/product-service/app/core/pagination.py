@@ -0,0 +1,20 @@
+import base64
+import json
+from typing import Any
+
+# Opaque keyset cursor: the sort it belongs to plus the sort value and id of
+# the last row of a page
+
+
+def encode_cursor(sort: str, value: Any, row_id: Any) -> str:
+    raw = json.dumps([sort, value, str(row_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, Any, str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    return sort, value, row_id
@@ -0,0 +1,102 @@
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+
+class SearchUnavailableError(Exception):
+    pass
+
+
+# Thin async client for the few Meilisearch calls we need. Writes are
+# enqueued as Meilisearch tasks and applied in order per index, so there is
+# no need to wait on them.
+class SearchClient:
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        index: str,
+        timeout: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.index = index
+        self._url = url
+        self._key = key
+        self._timeout = timeout
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self._url,
+                headers={"Authorization": f"Bearer {self._key}"},
+                timeout=self._timeout,
+                transport=self._transport,
+            )
+        return self._http
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        # Only an outage is SearchUnavailableError. A 4xx is a bug or a bad
+        # key on our side and propagates as httpx.HTTPStatusError.
+        try:
+            response = await self._client().request(method, path, **kwargs)
+        except httpx.TransportError as exc:
+            raise SearchUnavailableError(str(exc)) from exc
+        if response.is_server_error:
+            raise SearchUnavailableError(
+                f"Meilisearch answered {response.status_code} for {path}"
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def configure(self) -> None:
+        # Creates the index on first use
+        await self._request(
+            "PATCH",
+            f"/indexes/{self.index}/settings",
+            json={
+                "searchableAttributes": ["name", "category", "description"],
+                "filterableAttributes": ["category_id", "price", "stock"],
+                "sortableAttributes": ["price"],
+            },
+        )
+
+    async def add_documents(self, documents: list[dict[str, Any]]) -> None:
+        await self._request(
+            "POST",
+            f"/indexes/{self.index}/documents",
+            params={"primaryKey": "id"},
+            json=documents,
+        )
+
+    async def delete_documents(self, ids: list[str]) -> None:
+        await self._request(
+            "POST", f"/indexes/{self.index}/documents/delete-batch", json=ids
+        )
+
+    async def search(
+        self, query: str, limit: int, offset: int, filters: list[str]
+    ) -> dict[str, Any]:
+        body: dict[str, Any] = {"q": query, "limit": limit, "offset": offset}
+        if filters:
+            body["filter"] = filters
+        result: dict[str, Any] = await self._request(
+            "POST", f"/indexes/{self.index}/search", json=body
+        )
+        return result
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+search_client = SearchClient(
+    settings.MEILISEARCH_URL,
+    settings.MEILISEARCH_KEY,
+    index=settings.MEILISEARCH_INDEX,
+    timeout=settings.MEILISEARCH_TIMEOUT,
+)
@@ -6,9 +6,15 @@ from fastapi import FastAPI
 
 from app.api.v1.endpoints import products
 from app.core.config import settings
+from app.core.messaging import publisher
+from app.core.search import search_client
 from app.db.base import Base
 from app.db.init_db import init_db
 from app.db.session import SessionLocal, engine
+from app.services.catalog_version import catalog_version
+from app.services.local_search import local_search
+from app.services.product_cache import product_cache
+from app.services.search_index import search_indexer
 
 
 @asynccontextmanager
@@ -21,8 +27,22 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     async with SessionLocal() as db:
         await init_db(db)
 
+    # Pushes queued product changes to Meilisearch
+    search_indexer.start()
+    if settings.LOCAL_SEARCH_ENABLED:
+        # Built in the background; search falls back to it once ready
+        local_search.start()
+
     yield
     # Shutdown
+    await local_search.stop()
+    await search_indexer.stop()
+    await search_client.close()
+    if product_cache.store is not None:
+        await product_cache.store.close()
+    if catalog_version.store is not None:
+        await catalog_version.store.close()
+    publisher.close()
     await engine.dispose()
 
 
@@ -1,6 +1,7 @@
 import uuid
+from enum import Enum
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CategoryBase(BaseModel):
@@ -12,6 +13,11 @@ class CategoryCreate(CategoryBase):
     pass
 
 
+class CategoryUpdate(BaseModel):
+    name: str | None = None
+    description: str | None = None
+
+
 class Category(CategoryBase):
     id: uuid.UUID
     model_config = ConfigDict(from_attributes=True)
@@ -30,7 +36,52 @@ class ProductCreate(ProductBase):
     pass
 
 
+class ProductUpdate(BaseModel):
+    name: str | None = None
+    description: str | None = None
+    price: float | None = None
+    stock: int | None = None
+    image_url: str | None = None
+    category_id: uuid.UUID | None = None
+
+
+class ProductSort(str, Enum):
+    NAME = "name"
+    PRICE = "price"
+    PRICE_DESC = "-price"
+
+
+class ProductBatchRequest(BaseModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=200)
+
+
 class Product(ProductBase):
     id: uuid.UUID
     category: Category | None = None
     model_config = ConfigDict(from_attributes=True)
+
+
+class ProductSearchHit(BaseModel):
+    id: uuid.UUID
+    name: str
+    description: str | None = None
+    price: float
+    stock: int = 0
+    image_url: str | None = None
+    category_id: uuid.UUID | None = None
+    category: str | None = None
+
+
+class ProductSearchResponse(BaseModel):
+    hits: list[ProductSearchHit]
+    estimated_total: int
+
+
+class ProductBatchResult(BaseModel):
+    id: uuid.UUID
+    found: bool
+    product: Product | None = None
+
+
+class ProductBatchResponse(BaseModel):
+    results: list[ProductBatchResult]
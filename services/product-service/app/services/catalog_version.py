@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import random
+from typing import Protocol
+
+import redis.asyncio as redis
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "catalog:version"
+
+
+def _initial_version() -> int:
+    # A counter that starts over (a flushed or replaced Redis) must not
+    # repeat versions that clients still hold tags for
+    return random.getrandbits(48)
+
+
+class CatalogVersionStore(Protocol):
+    async def get(self) -> int:
+        ...
+
+    async def bump(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class RedisCatalogVersionStore:
+    def __init__(self, url: str) -> None:
+        self._redis = redis.Redis.from_url(url)
+
+    async def get(self) -> int:
+        version = await self._redis.get(VERSION_KEY)
+        if version is None:
+            await self._redis.set(VERSION_KEY, _initial_version(), nx=True)
+            version = await self._redis.get(VERSION_KEY)
+        return int(version)
+
+    async def bump(self) -> None:
+        await self._redis.incr(VERSION_KEY)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def build_store() -> CatalogVersionStore | None:
+    # A per-process version would miss writes handled by other replicas and
+    # answer 304 for lists that changed, so there is no local fallback
+    if not settings.REDIS_URL:
+        logger.warning("REDIS_URL is not set: catalog lists are served without ETags")
+        return None
+    return RedisCatalogVersionStore(settings.REDIS_URL)
+
+
+def _matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses the weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+# Every catalog write bumps one counter after it commits. A list response is
+# identified by that counter plus its URL, so a revalidation is answered
+# from the counter alone. The counter is read before the query runs: a write
+# landing in between gives the new body an older tag, which costs the client
+# one extra download but never serves it a stale 304.
+class CatalogVersion:
+    def __init__(self, store: CatalogVersionStore | None, max_age: int) -> None:
+        self.store = store
+        self._max_age = max_age
+
+    async def bump(self) -> None:
+        if self.store is None:
+            return
+        try:
+            await self.store.bump()
+        except Exception:
+            logger.error("Could not bump the catalog version; ETags may be stale")
+
+    async def check(self, request: Request, response: Response) -> Response | None:
+        # Sets the validators on response and returns a 304 to send instead
+        # when the client's copy is current
+        if self.store is None:
+            return None
+        try:
+            version = await self.store.get()
+        except Exception:
+            logger.warning("Catalog version unavailable, skipping ETag")
+            return None
+        # Same parameters in any order are the same representation
+        query = sorted(request.query_params.multi_items())
+        digest = hashlib.sha1(
+            f"{request.url.path}?{query}".encode(), usedforsecurity=False
+        ).hexdigest()[:16]
+        headers = {
+            "ETag": f'"{version}.{digest}"',
+            "Cache-Control": f"public, max-age={self._max_age}, must-revalidate",
+        }
+        response.headers.update(headers)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(headers["ETag"], if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+
+catalog_version = CatalogVersion(build_store(), max_age=settings.CATALOG_MAX_AGE)
@@ -0,0 +1,371 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import re
+import uuid
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import suppress
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.product import Category, Product
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"\w+")
+
+# One typo allowed from five characters on, as in Meilisearch
+TYPO_MIN_LENGTH = 5
+# The last query word matches as a prefix; very short prefixes would expand
+# to most of the vocabulary, so only the completions found in the most
+# documents are considered
+PREFIX_EXPANSION = 50
+# Prefixes up to this length cover too much of the vocabulary to rank on
+# demand, so their top completions are kept up to date as documents arrive
+SHORT_PREFIX = 3
+# Sorts after every character a term can contain
+_LAST_CHAR = chr(0x10FFFF)
+MAX_QUERY_TERMS = 10
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+def _category_term(category_id: uuid.UUID) -> str:
+    # Not a \w+ token, so no query word can produce it
+    return f"#category:{category_id}"
+
+
+# The PREFIX_EXPANSION terms with the most postings under one short prefix.
+# Posting lists only grow, one entry at a time, so a term enters once it
+# outgrows the smallest members and one of those makes room.
+class _Completions:
+    __slots__ = ("postings", "members", "floor", "at_floor")
+
+    def __init__(self, postings: "list[array[int]]") -> None:
+        self.postings = postings
+        self.members: set[int] = set()
+        self.floor = 0
+        # Members with exactly `floor` postings; empty until the table is full
+        self.at_floor: set[int] = set()
+
+    def _refloor(self) -> None:
+        counts = {t: len(self.postings[t]) for t in self.members}
+        self.floor = min(counts.values())
+        self.at_floor = {t for t, count in counts.items() if count == self.floor}
+
+    def bump(self, term_id: int, count: int) -> None:
+        members = self.members
+        if term_id in members:
+            if term_id in self.at_floor:
+                self.at_floor.remove(term_id)
+                if not self.at_floor:
+                    self._refloor()
+        elif len(members) < PREFIX_EXPANSION:
+            members.add(term_id)
+            if len(members) == PREFIX_EXPANSION:
+                self._refloor()
+        elif count > self.floor:
+            members.remove(self.at_floor.pop())
+            members.add(term_id)
+            if not self.at_floor:
+                self._refloor()
+
+
+# An append-only inverted index. Documents get increasing ordinals, so every
+# posting list stays sorted without any insertion work; a changed product is
+# tombstoned and appended again, and LocalSearch rebuilds the index once
+# tombstones pile up. All per-document data lives in flat arrays rather than
+# per-document objects.
+class LocalSearchIndex:
+    def __init__(self) -> None:
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._sorted_terms: list[str] = []
+        # Short prefix -> its top completions; at most SHORT_PREFIX per term
+        self._completions: dict[str, _Completions] = {}
+        self._term_completions: list[tuple[_Completions, ...]] = []
+        self._postings: list[array[int]] = []
+        self._alphabet: set[str] = set()
+        self._ordinals: dict[bytes, int] = {}
+        self._ids = bytearray()
+        self._alive = bytearray()
+        # Terms of document d are _doc_terms[_doc_offsets[d]:_doc_offsets[d + 1]]
+        self._doc_terms: array[int] = array("I")
+        self._doc_offsets: array[int] = array("I", [0])
+        self._categories: dict[uuid.UUID, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, product_id: uuid.UUID) -> bool:
+        return product_id.bytes in self._ordinals
+
+    @property
+    def stale(self) -> int:
+        # Tombstoned documents still taking up postings
+        return len(self._alive) - len(self._ordinals)
+
+    def set_category(self, category_id: uuid.UUID, name: str) -> None:
+        self._categories[category_id] = name
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._term_ids)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+            self._postings.append(array("I"))
+            bisect.insort(self._sorted_terms, term)
+            self._alphabet.update(term)
+            # Category terms are never typed, so they rank under no prefix
+            lengths = range(1, min(len(term), SHORT_PREFIX) + 1)
+            self._term_completions.append(
+                tuple(
+                    self._completions.setdefault(
+                        term[:length], _Completions(self._postings)
+                    )
+                    for length in lengths
+                )
+                if TOKEN.fullmatch(term)
+                else ()
+            )
+        return term_id
+
+    def add(
+        self,
+        product_id: uuid.UUID,
+        name: str,
+        description: str | None,
+        category_id: uuid.UUID | None,
+    ) -> None:
+        self.remove(product_id)
+        terms = {*tokenize(name), *tokenize(description)}
+        if category_id is not None:
+            terms.update(tokenize(self._categories.get(category_id)))
+            terms.add(_category_term(category_id))
+        ordinal = len(self._alive)
+        term_ids = sorted(self._term_id(term) for term in terms)
+        for term_id in term_ids:
+            postings = self._postings[term_id]
+            postings.append(ordinal)
+            count = len(postings)
+            for completions in self._term_completions[term_id]:
+                # Most increments change nothing: skip the call for those
+                if term_id in completions.at_floor or (
+                    count > completions.floor and term_id not in completions.members
+                ):
+                    completions.bump(term_id, count)
+        self._doc_terms.extend(term_ids)
+        self._doc_offsets.append(len(self._doc_terms))
+        self._ids += product_id.bytes
+        self._alive.append(1)
+        self._ordinals[product_id.bytes] = ordinal
+
+    def remove(self, product_id: uuid.UUID) -> None:
+        ordinal = self._ordinals.pop(product_id.bytes, None)
+        if ordinal is not None:
+            self._alive[ordinal] = 0
+
+    def _product_id(self, ordinal: int) -> uuid.UUID:
+        return uuid.UUID(bytes=bytes(self._ids[ordinal * 16 : ordinal * 16 + 16]))
+
+    def _typos(self, word: str) -> set[str]:
+        # Every vocabulary term one edit away, found by probing the term
+        # dictionary instead of keeping a typo index in memory
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        edits = {left + right[1:] for left, right in splits if right}
+        edits.update(
+            left + right[1] + right[0] + right[2:]
+            for left, right in splits
+            if len(right) > 1
+        )
+        for char in self._alphabet:
+            edits.update(left + char + right[1:] for left, right in splits if right)
+            edits.update(left + char + right for left, right in splits)
+        return {edit for edit in edits if edit in self._term_ids}
+
+    def _prefixed(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        end = bisect.bisect_left(self._sorted_terms, prefix + _LAST_CHAR, start)
+        if end - start <= PREFIX_EXPANSION:
+            return self._sorted_terms[start:end]
+        if len(prefix) <= SHORT_PREFIX:
+            members = self._completions[prefix].members
+            return [self._terms[term_id] for term_id in members]
+        return heapq.nlargest(
+            PREFIX_EXPANSION,
+            islice(self._sorted_terms, start, end),
+            key=lambda term: len(self._postings[self._term_ids[term]]),
+        )
+
+    def _matching_terms(self, word: str, prefix: bool) -> set[int]:
+        terms = {word} if word in self._term_ids else set()
+        if prefix:
+            terms.update(self._prefixed(word))
+        # Typos are only looked for when the word matches nothing as typed,
+        # which keeps correctly spelled queries cheap
+        if not terms and len(word) >= TYPO_MIN_LENGTH:
+            terms.update(self._typos(word))
+        return {self._term_ids[term] for term in terms}
+
+    def _candidates(self, term_ids: Iterable[int]) -> Iterator[int]:
+        # Newest documents first, each once
+        postings = [reversed(self._postings[term_id]) for term_id in term_ids]
+        previous = None
+        for ordinal in heapq.merge(*postings, reverse=True):
+            if ordinal != previous and self._alive[ordinal]:
+                yield ordinal
+            previous = ordinal
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        offset: int = 0,
+        category_id: uuid.UUID | None = None,
+    ) -> tuple[list[uuid.UUID], int]:
+        words = tokenize(query)[:MAX_QUERY_TERMS]
+        if not words:
+            return [], 0
+        groups = [
+            self._matching_terms(word, prefix=index == len(words) - 1)
+            for index, word in enumerate(words)
+        ]
+        if category_id is not None:
+            category_term = self._term_ids.get(_category_term(category_id))
+            groups.append(set() if category_term is None else {category_term})
+        sizes = [sum(len(self._postings[t]) for t in group) for group in groups]
+        if not all(sizes):
+            return [], 0
+
+        # Walk the rarest group and check the others against each document's
+        # own terms, stopping as soon as the requested page is full
+        source = min(range(len(groups)), key=sizes.__getitem__)
+        others = [group for index, group in enumerate(groups) if index != source]
+        wanted = offset + limit
+        hits: list[int] = []
+        found = scanned = 0
+        for ordinal in self._candidates(groups[source]):
+            scanned += 1
+            terms = self._doc_terms[
+                self._doc_offsets[ordinal] : self._doc_offsets[ordinal + 1]
+            ]
+            if not any(group.isdisjoint(terms) for group in others):
+                found += 1
+                if found > wanted:
+                    # Page is full: extrapolate the total from what was seen
+                    return (
+                        [self._product_id(o) for o in hits[offset:]],
+                        max(wanted, found * sizes[source] // scanned),
+                    )
+                hits.append(ordinal)
+        return [self._product_id(o) for o in hits[offset:]], found
+
+
+class LocalSearch:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        rebuild_interval: float,
+        max_stale_fraction: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._rebuild_interval = rebuild_interval
+        self._max_stale_fraction = max_stale_fraction
+        self.index: LocalSearchIndex | None = None
+        self._building: LocalSearchIndex | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def _indexes(self) -> list[LocalSearchIndex]:
+        return [i for i in (self.index, self._building) if i is not None]
+
+    def set_category(self, category: Category) -> None:
+        for index in self._indexes():
+            index.set_category(category.id, category.name)
+
+    def upsert(self, product: Product) -> None:
+        for index in self._indexes():
+            index.add(
+                product.id, product.name, product.description, product.category_id
+            )
+
+    def remove(self, product_id: uuid.UUID) -> None:
+        for index in self._indexes():
+            index.remove(product_id)
+
+    async def build(self) -> None:
+        # Writes made while the scan runs go to the new index as well and
+        # win over the row the scan read
+        index = self._building = LocalSearchIndex()
+        try:
+            async with self._session_factory() as db:
+                categories = await db.execute(select(Category.id, Category.name))
+                for category_id, name in categories.tuples():
+                    index.set_category(category_id, name)
+                rows = await db.stream(
+                    select(
+                        Product.id,
+                        Product.name,
+                        Product.description,
+                        Product.category_id,
+                    ).execution_options(yield_per=self._batch_size)
+                )
+                async for batch in rows.partitions():
+                    for product_id, name, description, category_id in batch:
+                        if product_id not in index:
+                            index.add(product_id, name, description, category_id)
+                    # Let requests run between batches
+                    await asyncio.sleep(0)
+        finally:
+            self._building = None
+        self.index = index
+        logger.info("Local search index built with %d products", len(index))
+
+    def rebuild_due(self) -> bool:
+        # A fresh build drops tombstones and the terms only they used; until
+        # it is swapped in, both indexes are held in memory
+        if self.index is None:
+            return True
+        documents = len(self.index) + self.index.stale
+        return self.index.stale > documents * self._max_stale_fraction
+
+    async def run(self) -> None:
+        while True:
+            if self.rebuild_due():
+                try:
+                    await self.build()
+                except Exception:
+                    logger.exception("Could not build the local search index")
+            await asyncio.sleep(self._rebuild_interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+local_search = LocalSearch(
+    SessionLocal,
+    batch_size=settings.LOCAL_SEARCH_BATCH_SIZE,
+    rebuild_interval=settings.LOCAL_SEARCH_REBUILD_INTERVAL,
+    max_stale_fraction=settings.LOCAL_SEARCH_MAX_STALE_FRACTION,
+)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import random
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Protocol
+
+import redis.asyncio as redis
+from prometheus_client import Counter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CACHE_LOOKUPS = Counter(
+    "product_cache_lookups_total",
+    "Product detail lookups by how they were answered",
+    ["result"],
+)
+
+KEY = "product:v1:%s"
+# Written over an entry on invalidation. Fills use SET NX, so a fill that
+# read the row before the write committed cannot put the old version back.
+TOMBSTONE = b"-"
+
+
+class ProductCacheStore(Protocol):
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        ...
+
+    async def replace(self, keys: list[str], value: bytes, ttl: float) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class RedisProductCacheStore:
+    def __init__(self, url: str) -> None:
+        self._redis = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        value: bytes | None = await self._redis.get(key)
+        return value
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self._redis.set(key, value, nx=True, px=int(ttl * 1000)))
+
+    async def replace(self, keys: list[str], value: bytes, ttl: float) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, value, px=int(ttl * 1000))
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def build_store() -> ProductCacheStore | None:
+    # A per-process cache could not be invalidated by writes that other
+    # replicas handle, so there is no local fallback
+    if not settings.REDIS_URL:
+        logger.warning("REDIS_URL is not set: the product cache is disabled")
+        return None
+    return RedisProductCacheStore(settings.REDIS_URL)
+
+
+Loader = Callable[[], Awaitable[bytes | None]]
+
+
+# Read-through cache of serialized product responses. A cache outage only
+# costs the database the extra reads; it never fails the request. Without a
+# store every lookup loads, with concurrent misses still sharing one load.
+class ProductCache:
+    def __init__(
+        self,
+        store: ProductCacheStore | None,
+        ttl: float,
+        jitter: float,
+        tombstone_ttl: float,
+    ) -> None:
+        self.store = store
+        self._ttl = ttl
+        self._jitter = jitter
+        self._tombstone_ttl = tombstone_ttl
+        self._fills: dict[uuid.UUID, asyncio.Future[bytes | None]] = {}
+
+    def _expiry(self) -> float:
+        # Spread expiries so entries filled together do not expire together
+        return self._ttl * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    async def _cached(self, product_id: uuid.UUID) -> bytes | None:
+        if self.store is None:
+            return None
+        try:
+            value = await self.store.get(KEY % product_id)
+        except Exception:
+            logger.warning("Product cache read failed for %s", product_id)
+            PRODUCT_CACHE_LOOKUPS.labels(result="error").inc()
+            return None
+        return None if value == TOMBSTONE else value
+
+    async def _fill(self, product_id: uuid.UUID, load: Loader) -> bytes | None:
+        value = await load()
+        if value is not None and self.store is not None:
+            try:
+                await self.store.add(KEY % product_id, value, self._expiry())
+            except Exception:
+                logger.warning("Product cache write failed for %s", product_id)
+        return value
+
+    async def get_or_load(self, product_id: uuid.UUID, load: Loader) -> bytes | None:
+        value = await self._cached(product_id)
+        if value is not None:
+            PRODUCT_CACHE_LOOKUPS.labels(result="hit").inc()
+            return value
+
+        # Single flight: concurrent misses for one product share one load
+        fill = self._fills.get(product_id)
+        if fill is not None:
+            PRODUCT_CACHE_LOOKUPS.labels(result="coalesced").inc()
+            return await asyncio.shield(fill)
+        PRODUCT_CACHE_LOOKUPS.labels(result="miss").inc()
+        fill = asyncio.ensure_future(self._fill(product_id, load))
+        self._fills[product_id] = fill
+        fill.add_done_callback(lambda _: self._forget(product_id, fill))
+        return await asyncio.shield(fill)
+
+    def _forget(
+        self, product_id: uuid.UUID, fill: asyncio.Future[bytes | None]
+    ) -> None:
+        if self._fills.get(product_id) is fill:
+            del self._fills[product_id]
+
+    async def invalidate(self, product_ids: Iterable[uuid.UUID]) -> None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        # Later misses must not join a load that may predate the change
+        for product_id in product_ids:
+            self._fills.pop(product_id, None)
+        if self.store is None:
+            return
+        keys = [KEY % product_id for product_id in product_ids]
+        try:
+            await self.store.replace(keys, TOMBSTONE, self._tombstone_ttl)
+        except Exception:
+            # Entries left behind expire within PRODUCT_CACHE_TTL_SECONDS
+            logger.warning("Product cache invalidation failed for %d keys", len(keys))
+
+
+product_cache = ProductCache(
+    build_store(),
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+    jitter=settings.PRODUCT_CACHE_TTL_JITTER,
+    tombstone_ttl=settings.PRODUCT_CACHE_TOMBSTONE_SECONDS,
+)
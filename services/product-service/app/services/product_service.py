@@ -1,34 +1,99 @@
+import logging
 import uuid
+from typing import Any
 
+from pika.exceptions import AMQPError
+from sqlalchemy import literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, selectinload
 
+from app.core.messaging import publisher
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.product import Category, Product
-from app.schemas.product import CategoryCreate, ProductCreate
+from app.schemas.product import (
+    CategoryCreate,
+    CategoryUpdate,
+    ProductCreate,
+    ProductSort,
+    ProductUpdate,
+)
+from app.schemas.product import Product as ProductSchema
+from app.services.catalog_version import catalog_version
+from app.services.local_search import local_search
+from app.services.product_cache import product_cache
+from app.services.search_index import SearchIndexService, search_indexer
+from shared.schemas.events import ProductChangedEvent
+
+logger = logging.getLogger(__name__)
+
+# Sort column, the JSON types its cursor value may have, and direction.
+# Product.id breaks ties so every row has exactly one position.
+SORT_KEYS: dict[
+    ProductSort, tuple[InstrumentedAttribute[Any], tuple[type, ...], bool]
+] = {
+    ProductSort.NAME: (Product.name, (str,), False),
+    ProductSort.PRICE: (Product.price, (int, float), False),
+    ProductSort.PRICE_DESC: (Product.price, (int, float), True),
+}
 
 
 class ProductService:
     async def create_product(
         self, db: AsyncSession, product_in: ProductCreate
     ) -> Product:
-        db_product = Product(**product_in.model_dump())
+        db_product = Product(id=uuid.uuid4(), **product_in.model_dump())
         db.add(db_product)
+        await SearchIndexService.enqueue(db, [db_product.id])
         await db.commit()
+        search_indexer.notify()
+        await catalog_version.bump()
         await db.refresh(db_product)
+        local_search.upsert(db_product)
         return db_product
 
     async def get_products(
-        self, db: AsyncSession, skip: int = 0, limit: int = 100
-    ) -> list[Product]:
-        query = (
-            select(Product)
-            .options(selectinload(Product.category))
-            .offset(skip)
-            .limit(limit)
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: str | None = None,
+        sort: ProductSort = ProductSort.NAME,
+        category_id: uuid.UUID | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        in_stock: bool = False,
+    ) -> tuple[list[Product], str | None]:
+        column, value_type, descending = SORT_KEYS[sort]
+        query = select(Product).options(selectinload(Product.category))
+        if category_id is not None:
+            query = query.where(Product.category_id == category_id)
+        if min_price is not None:
+            query = query.where(Product.price >= min_price)
+        if max_price is not None:
+            query = query.where(Product.price <= max_price)
+        if in_stock:
+            query = query.where(Product.stock > 0)
+        if cursor:
+            cursor_sort, value, row_id = decode_cursor(cursor)
+            # A cursor only means something under the sort that issued it
+            if cursor_sort != sort.value or type(value) not in value_type:
+                raise ValueError("Invalid cursor")
+            key = tuple_(column, Product.id)
+            bound = tuple_(literal(value), literal(uuid.UUID(row_id)))
+            query = query.where(key < bound if descending else key > bound)
+        if descending:
+            query = query.order_by(column.desc(), Product.id.desc())
+        else:
+            query = query.order_by(column, Product.id)
+        # One extra row tells us whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        products = list(result.scalars().all())
+        if len(products) <= limit:
+            return products, None
+        last = products[limit - 1]
+        return products[:limit], encode_cursor(
+            sort.value, getattr(last, column.key), last.id
         )
-        result = await db.execute(query)
-        return list(result.scalars().all())
 
     async def get_product(
         self, db: AsyncSession, product_id: uuid.UUID
@@ -41,19 +106,102 @@ class ProductService:
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_product_detail(
+        self, db: AsyncSession, product_id: uuid.UUID
+    ) -> bytes | None:
+        # Serialized once on a miss; hits are served as stored
+        async def load() -> bytes | None:
+            product = await self.get_product(db, product_id)
+            if product is None:
+                return None
+            return ProductSchema.model_validate(product).model_dump_json().encode()
+
+        return await product_cache.get_or_load(product_id, load)
+
+    async def get_products_by_ids(
+        self, db: AsyncSession, product_ids: list[uuid.UUID]
+    ) -> list[Product]:
+        query = (
+            select(Product)
+            .options(selectinload(Product.category))
+            .where(Product.id.in_(set(product_ids)))
+        )
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def update_product(
+        self, db: AsyncSession, product_id: uuid.UUID, product_in: ProductUpdate
+    ) -> Product | None:
+        db_product = await self.get_product(db, product_id)
+        if db_product is None:
+            return None
+        for field, value in product_in.model_dump(exclude_unset=True).items():
+            setattr(db_product, field, value)
+        await SearchIndexService.enqueue(db, [db_product.id])
+        await db.commit()
+        search_indexer.notify()
+        await catalog_version.bump()
+        await db.refresh(db_product)
+        local_search.upsert(db_product)
+        await product_cache.invalidate([db_product.id])
+        await self._publish_changed(db_product)
+        return db_product
+
+    async def _publish_changed(self, product: Product) -> None:
+        # Consumers (e.g. the order service's price cache) drop their copy.
+        # Best effort: their TTL bounds staleness if this is lost.
+        try:
+            await publisher.publish_async(
+                ProductChangedEvent(
+                    correlation_id=product.id,
+                    payload={"product_id": product.id, "price": product.price},
+                )
+            )
+        except AMQPError:
+            logger.warning("Could not publish ProductChanged for %s", product.id)
+
     async def create_category(
         self, db: AsyncSession, category_in: CategoryCreate
     ) -> Category:
         db_category = Category(**category_in.model_dump())
         db.add(db_category)
         await db.commit()
+        await catalog_version.bump()
+        await db.refresh(db_category)
+        local_search.set_category(db_category)
+        return db_category
+
+    async def update_category(
+        self, db: AsyncSession, category_id: uuid.UUID, category_in: CategoryUpdate
+    ) -> Category | None:
+        db_category = await db.get(Category, category_id)
+        if db_category is None:
+            return None
+        for field, value in category_in.model_dump(exclude_unset=True).items():
+            setattr(db_category, field, value)
+        # Search documents and cached product responses embed the category
+        result = await db.execute(
+            select(Product).where(Product.category_id == category_id)
+        )
+        products = list(result.scalars().all())
+        product_ids = [product.id for product in products]
+        if product_ids:
+            await SearchIndexService.enqueue(db, product_ids)
+        await db.commit()
+        search_indexer.notify()
+        await catalog_version.bump()
         await db.refresh(db_category)
+        local_search.set_category(db_category)
+        for product in products:
+            local_search.upsert(product)
+        await product_cache.invalidate(product_ids)
         return db_category
 
     async def get_categories(
         self, db: AsyncSession, skip: int = 0, limit: int = 100
     ) -> list[Category]:
-        query = select(Category).offset(skip).limit(limit)
+        # Stable order: equal versions must produce identical bodies
+        query = select(Category).order_by(Category.name).offset(skip).limit(limit)
         result = await db.execute(query)
         return list(result.scalars().all())
 
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.search import SearchClient, SearchUnavailableError, search_client
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.models.search import SearchIndexCheckpoint, SearchIndexJob
+from app.schemas.product import ProductSearchHit, ProductSearchResponse
+from app.services.local_search import LocalSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Queue drains and reindex batches run one at a time so the index only ever
+# sees a product state that was read after the previous push was sent.
+SEARCH_INDEX_LOCK_ID = 0x7365_6172
+
+REINDEX_CHECKPOINT = "reindex"
+
+
+def to_document(product: Product) -> dict[str, Any]:
+    return {
+        "id": str(product.id),
+        "name": product.name,
+        "description": product.description,
+        "price": product.price,
+        "stock": product.stock,
+        "image_url": product.image_url,
+        "category_id": str(product.category_id) if product.category_id else None,
+        "category": product.category.name if product.category else None,
+    }
+
+
+class SearchIndexService:
+    @staticmethod
+    async def enqueue(db: AsyncSession, product_ids: Iterable[uuid.UUID]) -> None:
+        # Staged on the caller's session, committed with the product change
+        await db.execute(
+            insert(SearchIndexJob),
+            [{"product_id": product_id} for product_id in product_ids],
+        )
+
+    @staticmethod
+    async def search(
+        query: str, limit: int, offset: int, category_id: uuid.UUID | None = None
+    ) -> dict[str, Any]:
+        filters = [f'category_id = "{category_id}"'] if category_id else []
+        return await search_client.search(query, limit, offset, filters)
+
+    @staticmethod
+    async def search_locally(
+        db: AsyncSession,
+        index: LocalSearchIndex,
+        query: str,
+        limit: int,
+        offset: int,
+        category_id: uuid.UUID | None = None,
+    ) -> ProductSearchResponse:
+        # The in-process index only knows ids; one primary key lookup fills
+        # in the documents, in the order the index ranked them
+        product_ids, total = index.search(query, limit, offset, category_id)
+        result = await db.execute(
+            select(Product)
+            .options(selectinload(Product.category))
+            .where(Product.id.in_(product_ids))
+        )
+        products = {product.id: product for product in result.scalars().all()}
+        hits = [
+            ProductSearchHit.model_validate(to_document(products[product_id]))
+            for product_id in product_ids
+            if product_id in products
+        ]
+        return ProductSearchResponse(hits=hits, estimated_total=total)
+
+
+class SearchIndexer:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        client: SearchClient,
+        batch_size: int,
+        poll_interval: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._client = client
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    @staticmethod
+    async def _products(db: AsyncSession, query: Any) -> list[Product]:
+        result = await db.execute(query.options(selectinload(Product.category)))
+        return list(result.scalars().all())
+
+    async def index_once(self) -> int:
+        async with self._session_factory() as db:
+            locked = await db.scalar(
+                select(func.pg_try_advisory_xact_lock(SEARCH_INDEX_LOCK_ID))
+            )
+            if not locked:
+                return 0
+
+            result = await db.execute(
+                select(SearchIndexJob)
+                .order_by(SearchIndexJob.id)
+                .limit(self._batch_size)
+            )
+            jobs = list(result.scalars().all())
+            if not jobs:
+                await db.commit()
+                return 0
+
+            # Jobs carry no payload: each product is pushed as it is now, so
+            # repeated writes to one product collapse into one document
+            product_ids = {job.product_id for job in jobs}
+            products = await self._products(
+                db, select(Product).where(Product.id.in_(product_ids))
+            )
+            if products:
+                await self._client.add_documents([to_document(p) for p in products])
+            deleted = product_ids - {product.id for product in products}
+            if deleted:
+                await self._client.delete_documents(sorted(map(str, deleted)))
+
+            # A failed push above leaves the jobs queued for the next round
+            await db.execute(
+                delete(SearchIndexJob).where(
+                    SearchIndexJob.id.in_([job.id for job in jobs])
+                )
+            )
+            await db.commit()
+            return len(jobs)
+
+    async def drain(self) -> int:
+        indexed = 0
+        while True:
+            count = await self.index_once()
+            indexed += count
+            if count < self._batch_size:
+                return indexed
+
+    async def reindex(self, resume: bool = False) -> int:
+        # Walks products in id order and records the last id pushed, so an
+        # interrupted run can continue instead of starting over. Products
+        # deleted before the run are removed through the job queue.
+        after: uuid.UUID | None = None
+        if resume:
+            async with self._session_factory() as db:
+                checkpoint = await db.get(SearchIndexCheckpoint, REINDEX_CHECKPOINT)
+            if checkpoint is not None:
+                after = checkpoint.last_product_id
+                logger.info("Resuming reindex after product %s", after)
+
+        await self._client.configure()
+        indexed = 0
+        while True:
+            async with self._session_factory() as db:
+                await db.execute(
+                    select(func.pg_advisory_xact_lock(SEARCH_INDEX_LOCK_ID))
+                )
+                query = select(Product).order_by(Product.id).limit(self._batch_size)
+                if after is not None:
+                    query = query.where(Product.id > after)
+                products = await self._products(db, query)
+                if not products:
+                    await db.execute(
+                        delete(SearchIndexCheckpoint).where(
+                            SearchIndexCheckpoint.name == REINDEX_CHECKPOINT
+                        )
+                    )
+                    await db.commit()
+                    return indexed
+
+                await self._client.add_documents([to_document(p) for p in products])
+                after = products[-1].id
+                checkpoint_row = pg_insert(SearchIndexCheckpoint).values(
+                    name=REINDEX_CHECKPOINT, last_product_id=after
+                )
+                await db.execute(
+                    checkpoint_row.on_conflict_do_update(
+                        index_elements=[SearchIndexCheckpoint.name],
+                        set_={
+                            "last_product_id": after,
+                            "updated_at": func.now(),
+                        },
+                    )
+                )
+                await db.commit()
+                indexed += len(products)
+                logger.info("Reindexed %d products", indexed)
+
+    async def run(self) -> None:
+        configured = False
+        while True:
+            try:
+                if not configured:
+                    await self._client.configure()
+                    configured = True
+                indexed = await self.index_once()
+            except SearchUnavailableError:
+                # Meilisearch may come back empty; settings go out again
+                # before the next push
+                logger.warning("Search index unavailable, retrying")
+                configured = False
+                indexed = 0
+            except Exception:
+                logger.exception("Search indexing iteration failed")
+                indexed = 0
+            if indexed < self._batch_size:
+                # Caught up: sleep until the next poll or a fresh write
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+search_indexer = SearchIndexer(
+    SessionLocal,
+    search_client,
+    batch_size=settings.SEARCH_INDEX_BATCH_SIZE,
+    poll_interval=settings.SEARCH_INDEX_POLL_INTERVAL,
+)
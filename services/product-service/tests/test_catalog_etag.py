@@ -0,0 +1,81 @@
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.models.product import Category
+
+
+@pytest.mark.asyncio
+async def test_revalidation_answers_304_without_database(client, mock_db_session):
+    first = await client.get("/api/v1/products", params={"limit": 10})
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "public, max-age=0, must-revalidate"
+    mock_db_session.execute.reset_mock()
+
+    second = await client.get(
+        "/api/v1/products",
+        params={"limit": 10},
+        headers={"If-None-Match": f'"other", W/{etag}'},
+    )
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_etag_depends_on_query(client):
+    by_name = await client.get("/api/v1/products", params={"limit": 5, "sort": "name"})
+    reordered = await client.get(
+        "/api/v1/products", params={"sort": "name", "limit": 5}
+    )
+    by_price = await client.get("/api/v1/products", params={"sort": "price"})
+    categories = await client.get("/api/v1/categories")
+
+    assert by_name.headers["ETag"] == reordered.headers["ETag"]
+    assert len({by_name.headers["ETag"], by_price.headers["ETag"]}) == 2
+    assert categories.headers["ETag"] != by_name.headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_write_changes_the_etag(client, mock_db_session):
+    before = await client.get("/api/v1/categories")
+    mock_db_session.add = MagicMock()
+
+    async def refresh(obj):
+        obj.id = uuid.uuid4()
+
+    mock_db_session.refresh = AsyncMock(side_effect=refresh)
+    await client.post("/api/v1/categories", json={"name": "Toys"})
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [
+        Category(id=uuid.uuid4(), name="Toys")
+    ]
+
+    after = await client.get(
+        "/api/v1/categories", headers={"If-None-Match": before.headers["ETag"]}
+    )
+
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.json()[0]["name"] == "Toys"
+
+
+@pytest.mark.asyncio
+async def test_unavailable_version_serves_without_etag(client, catalog_version_store):
+    with patch.object(
+        catalog_version_store, "get", AsyncMock(side_effect=ConnectionError)
+    ):
+        response = await client.get("/api/v1/products", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_no_etags_without_a_version_store(client):
+    with patch("app.services.catalog_version.catalog_version.store", None):
+        response = await client.get("/api/v1/products", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
@@ -0,0 +1,157 @@
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.models.product import Category, Product
+from app.services.local_search import (
+    PREFIX_EXPANSION,
+    LocalSearch,
+    LocalSearchIndex,
+)
+
+ELECTRONICS = uuid.uuid4()
+
+
+def _index(*products) -> LocalSearchIndex:
+    index = LocalSearchIndex()
+    index.set_category(ELECTRONICS, "Electronics")
+    for product_id, name, description in products:
+        index.add(product_id, name, description, ELECTRONICS)
+    return index
+
+
+def _search(session_factory) -> LocalSearch:
+    return LocalSearch(
+        session_factory, batch_size=100, rebuild_interval=60, max_stale_fraction=0.4
+    )
+
+
+def test_matches_prefixes_typos_and_categories():
+    laptop, phone = uuid.uuid4(), uuid.uuid4()
+    index = _index(
+        (laptop, "Gaming Laptop", "Fast and loud"),
+        (phone, "Smartphone", "Latest flagship phone"),
+    )
+
+    assert index.search("lap", limit=10) == ([laptop], 1)
+    assert index.search("gamming laptop", limit=10) == ([laptop], 1)
+    assert index.search("flagship lap", limit=10) == ([], 0)
+    assert index.search("electronics", limit=10) == ([phone, laptop], 2)
+    assert index.search("phone", limit=10, category_id=uuid.uuid4()) == ([], 0)
+    # Short words get no typo tolerance
+    assert index.search("fadt", limit=10) == ([], 0)
+
+
+def test_updates_replace_the_previous_version():
+    laptop = uuid.uuid4()
+    index = _index((laptop, "Gaming Laptop", None))
+
+    index.add(laptop, "Office Notebook", None, None)
+
+    assert index.search("gaming", limit=10) == ([], 0)
+    assert index.search("notebook", limit=10) == ([laptop], 1)
+    index.remove(laptop)
+    assert index.search("notebook", limit=10) == ([], 0)
+    assert len(index) == 0
+
+
+def test_pages_stop_early_and_estimate_the_total():
+    ids = [uuid.uuid4() for _ in range(100)]
+    index = _index(
+        *((product_id, f"Cable {n}", None) for n, product_id in enumerate(ids))
+    )
+
+    page, total = index.search("cable", limit=5, offset=5)
+
+    assert page == ids[-10:-5][::-1]
+    assert total == 100
+
+
+# Short prefixes read the completions kept up to date while indexing, longer
+# ones rank theirs on demand
+@pytest.mark.parametrize("prefix", ["p", "pa", "part"])
+def test_prefix_keeps_the_most_used_completions(prefix):
+    common = [uuid.uuid4(), uuid.uuid4()]
+    # More completions than PREFIX_EXPANSION, the most used one sorting last
+    # and arriving last
+    index = _index(
+        *((uuid.uuid4(), f"part{n:03d}", None) for n in range(PREFIX_EXPANSION)),
+        *((product_id, "partzz", None) for product_id in common),
+    )
+
+    page, total = index.search(prefix, limit=100)
+
+    assert set(common) <= set(page)
+    # One rarely used completion was left out instead
+    assert total == PREFIX_EXPANSION + 1
+
+
+def test_rebuild_is_due_once_tombstones_pile_up():
+    search = _search(None)
+    assert search.rebuild_due()
+    laptop = uuid.uuid4()
+    search.index = _index(
+        (laptop, "Gaming Laptop", None), (uuid.uuid4(), "Phone", None)
+    )
+
+    search.upsert(Product(id=laptop, name="Office Laptop", category_id=None))
+    assert search.index.stale == 1
+    assert not search.rebuild_due()
+    search.upsert(Product(id=laptop, name="Travel Laptop", category_id=None))
+    assert search.rebuild_due()
+
+
+@pytest.mark.asyncio
+async def test_build_streams_products_and_keeps_newer_writes(mock_db_session):
+    laptop, phone = uuid.uuid4(), uuid.uuid4()
+
+    class Rows:
+        async def partitions(self):
+            # A write lands while the scan is running
+            search.upsert(Product(id=laptop, name="Renamed Laptop", category_id=None))
+            yield [(laptop, "Gaming Laptop", None, ELECTRONICS)]
+            yield [(phone, "Smartphone", None, ELECTRONICS)]
+
+    categories = MagicMock()
+    categories.tuples.return_value = [(ELECTRONICS, "Electronics")]
+    mock_db_session.execute.return_value = categories
+    mock_db_session.stream.return_value = Rows()
+
+    @asynccontextmanager
+    async def session_factory():
+        yield mock_db_session
+
+    search = _search(session_factory)
+    assert not search.ready
+    await search.build()
+
+    assert search.ready
+    assert search.index.search("renamed", limit=10) == ([laptop], 1)
+    assert search.index.search("electronics", limit=10) == ([phone], 1)
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_local_index(client, mock_db_session, fake_search):
+    category = Category(id=ELECTRONICS, name="Electronics")
+    laptop = Product(
+        id=uuid.uuid4(),
+        name="Gaming Laptop",
+        price=1200.0,
+        stock=3,
+        category_id=ELECTRONICS,
+        category=category,
+    )
+    fake_search.available = False
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [
+        laptop
+    ]
+    local = _search(None)
+    local.index = _index((laptop.id, laptop.name, None))
+
+    with patch("app.api.v1.endpoints.products.local_search", local):
+        response = await client.get("/api/v1/products/search", params={"q": "gamin"})
+
+    assert response.status_code == 200
+    assert response.json()["hits"][0]["id"] == str(laptop.id)
+    assert response.json()["hits"][0]["category"] == "Electronics"
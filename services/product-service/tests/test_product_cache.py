@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.models.product import Category, Product
+from app.services.product_cache import KEY, TOMBSTONE, ProductCache
+
+
+def _found(mock_db_session, product):
+    mock_db_session.execute.return_value.scalar_one_or_none.return_value = product
+
+
+@pytest.mark.asyncio
+async def test_second_read_is_served_from_cache(client, mock_db_session):
+    product_id = uuid.uuid4()
+    _found(mock_db_session, Product(id=product_id, name="Lamp", price=30.0, stock=1))
+
+    first = await client.get(f"/api/v1/products/{product_id}")
+    second = await client.get(f"/api/v1/products/{product_id}")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["name"] == "Lamp"
+    mock_db_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cached_product(
+    client, mock_db_session, product_cache_store
+):
+    product_id = uuid.uuid4()
+    _found(mock_db_session, Product(id=product_id, name="Lamp", price=30.0, stock=1))
+    await client.get(f"/api/v1/products/{product_id}")
+
+    response = await client.patch(f"/api/v1/products/{product_id}", json={"price": 25})
+    assert response.status_code == 200
+    assert await product_cache_store.get(KEY % product_id) == TOMBSTONE
+
+    detail = await client.get(f"/api/v1/products/{product_id}")
+    assert detail.json()["price"] == 25
+
+
+@pytest.mark.asyncio
+async def test_category_update_invalidates_its_products(
+    client, mock_db_session, product_cache_store
+):
+    category = Category(id=uuid.uuid4(), name="Electronics")
+    product = Product(id=uuid.uuid4(), name="Lamp", price=30.0, category=category)
+    await product_cache_store.add(KEY % product.id, b"{}", ttl=60)
+    mock_db_session.get = AsyncMock(return_value=category)
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = [
+        product
+    ]
+
+    response = await client.patch(
+        f"/api/v1/categories/{category.id}", json={"name": "Gadgets"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Gadgets"
+    assert await product_cache_store.get(KEY % product.id) == TOMBSTONE
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load(product_cache_store):
+    cache = ProductCache(product_cache_store, ttl=60, jitter=0.1, tombstone_ttl=5)
+    product_id = uuid.uuid4()
+    release = asyncio.Event()
+    load = AsyncMock()
+
+    async def slow_load():
+        await release.wait()
+        await load()
+        return b'{"name": "Lamp"}'
+
+    readers = [
+        asyncio.create_task(cache.get_or_load(product_id, slow_load)) for _ in range(10)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*readers) == [b'{"name": "Lamp"}'] * 10
+    load.assert_awaited_once()
+    assert await product_cache_store.get(KEY % product_id) == b'{"name": "Lamp"}'
+
+
+@pytest.mark.asyncio
+async def test_fill_cannot_overwrite_a_newer_invalidation(product_cache_store):
+    cache = ProductCache(product_cache_store, ttl=60, jitter=0.1, tombstone_ttl=5)
+    product_id = uuid.uuid4()
+
+    async def stale_load():
+        # The product changes while this read is in flight
+        await cache.invalidate([product_id])
+        return b'{"price": 30}'
+
+    assert await cache.get_or_load(product_id, stale_load) == b'{"price": 30}'
+    assert await product_cache_store.get(KEY % product_id) == TOMBSTONE
+
+
+@pytest.mark.asyncio
+async def test_cache_outage_falls_back_to_loader():
+    store = MagicMock()
+    store.get = AsyncMock(side_effect=ConnectionError)
+    store.add = AsyncMock(side_effect=ConnectionError)
+    cache = ProductCache(store, ttl=60, jitter=0.1, tombstone_ttl=5)
+
+    value = await cache.get_or_load(uuid.uuid4(), AsyncMock(return_value=b"{}"))
+
+    assert value == b"{}"
+
+
+@pytest.mark.asyncio
+async def test_without_a_store_every_read_loads():
+    cache = ProductCache(None, ttl=60, jitter=0.1, tombstone_ttl=5)
+    product_id = uuid.uuid4()
+    load = AsyncMock(return_value=b"{}")
+
+    assert await cache.get_or_load(product_id, load) == b"{}"
+    assert await cache.get_or_load(product_id, load) == b"{}"
+    await cache.invalidate([product_id])
+
+    assert load.await_count == 2
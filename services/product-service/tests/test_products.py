@@ -1,8 +1,10 @@
 import uuid
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.product import Category, Product
+from sqlalchemy.dialects import postgresql
 
 
 @pytest.mark.asyncio
@@ -59,6 +61,68 @@ async def test_get_products(client, mock_db_session):
     assert data[0]["id"] == str(test_id)
 
 
+@pytest.mark.asyncio
+async def test_get_products_returns_next_cursor(client, mock_db_session):
+    products = [
+        Product(id=uuid.uuid4(), name=name, price=10.0, stock=1)
+        for name in ("Anvil", "Bucket", "Chisel")
+    ]
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = (
+        products
+    )
+
+    response = await client.get("/api/v1/products", params={"limit": 2})
+
+    assert [product["name"] for product in response.json()] == ["Anvil", "Bucket"]
+    sort, value, row_id = decode_cursor(response.headers["X-Next-Cursor"])
+    assert (sort, value, row_id) == ("name", "Bucket", str(products[1].id))
+    query = mock_db_session.execute.await_args.args[0]
+    assert "ORDER BY products.name, products.id" in str(query)
+    assert query._limit_clause.value == 3
+
+
+@pytest.mark.asyncio
+async def test_get_products_seeks_past_cursor_with_filters(client, mock_db_session):
+    category_id, last_id = uuid.uuid4(), uuid.uuid4()
+
+    response = await client.get(
+        "/api/v1/products",
+        params={
+            "sort": "-price",
+            "cursor": encode_cursor("-price", 99.5, last_id),
+            "category_id": str(category_id),
+            "min_price": 10,
+            "in_stock": True,
+        },
+    )
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    query = mock_db_session.execute.await_args.args[0]
+    compiled = query.compile(dialect=postgresql.dialect())
+    sql = " ".join(str(compiled).split())
+    assert "(products.price, products.id) < (%(param_1)s, %(param_2)s::UUID)" in sql
+    assert "ORDER BY products.price DESC, products.id DESC" in sql
+    assert "products.stock > %(stock_1)s" in sql
+    assert compiled.params["category_id_1"] == category_id
+    assert compiled.params["price_1"] == 10
+    assert (compiled.params["param_1"], compiled.params["param_2"]) == (99.5, last_id)
+
+
+@pytest.mark.asyncio
+async def test_get_products_rejects_cursor_from_another_sort(client, mock_db_session):
+    cursor = encode_cursor("name", "Bucket", uuid.uuid4())
+
+    for params in (
+        {"sort": "price", "cursor": cursor},
+        {"cursor": "not-a-cursor"},
+    ):
+        response = await client.get("/api/v1/products", params=params)
+        assert response.status_code == 400
+
+    mock_db_session.execute.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_get_product_found(client, mock_db_session):
     # Setup mock return value
@@ -89,6 +153,67 @@ async def test_get_product_not_found(client, mock_db_session):
     assert response.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_get_products_batch(client, mock_db_session):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [
+        Product(id=first, name="First", price=10.0, stock=1)
+    ]
+    mock_db_session.execute.return_value = mock_result
+
+    response = await client.post(
+        "/api/v1/products/batch",
+        json={"ids": [str(second), str(first), str(second)]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    # Request order, one entry per requested ID, unknown IDs marked
+    assert [(r["id"], r["found"]) for r in results] == [
+        (str(second), False),
+        (str(first), True),
+        (str(second), False),
+    ]
+    assert results[0]["product"] is None
+    assert results[1]["product"]["name"] == "First"
+    mock_db_session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_products_batch_caps_ids(client, mock_db_session):
+    ids = [str(uuid.uuid4()) for _ in range(201)]
+
+    response = await client.post("/api/v1/products/batch", json={"ids": ids})
+
+    assert response.status_code == 422
+    mock_db_session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_update_product_publishes_change(client, mock_db_session):
+    test_id = uuid.uuid4()
+    mock_product = Product(id=test_id, name="Test Product", price=10.0, stock=100)
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = mock_product
+    mock_db_session.execute.return_value = mock_result
+
+    with patch(
+        "app.services.product_service.publisher.publish_async",
+        new_callable=AsyncMock,
+    ) as mock_publish:
+        response = await client.patch(
+            f"/api/v1/products/{test_id}", json={"price": 12.5}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["price"] == 12.5
+    mock_db_session.commit.assert_awaited_once()
+    event = mock_publish.await_args.args[0]
+    assert event.event_type == "ProductChanged"
+    assert event.payload == {"product_id": test_id, "price": 12.5}
+
+
 @pytest.mark.asyncio
 async def test_create_category(client, mock_db_session):
     # Setup mock behavior
@@ -0,0 +1,200 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from app.core.search import SearchClient, SearchUnavailableError
+from app.models.product import Category, Product
+from app.models.search import SearchIndexCheckpoint, SearchIndexJob
+from app.services.search_index import SearchIndexer, to_document
+from sqlalchemy.dialects import postgresql
+
+
+def _indexer(mock_db_session, fake_search, batch_size=10) -> SearchIndexer:
+    @asynccontextmanager
+    async def session_factory():
+        yield mock_db_session
+
+    return SearchIndexer(
+        session_factory, fake_search.client, batch_size, poll_interval=0.01
+    )
+
+
+def _results(*rows):
+    results = []
+    for batch in rows:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = batch
+        results.append(result)
+    return results
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _laptop() -> Product:
+    category = Category(id=uuid.uuid4(), name="Electronics")
+    return Product(
+        id=uuid.uuid4(),
+        name="Gaming Laptop",
+        description="Fast and loud",
+        price=1200.0,
+        stock=3,
+        category_id=category.id,
+        category=category,
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_product_queues_index_job(client, mock_db_session):
+    mock_db_session.add = MagicMock()
+
+    response = await client.post(
+        "/api/v1/products", json={"name": "Desk Lamp", "price": 30.0}
+    )
+
+    assert response.status_code == 201
+    statement, params = mock_db_session.execute.await_args.args
+    assert statement.table.name == "searchindexjobs"
+    product = mock_db_session.add.call_args.args[0]
+    assert params == [{"product_id": product.id}]
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_index_once_pushes_changes_and_deletes(mock_db_session, fake_search):
+    laptop, gone = _laptop(), uuid.uuid4()
+    fake_search.documents[str(gone)] = {"id": str(gone)}
+    jobs = [
+        SearchIndexJob(id=1, product_id=laptop.id),
+        SearchIndexJob(id=2, product_id=gone),
+        SearchIndexJob(id=3, product_id=laptop.id),
+    ]
+    mock_db_session.scalar.return_value = True
+    mock_db_session.execute.side_effect = [*_results(jobs, [laptop]), MagicMock()]
+
+    assert await _indexer(mock_db_session, fake_search).index_once() == 3
+
+    assert fake_search.documents == {str(laptop.id): to_document(laptop)}
+    assert fake_search.documents[str(laptop.id)]["category"] == "Electronics"
+    cleanup = mock_db_session.execute.await_args.args[0]
+    assert _sql(cleanup).startswith("DELETE FROM searchindexjobs")
+    mock_db_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_index_once_keeps_jobs_while_search_is_down(mock_db_session, fake_search):
+    laptop = _laptop()
+    fake_search.available = False
+    mock_db_session.scalar.return_value = True
+    mock_db_session.execute.side_effect = _results(
+        [SearchIndexJob(id=1, product_id=laptop.id)], [laptop]
+    )
+
+    with pytest.raises(SearchUnavailableError, match="503"):
+        await _indexer(mock_db_session, fake_search).index_once()
+
+    mock_db_session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reindex_resumes_after_checkpoint(mock_db_session, fake_search):
+    laptop = _laptop()
+    checkpoint = SearchIndexCheckpoint(name="reindex", last_product_id=uuid.UUID(int=1))
+    mock_db_session.get = AsyncMock(return_value=checkpoint)
+    lock, upsert, finish = MagicMock(), MagicMock(), MagicMock()
+    mock_db_session.execute.side_effect = [
+        lock,
+        *_results([laptop]),
+        upsert,
+        lock,
+        *_results([]),
+        finish,
+    ]
+
+    indexed = await _indexer(mock_db_session, fake_search).reindex(resume=True)
+
+    assert indexed == 1
+    assert list(fake_search.documents) == [str(laptop.id)]
+    assert "filterableAttributes" in fake_search.settings
+    statements = [call.args[0] for call in mock_db_session.execute.await_args_list]
+    first_page = statements[1].compile(dialect=postgresql.dialect())
+    assert "products.id > %(id_1)s" in str(first_page)
+    assert first_page.params["id_1"] == uuid.UUID(int=1)
+    assert _sql(statements[2]).startswith("INSERT INTO searchindexcheckpoints")
+    assert _sql(statements[-1]).startswith("DELETE FROM searchindexcheckpoints")
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_queries_index(client, fake_search):
+    laptop = _laptop()
+    fake_search.documents[str(laptop.id)] = to_document(laptop)
+
+    response = await client.get(
+        "/api/v1/products/search",
+        params={"q": "gam", "category_id": str(laptop.category_id)},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["estimated_total"] == 1
+    assert body["hits"][0]["id"] == str(laptop.id)
+    assert body["hits"][0]["category"] == "Electronics"
+    request = fake_search.requests[-1]
+    assert request.headers["Authorization"] == "Bearer test_key"
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_reports_outage(client, fake_search):
+    fake_search.available = False
+
+    response = await client.get("/api/v1/products/search", params={"q": "laptop"})
+
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_reported_as_outages():
+    client = SearchClient(
+        "http://search.test",
+        "bad_key",
+        index="products",
+        timeout=1,
+        transport=httpx.MockTransport(lambda request: httpx.Response(403)),
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.search("laptop", 10, 0, [])
+
+
+@pytest.mark.asyncio
+async def test_indexer_reconfigures_after_an_outage(mock_db_session, fake_search):
+    indexer = _indexer(mock_db_session, fake_search)
+    rounds = 0
+
+    async def index_once():
+        nonlocal rounds
+        rounds += 1
+        if rounds == 1:
+            # Meilisearch restarts without its settings
+            fake_search.settings.clear()
+            raise SearchUnavailableError("down")
+        return 0
+
+    indexer.index_once = index_once
+    indexer.start()
+    try:
+        async with asyncio.timeout(1):
+            while rounds < 2:
+                await asyncio.sleep(0.01)
+    finally:
+        await indexer.stop()
+
+    settings_calls = [
+        r for r in fake_search.requests if r.url.path.endswith("/settings")
+    ]
+    assert len(settings_calls) == 2
+    assert fake_search.settings["sortableAttributes"] == ["price"]
@@ -0,0 +1,73 @@
+import time
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# Per-process cache whose entries live for `ttl` seconds; once `max_entries`
+# are held the oldest one makes room. A TTL of zero turns it off.
+#
+# Every invalidation bumps a generation counter: a caller reads `generation`
+# before fetching and passes it to put_many, which then skips any key
+# invalidated while the fetch was in flight.
+class TTLCache(Generic[K, V]):
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: dict[K, tuple[float, V]] = {}
+        self._generation = 0
+        self._invalidated: dict[K, int] = {}
+        # Invalidations at or below this generation have been forgotten
+        self._invalidated_floor = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                continue
+            found[key] = value
+        return found
+
+    def put_many(self, values: dict[K, V], since: int | None = None) -> None:
+        if since is not None and since < self._invalidated_floor:
+            return
+        expires_at = time.monotonic() + self._ttl
+        for key, value in values.items():
+            if since is not None and self._invalidated.get(key, 0) > since:
+                continue
+            self._entries.pop(key, None)
+            if len(self._entries) >= self._max_entries:
+                # Dicts keep insertion order: drop the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (expires_at, value)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+        self._generation += 1
+        self._invalidated.pop(key, None)
+        if len(self._invalidated) >= self._max_entries:
+            oldest = next(iter(self._invalidated))
+            self._invalidated_floor = self._invalidated.pop(oldest)
+        self._invalidated[key] = self._generation
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+        self._invalidated.clear()
+        self._invalidated_floor = self._generation
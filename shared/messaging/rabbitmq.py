@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import Future
+from contextlib import suppress
+from functools import partial
+from typing import Any
+
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+from pika.exceptions import AMQPError
+from pika.exchange_type import ExchangeType
+from pika.spec import Basic, BasicProperties
+
+from shared.schemas.base import DomainEvent
+
+logger = logging.getLogger(__name__)
+
+EXCHANGE_NAME = "ecommerce.events"
+
+EventHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+# Events go to one topic exchange with the event type as routing key.
+# pika's BlockingConnection is not thread-safe, so publishes are serialised
+# behind a lock and publish_async hops onto a worker thread. Single events go
+# through a confirm-mode channel. Batches go through a transactional channel:
+# tx.commit-ok covers the whole batch in one round trip, and a batch that
+# fails part way is discarded by the broker, so it is published all or nothing.
+class EventPublisher:
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._connection: pika.BlockingConnection | None = None
+        self._channel: BlockingChannel | None = None
+        self._batch_channel: BlockingChannel | None = None
+        self._lock = threading.Lock()
+
+    def _open_channel(self) -> BlockingChannel:
+        if self._connection is None or self._connection.is_closed:
+            self._connection = pika.BlockingConnection(pika.URLParameters(self._url))
+        channel = self._connection.channel()
+        channel.exchange_declare(
+            exchange=EXCHANGE_NAME, exchange_type=ExchangeType.topic, durable=True
+        )
+        return channel
+
+    def _ensure_channel(self) -> BlockingChannel:
+        if self._channel is None or self._channel.is_closed:
+            channel = self._open_channel()
+            # Every basic_publish now waits for the broker ack (or raises)
+            channel.confirm_delivery()
+            self._channel = channel
+        return self._channel
+
+    def _ensure_batch_channel(self) -> BlockingChannel:
+        if self._batch_channel is None or self._batch_channel.is_closed:
+            channel = self._open_channel()
+            channel.tx_select()
+            self._batch_channel = channel
+        return self._batch_channel
+
+    def _reset(self) -> None:
+        connection, self._connection = self._connection, None
+        self._channel = self._batch_channel = None
+        if connection is not None and connection.is_open:
+            with suppress(AMQPError):
+                connection.close()
+
+    def _publish(self, channel: BlockingChannel, event: DomainEvent) -> None:
+        channel.basic_publish(
+            exchange=EXCHANGE_NAME,
+            routing_key=event.event_type,
+            body=event.model_dump_json(),
+            properties=BasicProperties(
+                content_type="application/json",
+                delivery_mode=2,
+                message_id=str(event.event_id),
+                correlation_id=(
+                    str(event.correlation_id) if event.correlation_id else None
+                ),
+                type=event.event_type,
+            ),
+        )
+
+    def publish_many(self, events: Sequence[DomainEvent]) -> None:
+        with self._lock:
+            try:
+                channel = self._ensure_batch_channel()
+                for event in events:
+                    self._publish(channel, event)
+                channel.tx_commit()
+            except AMQPError:
+                # Closing the connection drops the uncommitted transaction
+                self._reset()
+                raise
+
+    def publish(self, event: DomainEvent) -> None:
+        with self._lock:
+            try:
+                self._publish(self._ensure_channel(), event)
+            except AMQPError:
+                self._reset()
+                raise
+
+    async def publish_async(self, event: DomainEvent) -> None:
+        await asyncio.to_thread(self.publish, event)
+
+    def close(self) -> None:
+        with self._lock:
+            self._reset()
+
+
+# Consumes one service queue on a background thread. Handlers run on the
+# application's event loop, up to prefetch_count at a time. A message is acked
+# once its handler succeeds; a failing message is requeued once, then dropped.
+# An exclusive queue lives and dies with this process, so every replica gets
+# its own copy of each event (broadcast, e.g. for cache invalidation).
+class EventConsumer:
+    def __init__(
+        self,
+        url: str,
+        queue: str,
+        handlers: dict[str, EventHandler],
+        prefetch_count: int = 10,
+        reconnect_delay: float = 5.0,
+        exclusive: bool = False,
+    ) -> None:
+        self._url = url
+        self._queue = queue
+        self._handlers = handlers
+        self._exclusive = exclusive
+        self._prefetch_count = prefetch_count
+        self._reconnect_delay = reconnect_delay
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"consumer-{self._queue}", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, self._reconnect_delay)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._consume()
+            except AMQPError:
+                logger.warning(
+                    "Consumer %s lost its broker connection", self._queue, exc_info=True
+                )
+                self._stopping.wait(self._reconnect_delay)
+
+    def _consume(self) -> None:
+        connection = pika.BlockingConnection(pika.URLParameters(self._url))
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(
+                exchange=EXCHANGE_NAME, exchange_type=ExchangeType.topic, durable=True
+            )
+            if self._exclusive:
+                channel.queue_declare(
+                    queue=self._queue, exclusive=True, auto_delete=True
+                )
+            else:
+                channel.queue_declare(queue=self._queue, durable=True)
+            for routing_key in self._handlers:
+                channel.queue_bind(
+                    queue=self._queue, exchange=EXCHANGE_NAME, routing_key=routing_key
+                )
+            channel.basic_qos(prefetch_count=self._prefetch_count)
+
+            def on_message(
+                ch: BlockingChannel,
+                method: Basic.Deliver,
+                properties: BasicProperties,
+                body: bytes,
+            ) -> None:
+                self._dispatch(connection, ch, method, body)
+
+            channel.basic_consume(queue=self._queue, on_message_callback=on_message)
+            while not self._stopping.is_set():
+                connection.process_data_events(time_limit=1)
+        finally:
+            if connection.is_open:
+                connection.close()
+
+    def _dispatch(
+        self,
+        connection: pika.BlockingConnection,
+        channel: BlockingChannel,
+        method: Basic.Deliver,
+        body: bytes,
+    ) -> None:
+        delivery_tag = int(method.delivery_tag or 0)
+        routing_key = str(method.routing_key)
+        handler = self._handlers.get(routing_key)
+        if handler is None or self._loop is None:
+            channel.basic_ack(delivery_tag=delivery_tag)
+            return
+
+        try:
+            message = json.loads(body)
+        except ValueError:
+            logger.error("Dropping malformed %s message", routing_key)
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=False)
+            return
+
+        requeue = not method.redelivered
+
+        def settle(future: Future[None]) -> None:
+            callback: Callable[[], None]
+            if future.exception() is None:
+                callback = partial(channel.basic_ack, delivery_tag=delivery_tag)
+            else:
+                logger.error(
+                    "Handler for %s failed",
+                    routing_key,
+                    exc_info=future.exception(),
+                )
+                callback = partial(
+                    channel.basic_nack, delivery_tag=delivery_tag, requeue=requeue
+                )
+            # Acks must be sent from the connection's own thread. If the
+            # connection is already gone the broker redelivers the message.
+            with suppress(AMQPError):
+                connection.add_callback_threadsafe(callback)
+
+        asyncio.run_coroutine_threadsafe(
+            handler(message), self._loop
+        ).add_done_callback(settle)
@@ -47,6 +47,11 @@ class PaymentFailedEvent(DomainEvent):
     payload: dict[str, Any]  # { "order_id": ..., "reason": "insufficient_funds" }
 
 
+class PaymentRefundRequestedEvent(DomainEvent):
+    event_type: str = "PaymentRefundRequested"
+    payload: dict[str, Any]  # { "order_id": ..., "payment_id": ..., "reason": ... }
+
+
 class OrderCompletedEvent(DomainEvent):
     event_type: str = "OrderCompleted"
     payload: dict[str, Any]  # { "order_id": ... }
@@ -55,3 +60,8 @@ class OrderCompletedEvent(DomainEvent):
 class OrderCancelledEvent(DomainEvent):
     event_type: str = "OrderCancelled"
     payload: dict[str, Any]  # { "order_id": ..., "reason": ... }
+
+
+class ProductChangedEvent(DomainEvent):
+    event_type: str = "ProductChanged"
+    payload: dict[str, Any]  # { "product_id": ..., "price": ... }
@@ -0,0 +1,34 @@
+from collections.abc import AsyncIterable, AsyncIterator
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    # Yields (line number, raw line) from a streamed body; None marks a line
+    # over max_line_bytes, which is skipped without ever being held in memory.
+    buffer = bytearray()
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not oversized:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        buffer.clear()
+                        oversized = True
+                break
+            line_no += 1
+            if not oversized:
+                buffer += chunk[start:end]
+            too_large = oversized or len(buffer) > max_line_bytes
+            yield line_no, None if too_large else bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, bytes(buffer)